@@ -1,19 +1,32 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 from nearai.agents.environment import Environment
 import json
 import os
 import re
 import pprint
 import contextlib
+import time
 # from icalendar import Calendar  # Remove icalendar import
 from ical_parser import parse_ical_data # Import the new function
+from event_filter import prefilter_events, GeocodeCache
+from food_classifier import FoodClassifier
+from instrumentation import METRICS, BYTES_BUCKETS, estimate_tokens
 
 # Configuration variables
 ICAL_URL = "https://api.lu.ma/ics/get?entity=discover&id=discplace-BDj7GNbGlsF7Cka"
 ICAL_FILE = "ical_data.json"
 SUMMARY_FILE = "event_summary.json"  # File to store event summaries
+RUN_REPORT_FILE = "run_report.json"  # File to store per-stage timings and counters
 MAX_EVENTS_TO_PROCESS = 15 # Maximum number of events to process
+FETCH_CHUNK_SIZE = 16384  # Bytes read from an event page response at a time
+GEOCODE_CACHE_FILE = "geocode_cache.json"  # File to store resolved event locations
+
+# Prefilter configuration, applied before any LLM call
+PREFILTER_WINDOW_HOURS = 7 * 24  # Only events starting within this many hours
+PREFILTER_CENTER = (37.7749, -122.4194)  # San Francisco
+PREFILTER_RADIUS_KM = 25.0  # Only events within this distance of the center
+PREFILTER_NEIGHBORHOODS = []  # Location substrings (e.g. "Berkeley", "94107") to always keep
 
 # Define tool for fetching URL content
 def fetch_url(url: str) -> str:
@@ -23,28 +36,97 @@ def fetch_url(url: str) -> str:
         with contextlib.redirect_stdout(None):
             response = requests.get(url)
             response.raise_for_status()
+        METRICS.inc("bytes_fetched", len(response.content))
+        METRICS.observe("response_bytes", len(response.content), buckets=BYTES_BUCKETS)
         return response.text
     except requests.exceptions.RequestException as e:
+        METRICS.inc("fetch_errors")
+        return f"Error fetching URL: {e}"
+
+# Define tool for fetching a page and extracting its text as it downloads
+def fetch_page_text(url: str, event: str = None) -> str:
+    """
+    Fetches an HTML page and extracts its text from each chunk as it arrives, so the page is never held in memory.
+
+    Time spent waiting on the network is recorded as the "fetch_event_page" stage and time spent parsing and
+    extracting as "extract_text", even though the two are interleaved.
+    """
+    start = time.perf_counter()
+    waiting = 0.0  # Seconds spent inside the chunk iterator, waiting on the network
+    extracting = 0.0
+    try:
+        print("Fetching "+url)
+        size = 0
+        with contextlib.redirect_stdout(None), requests.get(url, stream=True) as response:
+            response.raise_for_status()
+            # Only trust the HTTP charset if the server actually sent one
+            content_type = response.headers.get("Content-Type", "").lower()
+            from_encoding = response.encoding if "charset=" in content_type else None
+
+            def chunks():
+                nonlocal size, waiting
+                content = response.iter_content(chunk_size=FETCH_CHUNK_SIZE)
+                while True:
+                    wait_start = time.perf_counter()
+                    chunk = next(content, None)
+                    waiting += time.perf_counter() - wait_start
+                    if chunk is None:
+                        return
+                    size += len(chunk)
+                    yield chunk
+
+            extract_start = time.perf_counter()
+            text = extract_text_from_html(chunks(), from_encoding=from_encoding)
+            extracting = time.perf_counter() - extract_start - waiting
+        METRICS.inc("bytes_fetched", size)
+        METRICS.observe("response_bytes", size, buckets=BYTES_BUCKETS)
+        return text
+    except requests.exceptions.RequestException as e:
+        METRICS.inc("fetch_errors")
         return f"Error fetching URL: {e}"
+    finally:
+        METRICS.record_time("fetch_event_page", time.perf_counter() - start - extracting, event=event)
+        METRICS.record_time("extract_text", extracting, event=event)
 
 # Define tool for extracting text from HTML
-def extract_text_from_html(html: str) -> str:
-    """Extracts text from HTML content."""
+def extract_text_from_html(html: str, from_encoding: str = None) -> str:
+    """
+    Extracts text from HTML content: a string, bytes, or an iterable of chunks.
+
+    Elements are discarded as soon as their text has been taken, so memory
+    use doesn't grow with the size of the page.
+    """
+    pieces = []
     with contextlib.redirect_stdout(None):
-        soup = BeautifulSoup(html, 'html.parser')
-    result = soup.get_text()
+        for event, element in BeautifulSoup.iterparse(html, 'html.parser', from_encoding=from_encoding):
+            if event is Tag.START_ELEMENT_EVENT:
+                continue
+            # The same strings soup.get_text() returns; script and style contents are skipped
+            if type(element) in Tag.MAIN_CONTENT_STRING_TYPES:
+                pieces.append(str(element))
+            element.decompose()
+    result = "".join(pieces)
     print(result)
     return result
 
 # Define tool for LLM completion
-def llm_completion(env: Environment, messages: list) -> str:
+def llm_completion(env: Environment, messages: list, stage: str = "llm", event: str = None) -> str:
     """Gets an LLM completion from the environment."""
+    METRICS.inc("llm_calls", event=event, stage=stage)
+    tokens_in = sum(estimate_tokens(str(m.get("content", "")) if isinstance(m, dict) else str(m)) for m in messages)
+    METRICS.inc("llm_tokens_in", tokens_in, event=event, stage=stage)
     try:
-        return env.completion(messages)
+        with METRICS.timer(stage, event=event):
+            response = env.completion(messages)
+        METRICS.inc("llm_tokens_out", estimate_tokens(response), event=event, stage=stage)
+        return response
     except Exception as e:
+        METRICS.inc("llm_errors", stage=stage)
         return f"Error during LLM completion: {e}"
 
 def run(env: Environment):
+    METRICS.reset()
+
     # Register tools
     env.get_tool_registry().register_tool(fetch_url)
     env.get_tool_registry().register_tool(extract_text_from_html)
@@ -76,13 +158,17 @@ def run(env: Environment):
             if any(file.filename == ical_file for file in files):
                 # Read from file
                 print(f"Reading iCal data from {ical_file}")
+                METRICS.inc("cache_hits", cache="ical")
                 ical_data = env.read_file(ical_file)
-                events = parse_ical_data(ical_data)
+                with METRICS.timer("parse_ical"):
+                    events = parse_ical_data(ical_data)
             else:
                 # 1. Fetch iCal data
                 ical_url = ICAL_URL
+                METRICS.inc("cache_misses", cache="ical")
                 try:
-                    ical_data = fetch_url(ical_url)
+                    with METRICS.timer("fetch_ical"):
+                        ical_data = fetch_url(ical_url)
                     if "Error" in ical_data:
                         print(ical_data)
                         return
@@ -92,7 +178,8 @@ def run(env: Environment):
 
                 # 2. Parse iCal data
                 try:
-                    events = parse_ical_data(ical_data)
+                    with METRICS.timer("parse_ical"):
+                        events = parse_ical_data(ical_data)
                 except Exception as e:
                     print(f"Error parsing iCal data: {e}")
                     return
@@ -105,7 +192,36 @@ def run(env: Environment):
             print(f"Error handling file: {e}")
             return
 
-        # 4. Filter events
+        food_classifier = FoodClassifier.load()
+
+        # 4. Filter events by time window and location before spending inference
+        geocode_cache = GeocodeCache()
+        try:
+            if any(file.filename == GEOCODE_CACHE_FILE for file in env.list_files_from_thread()):
+                geocode_cache = GeocodeCache.from_json(env.read_file(GEOCODE_CACHE_FILE))
+        except Exception as e:
+            print(f"Error loading geocode cache: {e}")
+
+        METRICS.inc("events_parsed", len(events))
+        with METRICS.timer("prefilter"):
+            events = prefilter_events(
+                events,
+                window_hours=PREFILTER_WINDOW_HOURS,
+                center=PREFILTER_CENTER,
+                radius_km=PREFILTER_RADIUS_KM,
+                neighborhoods=PREFILTER_NEIGHBORHOODS,
+                geocode_cache=geocode_cache,
+            )
+        print(f"{len(events)} events left after prefiltering")
+        METRICS.inc("events_prefiltered", len(events))
+        METRICS.inc("cache_hits", geocode_cache.hits, cache="geocode")
+        METRICS.inc("cache_misses", geocode_cache.misses, cache="geocode")
+
+        try:
+            env.write_file(GEOCODE_CACHE_FILE, geocode_cache.to_json())
+        except Exception as e:
+            print(f"Error saving geocode cache: {e}")
+
         num_events = len(events)
         start_index = 0
         events_processed_count = 0 #Counter to track total events processed
@@ -132,24 +248,28 @@ def run(env: Environment):
                     "content": "Parse the event name and description and return only true/false and nothing else. true if the description suggests there's a good chance of free food, false otherwise. event description doesn't need to mention food, still return true if the type of events may have free food."
                 }
                 user_message_initial = {"role": "user", "content": str(summary)+str(description)}
-                
-                llm_response_initial = llm_completion(env, [system_message_initial, user_message_initial])
-                print("Initial LLM Response:")
-                pprint.pp(llm_response_initial)
+
+                # Obvious cases are screened locally; only ambiguous ones go to the LLM
+                with METRICS.timer("classify", event=summary):
+                    has_food, confidence = food_classifier.classify(summary, description)
+                METRICS.inc("classifier_decisions", event=summary, decision=str(has_food).lower())
+                if has_food is None:
+                    llm_response_initial = llm_completion(env, [system_message_initial, user_message_initial], stage="llm_initial", event=summary)
+                    print("Initial LLM Response:")
+                    pprint.pp(llm_response_initial)
+                else:
+                    llm_response_initial = "true" if has_food else "false"
+                    print(f"Pre-classifier says {llm_response_initial} (p={confidence:.2f}), skipping initial LLM check")
 
                 if llm_response_initial.lower() == "true":
                     print(f"LLM (initial) says potential free food based on description: {summary}")
                     if url and str(url).startswith("https://"):
-                        # 6. Fetch event details
-                        event_html = fetch_url(str(url))
-                        if False and "Error" in event_html:
-                            print(event_html)
+                        # 6-7. Fetch event details, extracting the text as the page downloads
+                        event_text = fetch_page_text(str(url), event=summary)
+                        if False and "Error" in event_text:
+                            print(event_text)
                             continue
 
-                        # 7. Extract text from HTML
-                        with contextlib.redirect_stdout(None):
-                            event_text = extract_text_from_html(event_html)
-
                         # 8. Final LLM check on full event details
                         system_message_final = {
                             "role": "system",
@@ -157,7 +277,7 @@ def run(env: Environment):
                         }
                         user_message_final = {"role": "user", "content": event_text}
                         
-                        llm_response_final = llm_completion(env, [system_message_final, user_message_final])
+                        llm_response_final = llm_completion(env, [system_message_final, user_message_final], stage="llm_final", event=summary)
                         print("Final LLM Response:")
                         pprint.pp(llm_response_final)
 
@@ -209,6 +329,7 @@ def run(env: Environment):
                     processed_events.append(event_data)
                 
                 events_processed_count += 1 #Increment event counter
+                METRICS.inc("events_processed")
             start_index += 1
 
         # Save the updated summaries
@@ -232,9 +353,16 @@ def run(env: Environment):
     }
 
     # Make the final LLM call
-    final_llm_response = llm_completion(env, [prompt, final_prompt] + env.list_messages())
+    final_llm_response = llm_completion(env, [prompt, final_prompt] + env.list_messages(), stage="llm_summary")
     print("Final LLM Response:")
     pprint.pp(final_llm_response)
+
+    # Save the run report next to the summaries
+    try:
+        env.write_file(RUN_REPORT_FILE, METRICS.to_json())
+    except Exception as e:
+        print(f"Error saving run report: {e}")
+
     env.add_reply(final_llm_response)
     env.request_user_input()
 
@@ -0,0 +1,99 @@
+import argparse
+import contextlib
+import json
+import platform
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import requests
+from bs4 import BeautifulSoup
+
+from food_classifier import FoodClassifier
+from ical_parser import parse_ical_data
+from synthetic_feed import SyntheticFeedServer
+
+SIZES = [10, 100, 1000, 10000, 100000]
+MAX_PAGES = 100  # Event pages fetched and extracted per size
+
+
+def benchmark_size(n: int, max_pages: int = MAX_PAGES, seed: int = 42) -> Dict:
+    """
+    Times each pipeline stage against a local synthetic feed of `n` events.
+
+    Fetch and extract cover at most `max_pages` event pages; parse and
+    classify cover the whole feed.
+    """
+    result = {"events": n}
+    with SyntheticFeedServer(n, seed=seed) as server:
+        session = requests.Session()
+
+        start = time.perf_counter()
+        ical_data = session.get(server.ical_url).text
+        result["fetch_feed_seconds"] = time.perf_counter() - start
+        result["feed_bytes"] = len(ical_data.encode("utf-8"))
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            events = parse_ical_data(ical_data)
+        result["parse_seconds"] = time.perf_counter() - start
+        result["parsed_events"] = len(events)
+
+        urls = [event["URL"] for event in events if "URL" in event][:max_pages]
+        pages = []
+        start = time.perf_counter()
+        for url in urls:
+            pages.append(session.get(url).text)
+        result["fetch_pages"] = len(pages)
+        result["fetch_pages_seconds"] = time.perf_counter() - start
+        result["page_bytes"] = sum(len(page.encode("utf-8")) for page in pages)
+
+        start = time.perf_counter()
+        for page in pages:
+            BeautifulSoup(page, "html.parser").get_text()
+        result["extract_seconds"] = time.perf_counter() - start
+
+        classifier = FoodClassifier.load()
+        decisions = {True: 0, False: 0, None: 0}
+        start = time.perf_counter()
+        for event in events:
+            decision, _ = classifier.classify(event.get("SUMMARY"), event.get("DESCRIPTION"))
+            decisions[decision] += 1
+        result["classify_seconds"] = time.perf_counter() - start
+        result["classified_true"] = decisions[True]
+        result["classified_false"] = decisions[False]
+        result["sent_to_llm"] = decisions[None]
+
+    for stage, count in (("parse", n), ("fetch_pages", len(pages)), ("extract", len(pages)), ("classify", n)):
+        result[f"{stage}_seconds_per_item"] = result[f"{stage}_seconds"] / count if count else 0.0
+    return result
+
+
+def run_benchmarks(sizes: List[int], max_pages: int = MAX_PAGES, seed: int = 42) -> Dict:
+    """Runs benchmark_size() for each size and wraps the results in a report."""
+    results = []
+    for n in sizes:
+        print(f"Benchmarking {n} events")
+        results.append(benchmark_size(n, max_pages, seed))
+    return {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "max_pages": max_pages,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time parse, fetch, extract and classify on synthetic feeds.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="pipeline_benchmark.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.max_pages, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
@@ -50,7 +50,7 @@ __all__ = [
     "XMLParsedAsHTMLWarning",
 ]
 
-from collections import Counter
+from collections import Counter, deque
 import sys
 import warnings
 
@@ -66,7 +66,7 @@ from .builder import (
     TreeBuilder,
 )
 from .builder._htmlparser import HTMLParserTreeBuilder
-from .dammit import UnicodeDammit
+from .dammit import IncrementalUnicodeDammit, UnicodeDammit
 from .css import CSS
 from ._deprecation import (
     _deprecated,
@@ -86,8 +86,12 @@ from .element import (
     Stylesheet,
     Tag,
     TemplateString,
+    _ElementIndex,
+    _TagConfiguration,
+    _indexes,
 )
 from .formatter import Formatter
+from .serialize import dumps as _dump_tree, _load_into
 from .filter import (
     ElementFilter,
     SoupStrainer,
@@ -96,11 +100,16 @@ from typing import (
     Any,
     cast,
     Counter as CounterType,
+    Deque,
     Dict,
+    IO,
+    Iterable,
     Iterator,
     List,
     Sequence,
+    Set,
     Optional,
+    Tuple,
     Type,
     Union,
 )
@@ -129,6 +138,90 @@ from bs4._warnings import (
     XMLParsedAsHTMLWarning,
 )
 
+# What BeautifulSoup._tag_name_info() knows about a tag name:
+# (can_be_empty_element, interesting_string_types, preserves_whitespace,
+# has_string_container).
+_TagNameInfo = Tuple[bool, Optional[Set[Type[NavigableString]]], bool, bool]
+
+# An event yielded by BeautifulSoup.iterparse().
+_ParseEvent = Tuple[Tag._TreeTraversalEvent, PageElement]
+
+
+def _iterparse_chunks(
+    source: Union[_RawMarkup, IO[Any], Iterable[_RawMarkup]], chunk_size: int
+) -> Iterator[_RawMarkup]:
+    """Split the source of a BeautifulSoup.iterparse() call into
+    chunks.
+    """
+    if isinstance(source, (bytes, str)):
+        for i in range(0, len(source), chunk_size):
+            yield source[i : i + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
+
+
+class _IncrementalParse(object):
+    """Keeps track of a document that's being passed into
+    `BeautifulSoup.feed` a chunk at a time.
+    """
+
+    def __init__(
+        self,
+        from_encoding: Optional[_Encoding],
+        exclude_encodings: Optional[_Encodings],
+        streaming: bool,
+    ):
+        self.from_encoding = from_encoding
+        self.exclude_encodings = exclude_encodings
+        self.streaming = streaming
+        self.chunk_type: Optional[type] = None
+        self.chunks: List[_RawMarkup] = []
+        self.dammit: Optional[IncrementalUnicodeDammit] = None
+
+    def check_type(self, markup: _RawMarkup) -> None:
+        if not isinstance(markup, (bytes, str)):
+            raise TypeError(
+                f"Incoming markup is of an invalid type: {markup!r}. Markup must be a string or a bytestring."
+            )
+        if self.chunk_type is None:
+            self.chunk_type = type(markup)
+        elif not isinstance(markup, self.chunk_type):
+            raise TypeError(
+                "All chunks of a document must be bytestrings, or all chunks must be Unicode strings."
+            )
+
+    def decode(
+        self, soup: "BeautifulSoup", markup: bytes, final: bool = False
+    ) -> str:
+        """Convert a chunk of a bytestring document to Unicode,
+        choosing an encoding if that hasn't been done yet.
+        """
+        if self.chunk_type is not bytes:
+            return ""
+        if self.dammit is None:
+            known_definite_encodings = []
+            if self.from_encoding:
+                known_definite_encodings.append(self.from_encoding)
+            self.dammit = IncrementalUnicodeDammit(
+                known_definite_encodings=known_definite_encodings,
+                is_html=not soup.is_xml,
+                exclude_encodings=self.exclude_encodings,
+            )
+        text = self.dammit.decode(markup, final)
+        soup.original_encoding = self.dammit.original_encoding
+        soup.declared_html_encoding = self.dammit.declared_html_encoding
+        soup.contains_replacement_characters = (
+            self.dammit.contains_replacement_characters
+        )
+        return text
+
 
 class BeautifulSoup(Tag):
     """A data structure representing a parsed HTML or XML document.
@@ -191,6 +284,23 @@ class BeautifulSoup(Tag):
     string_container_stack: List[Tag]  #: :meta private:
     _most_recent_element: Optional[PageElement]  #: :meta private:
 
+    # These support the fast path through handle_starttag(). See
+    # _reset_fast_path().
+    _fast_path: bool  #: :meta private:
+    _fast_path_configuration: Optional[_TagConfiguration]  #: :meta private:
+    _tag_name_table: Dict[str, _TagNameInfo]  #: :meta private:
+
+    # The state of a document being parsed with feed() and close().
+    _incremental: Optional[_IncrementalParse]  #: :meta private:
+
+    # Parse events waiting to be yielded by iterparse(), or None if
+    # nobody is listening for them.
+    _parse_events: Optional[Deque[_ParseEvent]]  #: :meta private:
+
+    #: The default number of characters or bytes `BeautifulSoup.iterparse`
+    #: reads from its source at a time.
+    ITERPARSE_CHUNK_SIZE: int = 65536
+
     #: Beautiful Soup's best guess as to the character encoding of the
     #: original document.
     original_encoding: Optional[_Encoding]
@@ -435,6 +545,8 @@ class BeautifulSoup(Tag):
         self.known_xml = self.is_xml
         self._namespaces = dict()
         self.parse_only = parse_only
+        self._incremental = None
+        self._parse_events = None
 
         if hasattr(markup, "read"):  # It's a file-type object.
             markup = markup.read()
@@ -457,6 +569,17 @@ class BeautifulSoup(Tag):
         # it was a file-type object, we've read from it.
         markup = cast(_RawMarkup, markup)
 
+        self._parse(markup, from_encoding, exclude_encodings)
+
+    def _parse(
+        self,
+        markup: _RawMarkup,
+        from_encoding: Optional[_Encoding],
+        exclude_encodings: Optional[_Encodings],
+    ) -> None:
+        """Convert a complete document to Unicode if necessary, and
+        parse it.
+        """
         rejections = []
         success = False
         for (
@@ -489,6 +612,272 @@ class BeautifulSoup(Tag):
         self.markup = None
         self.builder.soup = None
 
+    @classmethod
+    def incremental(
+        cls,
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[SoupStrainer] = None,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        **kwargs: Any,
+    ) -> "BeautifulSoup":
+        """Create a `BeautifulSoup` object that parses a document as it
+        arrives, a chunk at a time.
+
+        Pass each chunk into `BeautifulSoup.feed`, then call
+        `BeautifulSoup.close` once the whole document has been
+        received::
+
+         soup = BeautifulSoup.incremental("html.parser")
+         for chunk in response.iter_content(chunk_size=16384):
+             soup.feed(chunk)
+         soup.close()
+
+        Chunks may be bytestrings or Unicode strings, but not a mix of
+        the two. If they're bytestrings, the document's encoding is
+        chosen from its first kilobyte, using the same rules as the
+        `BeautifulSoup` constructor.
+
+        If the tree builder can't parse a partial document (see
+        `TreeBuilder.CAN_FEED_INCREMENTALLY`), the chunks are saved up
+        and the document is parsed all at once when
+        `BeautifulSoup.close` is called.
+
+        All arguments have the same meaning as in the `BeautifulSoup`
+        constructor.
+        """
+        # The encoding arguments aren't used until there's some
+        # markup to decode.
+        soup = cls(
+            "",
+            features,
+            builder,
+            parse_only,
+            element_classes=element_classes,
+            **kwargs,
+        )
+        soup._incremental = _IncrementalParse(
+            from_encoding, exclude_encodings, soup.builder.CAN_FEED_INCREMENTALLY
+        )
+        if soup._incremental.streaming:
+            soup.original_encoding = None
+            soup.declared_html_encoding = None
+            soup.contains_replacement_characters = False
+            soup.reset()
+            soup.builder.initialize_soup(soup)
+            soup.builder.reset()
+        return soup
+
+    def feed(self, markup: _RawMarkup) -> None:
+        """Parse the next chunk of a document.
+
+        This only works on objects created with
+        `BeautifulSoup.incremental`.
+
+        :param markup: The next chunk of the document. This may end
+            partway through a tag, or even partway through a
+            character.
+        """
+        incremental = self._check_incremental("feed")
+        incremental.check_type(markup)
+        self._invalidate_index()
+        if not incremental.streaming:
+            incremental.chunks.append(markup)
+            return
+        if isinstance(markup, bytes):
+            markup = incremental.decode(self, markup)
+        if markup:
+            self.builder.feed_incremental(markup)
+
+    def close(self) -> None:
+        """Finish parsing a document that was passed in through
+        `BeautifulSoup.feed`.
+        """
+        incremental = self._check_incremental("close")
+        self._incremental = None
+        self._invalidate_index()
+        if not incremental.streaming:
+            markup: _RawMarkup = ""
+            if incremental.chunks:
+                markup = incremental.chunks[0][:0].join(incremental.chunks)
+            self._parse(
+                markup, incremental.from_encoding, incremental.exclude_encodings
+            )
+            return
+
+        rest = incremental.decode(self, b"", final=True)
+        if rest:
+            self.builder.feed_incremental(rest)
+        self.builder.close_incremental()
+
+        # Close out any unfinished strings and close all the open tags.
+        self.endData()
+        while (
+            self.currentTag is not None and self.currentTag.name != self.ROOT_TAG_NAME
+        ):
+            self.popTag()
+
+        # Remove the builder's circular reference to this object.
+        self.builder.soup = None
+
+    @classmethod
+    def iterparse(
+        cls,
+        source: Union[_RawMarkup, IO[Any], Iterable[_RawMarkup]],
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[SoupStrainer] = None,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        chunk_size: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Iterator[_ParseEvent]:
+        """Parse a document, yielding an (event, element) 2-tuple as
+        each part of the tree is built.
+
+        The events are the ones yielded by `Tag._event_stream`, except
+        that there are no ``EMPTY_ELEMENT_EVENT`` events, since it
+        isn't known whether a tag is empty until it's closed:
+
+        * ``Tag.START_ELEMENT_EVENT``: A `Tag` was opened. Its
+          attributes are set, but its contents haven't been parsed yet.
+        * ``Tag.END_ELEMENT_EVENT``: A `Tag` and everything inside it
+          have been parsed.
+        * ``Tag.STRING_ELEMENT_EVENT``: A `NavigableString` (or a
+          subclass such as `Comment`) has been parsed.
+
+        Once an element's END_ELEMENT_EVENT or STRING_ELEMENT_EVENT
+        has been received, you can remove it from the tree with
+        `PageElement.decompose` or `PageElement.extract`. If you
+        remove every element you're done with, memory use depends on
+        how deeply the document is nested, not on how big it is::
+
+         for event, element in BeautifulSoup.iterparse(f, "html.parser"):
+             if event is Tag.STRING_ELEMENT_EVENT:
+                 print(element)
+             if event is not Tag.START_ELEMENT_EVENT:
+                 element.decompose()
+
+        Don't remove a tag that's still open; the parser will keep
+        adding to it.
+
+        The document is parsed a chunk at a time, as described in
+        `BeautifulSoup.incremental`. If the tree builder can't parse a
+        partial document, the whole document is parsed before the
+        first event is yielded.
+
+        :param source: The document. This may be a string, a
+            bytestring, an open filehandle, or an iterable of chunks
+            (such as the ``iter_content()`` of a streamed HTTP
+            response).
+        :param chunk_size: How many characters or bytes to read from
+            `source` at a time. Defaults to `ITERPARSE_CHUNK_SIZE`.
+
+        All other arguments have the same meaning as in the
+        `BeautifulSoup` constructor.
+        """
+        soup = cls.incremental(
+            features,
+            builder,
+            parse_only,
+            from_encoding,
+            exclude_encodings,
+            element_classes,
+            **kwargs,
+        )
+        chunks = _iterparse_chunks(source, chunk_size or cls.ITERPARSE_CHUNK_SIZE)
+        if not soup._check_incremental("iterparse").streaming:
+            for chunk in chunks:
+                soup.feed(chunk)
+            soup.close()
+            # The tree is already built, so replay it. The events are
+            # gathered up front in case the caller removes elements.
+            for event, element in list(soup._event_stream()):
+                if event is Tag.EMPTY_ELEMENT_EVENT:
+                    yield Tag.START_ELEMENT_EVENT, element
+                    yield Tag.END_ELEMENT_EVENT, element
+                elif element is not soup:
+                    yield event, element
+            return
+
+        events: Deque[_ParseEvent] = deque()
+        soup._parse_events = events
+        try:
+            for chunk in chunks:
+                soup.feed(chunk)
+                while events:
+                    yield events.popleft()
+                soup._reattach_most_recent_element()
+            soup.close()
+            while events:
+                yield events.popleft()
+        finally:
+            soup._parse_events = None
+
+    def _reattach_most_recent_element(self) -> None:
+        """If the most recently parsed element was removed from the
+        tree by an iterparse() caller, find the element that the next
+        element to be parsed should come after.
+        """
+        top = self._most_recent_element
+        if top is None:
+            return
+        # Decomposed strings don't even have a .parent.
+        while getattr(top, "parent", None) is not None:
+            top = top.parent
+        if top is not self:
+            self._most_recent_element = self._last_descendant(is_initialized=False)
+
+    def enable_index(self) -> None:
+        """Keep an index of the tags in this document by name, id and
+        CSS class.
+
+        Once the index is built, `Tag.find_all` (and everything based
+        on it, such as `Tag.find`) only looks at the tags that have the
+        requested name, id or class, rather than every tag in the
+        document. `Tag.select` and the other CSS methods use the index
+        the same way, when the last part of each selector names a tag,
+        an id or a class. This makes repeated searches of a large
+        document much faster.
+
+        The index is built the first time it's needed, and kept up to
+        date as elements are removed from the tree. Adding elements to
+        the tree, changing a tag's "id" or "class" through
+        ``tag[attribute]``, or changing a multi-valued "class" in
+        place (``tag['class'].append('new')``), means the index is
+        rebuilt the next time it's used. Changes made in other ways,
+        such as renaming a tag, modifying ``tag.attrs`` directly, or
+        changing a plain `list` you assigned to ``tag['class']``,
+        aren't noticed; call this method again to rebuild the index
+        after making them.
+        """
+        index = _ElementIndex(self)
+        self._element_index = index
+        _indexes.add(index)
+
+    def disable_index(self) -> None:
+        """Stop keeping the index created by `BeautifulSoup.enable_index`."""
+        index = self._element_index
+        if index is not None:
+            _indexes.discard(index)
+            self._element_index = None
+
+    def _invalidate_index(self) -> None:
+        index = self._element_index
+        if index is not None:
+            index.invalidate()
+
+    def _check_incremental(self, method: str) -> _IncrementalParse:
+        incremental = self._incremental
+        if incremental is None:
+            raise ValueError(
+                f"{method}() can only be called on a BeautifulSoup object created with BeautifulSoup.incremental(), before close() is called."
+            )
+        return incremental
+
     def copy_self(self) -> "BeautifulSoup":
         """Create a new BeautifulSoup object with the same TreeBuilder,
         but not associated with any markup.
@@ -507,18 +896,26 @@ class BeautifulSoup(Tag):
         d = dict(self.__dict__)
         if "builder" in d and d["builder"] is not None and not self.builder.picklable:
             d["builder"] = type(self.builder)
-        # Store the contents as a Unicode string.
+        # Store the contents in the compact format from bs4.serialize,
+        # which can be loaded without parsing the document again.
         d["contents"] = []
-        d["markup"] = self.decode()
+        d["tree"] = _dump_tree(self)
 
         # If _most_recent_element is present, it's a Tag object left
         # over from initial parse. It might not be picklable and we
         # don't need it.
         if "_most_recent_element" in d:
             del d["_most_recent_element"]
+
+        # An index can be rebuilt, so there's no need to store it.
+        d.pop("_element_index", None)
         return d
 
     def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Tag's slotted attributes can't be restored through __dict__.
+        for attr in Tag.__slots__:
+            if attr in state:
+                setattr(self, attr, state.pop(attr))
         # If necessary, restore the TreeBuilder by looking it up.
         self.__dict__ = state
         if isinstance(self.builder, type):
@@ -529,7 +926,13 @@ class BeautifulSoup(Tag):
             self.builder = HTMLParserTreeBuilder()
         self.builder.soup = self
         self.reset()
-        self._feed()
+        tree = self.__dict__.pop("tree", None)
+        if tree is not None:
+            _load_into(self, tree)
+        else:
+            # This was pickled by an older version, which stored the
+            # document as markup.
+            self._feed()
 
     @classmethod
     @_deprecated(
@@ -678,6 +1081,56 @@ class BeautifulSoup(Tag):
         self.string_container_stack = []
         self._most_recent_element = None
         self.pushTag(self)
+        self._reset_fast_path()
+        self._invalidate_index()
+
+    def _reset_fast_path(self) -> None:
+        """Decide whether handle_starttag() can take its fast path
+        for this parse.
+
+        The fast path creates `Tag` objects without going through
+        `Tag.__init__`, using information about each tag name that's
+        looked up once per parse instead of once per tag. It's only
+        used in the most common case: the html.parser tree builder, no
+        `SoupStrainer`, and no custom element classes.
+        """
+        self._tag_name_table = {}
+        self._fast_path = (
+            type(self.builder) is HTMLParserTreeBuilder
+            and self.parse_only is None
+            and not self.element_classes
+        )
+        if self._fast_path:
+            self._fast_path_configuration = _TagConfiguration.for_builder(
+                self.builder, self.__class__
+            )
+        else:
+            self._fast_path_configuration = None
+
+    def _tag_name_info(self, name: str) -> _TagNameInfo:
+        """Look up everything the fast path needs to know about tags
+        with a given name.
+
+        :return: A 4-tuple (can_be_empty_element,
+           interesting_string_types, preserves_whitespace,
+           has_string_container).
+        """
+        info = self._tag_name_table.get(name)
+        if info is None:
+            builder = self.builder
+            if name in builder.string_containers:
+                interesting_string_types: Set[Type[NavigableString]] = {
+                    builder.string_containers[name]
+                }
+            else:
+                interesting_string_types = Tag.MAIN_CONTENT_STRING_TYPES
+            info = self._tag_name_table[name] = (
+                builder.can_be_empty_element(name),
+                interesting_string_types,
+                name in builder.preserve_whitespace_tags,
+                name in builder.string_containers,
+            )
+        return info
 
     def new_tag(
         self,
@@ -796,11 +1249,13 @@ class BeautifulSoup(Tag):
             self.open_tag_counter[tag.name] -= 1
         if (
             self.preserve_whitespace_tag_stack
-            and tag == self.preserve_whitespace_tag_stack[-1]
+            and tag is self.preserve_whitespace_tag_stack[-1]
         ):
             self.preserve_whitespace_tag_stack.pop()
-        if self.string_container_stack and tag == self.string_container_stack[-1]:
+        if self.string_container_stack and tag is self.string_container_stack[-1]:
             self.string_container_stack.pop()
+        if self._parse_events is not None:
+            self._parse_events.append((Tag.END_ELEMENT_EVENT, tag))
         # print("Pop", tag.name)
         if self.tagStack:
             self.currentTag = self.tagStack[-1]
@@ -837,21 +1292,21 @@ class BeautifulSoup(Tag):
             # If whitespace is not preserved, and this string contains
             # nothing but ASCII spaces, replace it with a single space
             # or newline.
-            if not self.preserve_whitespace_tag_stack:
-                strippable = True
-                for i in current_data:
-                    if i not in self.ASCII_SPACES:
-                        strippable = False
-                        break
-                if strippable:
-                    if "\n" in current_data:
-                        current_data = "\n"
-                    else:
-                        current_data = " "
+            if not self.preserve_whitespace_tag_stack and not current_data.strip(
+                self.ASCII_SPACES
+            ):
+                if "\n" in current_data:
+                    current_data = "\n"
+                else:
+                    current_data = " "
 
             # Reset the data collector.
             self.current_data = []
 
+            if self._fast_path:
+                self._fast_string_was_parsed(current_data, containerClass)
+                return
+
             # Should we add this string to the tree at all?
             if (
                 self.parse_only
@@ -864,6 +1319,44 @@ class BeautifulSoup(Tag):
             o = containerClass(current_data)
             self.object_was_parsed(o)
 
+    def _fast_string_was_parsed(
+        self, data: str, containerClass: Optional[Type[NavigableString]]
+    ) -> None:
+        """The fast path through endData(). This does the work of
+        string_container() and object_was_parsed() for a new string.
+
+        :meta private:
+        """
+        container = containerClass or NavigableString
+        if self.string_container_stack and container is NavigableString:
+            container = self.builder.string_containers.get(
+                self.string_container_stack[-1].name, container
+            )
+        o = container(data)
+
+        parent = cast(Tag, self.currentTag)
+        previous = self._most_recent_element
+        fix = parent.next_element is not None
+
+        # This is PageElement.setup() for a string that has no next
+        # elements or siblings yet.
+        o.parent = parent
+        o.previous_element = previous
+        if previous is not None:
+            previous.next_element = o
+        contents = parent.contents
+        if contents:
+            previous_sibling = contents[-1]
+            o.previous_sibling = previous_sibling
+            previous_sibling.next_sibling = o
+
+        self._most_recent_element = o
+        contents.append(o)
+        if fix:
+            self._linkage_fixer(parent)
+        if self._parse_events is not None:
+            self._parse_events.append((Tag.STRING_ELEMENT_EVENT, o))
+
     def object_was_parsed(
         self,
         o: PageElement,
@@ -902,6 +1395,8 @@ class BeautifulSoup(Tag):
         # Check if we are inserting into an already parsed node.
         if fix:
             self._linkage_fixer(parent)
+        if self._parse_events is not None and isinstance(o, NavigableString):
+            self._parse_events.append((Tag.STRING_ELEMENT_EVENT, o))
 
     def _linkage_fixer(self, el: Tag) -> None:
         """Make sure linkage of this fragment is sound."""
@@ -1018,6 +1513,11 @@ class BeautifulSoup(Tag):
         # print("Start tag %s: %s" % (name, attrs))
         self.endData()
 
+        if self._fast_path:
+            return self._fast_handle_starttag(
+                name, namespace, nsprefix, attrs, sourceline, sourcepos, namespaces
+            )
+
         if (
             self.parse_only
             and len(self.tagStack) <= 1
@@ -1048,6 +1548,89 @@ class BeautifulSoup(Tag):
             self._most_recent_element.next_element = tag
         self._most_recent_element = tag
         self.pushTag(tag)
+        if self._parse_events is not None:
+            self._parse_events.append((Tag.START_ELEMENT_EVENT, tag))
+        return tag
+
+    def _fast_handle_starttag(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: _RawAttributeValues,
+        sourceline: Optional[int],
+        sourcepos: Optional[int],
+        namespaces: Optional[Dict[str, str]],
+    ) -> Tag:
+        """The fast path through handle_starttag(). This does the work
+        of `Tag.__init__` and pushTag() without asking the
+        `TreeBuilder` the same questions over and over.
+
+        NOTE: This needs to be kept in sync with Tag.__init__.
+
+        :meta private:
+        """
+        (
+            can_be_empty_element,
+            interesting_string_types,
+            preserves_whitespace,
+            has_string_container,
+        ) = self._tag_name_info(name)
+        builder = self.builder
+        parent = self.currentTag
+        previous = self._most_recent_element
+
+        tag = Tag.__new__(Tag)
+        tag._configuration = cast(_TagConfiguration, self._fast_path_configuration)
+        tag._decomposed = False
+        tag._structural_hash = None
+        tag.name = name
+        tag.namespace = namespace
+        tag._namespaces = namespaces or {}
+        tag.prefix = nsprefix
+        tag.sourceline = sourceline
+        tag.sourcepos = sourcepos
+        if builder.cdata_list_attributes:
+            tag.attrs = builder._replace_cdata_list_attribute_values(name, attrs)
+        else:
+            tag.attrs = builder.attribute_dict_class(attrs)
+        tag.contents = []
+        tag.hidden = False
+        tag.can_be_empty_element = can_be_empty_element
+        tag.interesting_string_types = interesting_string_types
+
+        # This is PageElement.setup() for the case where there are
+        # no next elements or siblings yet.
+        tag.parent = parent
+        tag.previous_element = previous
+        tag.next_element = None
+        tag.next_sibling = None
+        if parent is not None and parent.contents:
+            previous_sibling = parent.contents[-1]
+            tag.previous_sibling = previous_sibling
+            previous_sibling.next_sibling = tag
+        else:
+            tag.previous_sibling = None
+        if previous is not None:
+            previous.next_element = tag
+
+        if name == "meta":
+            builder.set_up_substitutions(tag)
+        if self._parse_events is not None:
+            self._parse_events.append((Tag.START_ELEMENT_EVENT, tag))
+
+        self._most_recent_element = tag
+
+        # This is pushTag().
+        if parent is not None:
+            parent.contents.append(tag)
+        self.tagStack.append(tag)
+        self.currentTag = tag
+        self.open_tag_counter[name] += 1
+        if preserves_whitespace:
+            self.preserve_whitespace_tag_stack.append(tag)
+        if has_string_container:
+            self.string_container_stack.append(tag)
         return tag
 
     def handle_endtag(self, name: str, nsprefix: Optional[str] = None) -> None:
@@ -31,7 +31,6 @@ from bs4.element import (
     Stylesheet,
     Script,
     TemplateString,
-    nonwhitespace_re,
 )
 
 # Exceptions were moved to their own module in 4.13. Import here for
@@ -52,7 +51,6 @@ if TYPE_CHECKING:
         Tag,
     )
     from bs4._typing import (
-        _AttributeValue,
         _Encoding,
         _Encodings,
         _RawOrProcessedAttributeValues,
@@ -233,6 +231,7 @@ class TreeBuilder(object):
         self.string_containers = string_containers
         self.attribute_dict_class = attribute_dict_class
         self.attribute_value_list_class = attribute_value_list_class
+        self._attribute_value_tokens = {}
 
     NAME: str = "[Unknown tree builder]"
     ALTERNATE_NAMES: Iterable[str] = []
@@ -243,6 +242,14 @@ class TreeBuilder(object):
 
     soup: Optional[BeautifulSoup]  #: :meta private:
 
+    #: The most distinct multi-valued attribute values whose tokens
+    #: will be remembered, so that the same value can be split again
+    #: quickly. The same few 'class' values tend to be used over and
+    #: over again in a document.
+    ATTRIBUTE_VALUE_CACHE_SIZE: int = 4096
+
+    _attribute_value_tokens: Dict[str, Tuple[str, ...]]
+
     #: A tag will be considered an empty-element
     #: tag when and only when it has no contents.
     empty_element_tags: Optional[Set[str]] = None  #: :meta private:
@@ -271,6 +278,12 @@ class TreeBuilder(object):
     #: Most parsers don't keep track of line numbers.
     TRACKS_LINE_NUMBERS: bool = False
 
+    #: Can this builder parse a document a chunk at a time, as it
+    #: arrives? If not, `BeautifulSoup.feed` saves up the chunks and
+    #: the whole document is parsed when `BeautifulSoup.close` is
+    #: called.
+    CAN_FEED_INCREMENTALLY: bool = False
+
     def initialize_soup(self, soup: BeautifulSoup) -> None:
         """The BeautifulSoup object has been initialized and is now
         being associated with the TreeBuilder.
@@ -314,6 +327,23 @@ class TreeBuilder(object):
         """Run incoming markup through some parsing process."""
         raise NotImplementedError()
 
+    def feed_incremental(self, markup: str) -> None:
+        """Run the next chunk of a document through the parser.
+
+        This is only called on builders where `CAN_FEED_INCREMENTALLY`
+        is True, after `initialize_soup` and `reset`.
+
+        :param markup: The next chunk of the document, as Unicode. It
+            may end partway through a tag.
+        """
+        raise NotImplementedError()
+
+    def close_incremental(self) -> None:
+        """Finish parsing a document that was passed in through
+        `feed_incremental`.
+        """
+        raise NotImplementedError()
+
     def prepare_markup(
         self,
         markup: _RawMarkup,
@@ -408,31 +438,39 @@ class TreeBuilder(object):
         # the attribute values.
         universal: Set[str] = self.cdata_list_attributes.get("*", set())
         tag_specific = self.cdata_list_attributes.get(tag_name.lower(), None)
-        for attr in list(modified_attrs.keys()):
-            modified_value: _AttributeValue
+        token_cache = self._attribute_value_tokens
+        # Only the values of existing keys are replaced, so it's safe
+        # to change the dictionary while iterating over it.
+        for attr, original_value in modified_attrs.items():
             if attr in universal or (tag_specific and attr in tag_specific):
                 # We have a "class"-type attribute whose string
                 # value is a whitespace-separated list of
                 # values. Split it into a list.
-                original_value: _AttributeValue = modified_attrs[attr]
                 if isinstance(original_value, _RawAttributeValue):
                     # This is a _RawAttributeValue (a string) that
                     # needs to be split and converted to a
                     # AttributeValueList so it can be an
                     # _AttributeValue.
-                    modified_value = self.attribute_value_list_class(
-                        nonwhitespace_re.findall(original_value)
-                    )
-                else:
-                    # html5lib calls setAttributes twice for the
-                    # same tag when rearranging the parse tree. On
-                    # the second call the attribute value here is
-                    # already a list. This can also happen when a
-                    # Tag object is cloned. If this happens, leave
-                    # the value alone rather than trying to split
-                    # it again.
-                    modified_value = original_value
-                modified_attrs[attr] = modified_value
+                    #
+                    # str.split() splits on exactly the characters
+                    # nonwhitespace_re considers whitespace, but it's
+                    # much faster. Lists made from the same value
+                    # share their token strings.
+                    tokens = token_cache.get(original_value)
+                    if tokens is None:
+                        if len(token_cache) >= self.ATTRIBUTE_VALUE_CACHE_SIZE:
+                            token_cache.clear()
+                        tokens = token_cache[original_value] = tuple(
+                            original_value.split()
+                        )
+                    modified_attrs[attr] = self.attribute_value_list_class(tokens)
+
+                # Otherwise, html5lib calls setAttributes twice for
+                # the same tag when rearranging the parse tree. On
+                # the second call the attribute value here is already
+                # a list. This can also happen when a Tag object is
+                # cloned. If this happens, leave the value alone
+                # rather than trying to split it again.
         return modified_attrs
 
 
@@ -718,6 +756,11 @@ class DetectsXMLParsedAsHTML(object):
     _first_processing_instruction: Optional[str]  #: :meta private:
     _root_tag_name: Optional[str]  #: :meta private:
 
+    #: The stacklevel of the warning issued by _root_tag_encountered,
+    #: chosen so the warning points at the code that called the
+    #: BeautifulSoup constructor.
+    _root_tag_warning_stacklevel: int = 11  #: :meta private:
+
     @classmethod
     def warn_if_markup_looks_like_xml(
         cls, markup: Optional[_RawMarkup], stacklevel: int = 3
@@ -809,7 +852,7 @@ class DetectsXMLParsedAsHTML(object):
             # We encountered an XML declaration and then a tag other
             # than 'html'. This is a reliable indicator that a
             # non-XHTML document is being parsed as XML.
-            self._warn(stacklevel=10)
+            self._warn(stacklevel=self._root_tag_warning_stacklevel)
 
 
 def register_treebuilders_from(module: ModuleType) -> None:
@@ -104,12 +104,12 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
             if variable:
                 warnings.warn(
                     f"You provided a value for {name}, but the html5lib tree builder doesn't support {name}.",
-                    stacklevel=3,
+                    stacklevel=4,
                 )
 
         # html5lib only parses HTML, so if it's given XML that's worth
         # noting.
-        DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=3)
+        DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=4)
 
         yield (markup, None, None, False)
 
@@ -121,7 +121,7 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
         if self.soup is not None and self.soup.parse_only is not None:
             warnings.warn(
                 "You provided a value for parse_only, but the html5lib tree builder doesn't support parse_only. The entire document will be parsed.",
-                stacklevel=4,
+                stacklevel=5,
             )
 
         # self.underlying_builder is probably None now, but it'll be set
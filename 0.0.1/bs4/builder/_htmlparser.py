@@ -344,6 +344,12 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
     #: original file is the source of an element.
     TRACKS_LINE_NUMBERS: bool = True
 
+    #: html.parser buffers incomplete markup between calls to feed().
+    CAN_FEED_INCREMENTALLY: bool = True
+
+    #: The parser for a document being fed in with feed_incremental().
+    _incremental_parser: Optional[BeautifulSoupHTMLParser] = None
+
     def __init__(
         self,
         parser_args: Optional[Iterable[Any]] = None,
@@ -472,3 +478,38 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
             # when there's an error in the doctype declaration.
             raise ParserRejectedMarkup(e)
         parser.already_closed_empty_element = []
+
+    def reset(self) -> None:
+        """Throw away any partially parsed incremental document."""
+        self._incremental_parser = None
+
+    def feed_incremental(self, markup: str) -> None:
+        """Run the next chunk of a document through html.parser."""
+        if self._incremental_parser is None:
+            assert self.soup is not None
+            args, kwargs = self.parser_args
+            self._incremental_parser = BeautifulSoupHTMLParser(
+                self.soup, *args, **kwargs
+            )
+            # This parser is driven by BeautifulSoup.feed and
+            # BeautifulSoup.close, which are two stack frames closer
+            # to the calling code than the constructor's parse.
+            self._incremental_parser._root_tag_warning_stacklevel = 9
+        try:
+            self._incremental_parser.feed(markup)
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+
+    def close_incremental(self) -> None:
+        """Finish parsing a document that was passed in through
+        feed_incremental().
+        """
+        # Make sure the parser exists, even if the document was empty.
+        self.feed_incremental("")
+        parser = cast(BeautifulSoupHTMLParser, self._incremental_parser)
+        self._incremental_parser = None
+        try:
+            parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        parser.already_closed_empty_element = []
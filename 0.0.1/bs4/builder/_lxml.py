@@ -21,6 +21,7 @@ from typing import (
     Type,
     TYPE_CHECKING,
     Union,
+    cast,
 )
 from typing_extensions import TypeAlias
 
@@ -89,6 +90,8 @@ class LXMLTreeBuilderForXML(TreeBuilder):
 
     CHUNK_SIZE: int = 512
 
+    CAN_FEED_INCREMENTALLY: bool = True
+
     # This namespace mapping is specified in the XML Namespace
     # standard.
     DEFAULT_NSMAPS: _NamespaceMapping = dict(xml="http://www.w3.org/XML/1998/namespace")
@@ -100,6 +103,9 @@ class LXMLTreeBuilderForXML(TreeBuilder):
     parser: Any
     _default_parser: Optional[etree.XMLParser]
 
+    #: The parser for a document being fed in with feed_incremental().
+    _incremental_parser: Optional[_LXMLParser] = None
+
     # NOTE: If we parsed Element objects and looked at .sourceline,
     # we'd be able to see the line numbers from the original document.
     # But instead we build an XMLParser or HTMLParser object to serve
@@ -231,7 +237,7 @@ class LXMLTreeBuilderForXML(TreeBuilder):
             self.processing_instruction_class = ProcessingInstruction
             # We're in HTML mode, so if we're given XML, that's worth
             # noting.
-            DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=3)
+            DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=4)
         else:
             self.processing_instruction_class = XMLProcessingInstruction
 
@@ -309,6 +315,45 @@ class LXMLTreeBuilderForXML(TreeBuilder):
     def close(self) -> None:
         self.nsmaps = [self.DEFAULT_NSMAPS_INVERTED]
 
+    def reset(self) -> None:
+        """Throw away any partially parsed incremental document."""
+        self._incremental_parser = None
+
+    def feed_incremental(self, markup: str) -> None:
+        """Run the next chunk of a document through lxml's feed parser.
+
+        The chunks have already been converted to Unicode, so the
+        parser is created without an encoding.
+        """
+        if self._incremental_parser is None:
+            assert self.soup is not None
+            if self.is_xml:
+                self.processing_instruction_class = XMLProcessingInstruction
+            else:
+                self.processing_instruction_class = ProcessingInstruction
+            # See the note about lxml bug 1948551 in prepare_markup().
+            if markup[:1] == "\N{BYTE ORDER MARK}":
+                markup = markup[1:]
+            self._incremental_parser = self.parser = self.parser_for(None)
+        try:
+            self._incremental_parser.feed(markup)
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
+    def close_incremental(self) -> None:
+        """Finish parsing a document that was passed in through
+        feed_incremental().
+        """
+        # Call feed() at least once, even if the markup is empty,
+        # or the parser won't be initialized.
+        self.feed_incremental("")
+        parser = cast(_LXMLParser, self._incremental_parser)
+        self._incremental_parser = None
+        try:
+            parser.close()
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
     def start(
         self,
         tag: str | bytes,
@@ -18,10 +18,13 @@ from types import ModuleType
 from typing import (
     Any,
     cast,
+    Dict,
     Iterable,
     Iterator,
+    Mapping,
     Optional,
     TYPE_CHECKING,
+    Union,
 )
 import warnings
 from bs4._typing import _NamespaceMapping
@@ -195,6 +198,59 @@ class CSS(object):
             )
         )
 
+    def select_many(
+        self,
+        selectors: Mapping[str, Union[str, SoupSieve]],
+        namespaces: Optional[_NamespaceMapping] = None,
+        limit: int = 0,
+        flags: int = 0,
+        **kwargs: Any,
+    ) -> Dict[str, ResultSet[element.Tag]]:
+        """Perform several CSS selection operations on the current
+        `element.Tag` at once.
+
+        Calling `CSS.select` once per selector looks at every tag
+        beneath this one each time. This looks at each tag once, and
+        checks it against every selector, so extracting several fields
+        from a page costs about the same as one selection.
+
+        :param selectors: A dictionary mapping names to CSS selectors,
+            which may be strings or precompiled selectors.
+
+        :param namespaces: A dictionary mapping namespace prefixes
+            used in the CSS selectors to namespace URIs. By default,
+            Beautiful Soup will pass in the prefixes it encountered while
+            parsing the document.
+
+        :param limit: After finding this number of results for a
+            selector, stop looking for that selector.
+
+        :param flags: Flags to be passed into Soup Sieve's
+            `soupsieve.compile() <https://facelessuser.github.io/soupsieve/api/#soupsievecompile>`_ method.
+
+        :param kwargs: Keyword arguments to be passed into Soup Sieve's
+           `soupsieve.compile() <https://facelessuser.github.io/soupsieve/api/#soupsievecompile>`_ method.
+
+        :return: A dictionary mapping each name in ``selectors`` to the
+            `ResultSet` `CSS.select` would have returned for its selector.
+        """
+        if limit is None:
+            limit = 0
+        compiled = dict(
+            (name, self.compile(select, namespaces, flags, **kwargs))
+            for name, select in selectors.items()
+        )
+        select_many = getattr(self.api, "select_many", None)
+        if select_many is None:
+            # This version of Soup Sieve can't do it in one pass.
+            results = dict(
+                (name, select.select(self.tag, limit))
+                for name, select in compiled.items()
+            )
+        else:
+            results = select_many(compiled, self.tag, limit=limit)
+        return dict((name, self._rs(tags)) for name, tags in results.items())
+
     def iselect(
         self,
         select: str,
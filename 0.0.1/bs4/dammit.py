@@ -125,6 +125,28 @@ class EntitySubstitution(object):
     #: :meta hide-value:
     CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE: Pattern[str]
 
+    #: A table for `str.translate` that replaces each single character
+    #: matched by CHARACTER_TO_HTML_ENTITY_RE with its named HTML
+    #: entity.
+    #:
+    #: :meta hide-value:
+    CHARACTER_TO_HTML_ENTITY_TRANSLATION: Dict[int, str]
+
+    #: Like CHARACTER_TO_HTML_ENTITY_TRANSLATION, but it also replaces
+    #: ampersands, like CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.
+    #:
+    #: :meta hide-value:
+    CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TRANSLATION: Dict[int, str]
+
+    #: A regular expression matching any character that can end a
+    #: two-character named HTML entity. A string without any of these
+    #: characters can be substituted through
+    #: CHARACTER_TO_HTML_ENTITY_TRANSLATION instead of
+    #: CHARACTER_TO_HTML_ENTITY_RE.
+    #:
+    #: :meta hide-value:
+    LONG_HTML_ENTITY_PART_RE: Pattern[str]
+
     @classmethod
     def _populate_class_variables(cls) -> None:
         """Initialize variables used by this class to manage the plethora of
@@ -148,6 +170,14 @@ class EntitySubstitution(object):
         also matches unescaped ampersands. This is used by the 'html'
         formatted to provide backwards-compatibility, even though the HTML5
         spec allows most ampersands to go unescaped.
+
+        CHARACTER_TO_HTML_ENTITY_TRANSLATION and
+        CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TRANSLATION: Tables for
+        `str.translate` that do the work of the two regular expressions
+        above, for strings that contain no two-character entities.
+
+        LONG_HTML_ENTITY_PART_RE: A regular expression that finds out
+        whether a string might contain a two-character entity.
         """
         unicode_to_name = {}
         name_to_unicode = {}
@@ -237,6 +267,12 @@ class EntitySubstitution(object):
 
         re_definition = "(%s)" % "|".join(particles)
 
+        # Every character after the first in a multi-character entity.
+        long_entity_parts = set()
+        for long_entities in list(long_entities_by_first_character.values()):
+            for long_entity in long_entities:
+                long_entity_parts.update(long_entity[1:])
+
         particles.add("&")
         re_definition_with_ampersand = "(%s)" % "|".join(particles)
 
@@ -250,12 +286,26 @@ class EntitySubstitution(object):
             character = chr(codepoint)
             unicode_to_name[character] = name
 
+        translation = {}
+        for short in short_entities:
+            translation[ord(short)] = "&%s;" % unicode_to_name[short]
+
         cls.CHARACTER_TO_HTML_ENTITY = unicode_to_name
         cls.HTML_ENTITY_TO_CHARACTER = name_to_unicode
         cls.CHARACTER_TO_HTML_ENTITY_RE = re.compile(re_definition)
         cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE = re.compile(
             re_definition_with_ampersand
         )
+        cls.CHARACTER_TO_HTML_ENTITY_TRANSLATION = translation
+        cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TRANSLATION = dict(
+            translation
+        )
+        cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TRANSLATION[ord("&")] = (
+            "&%s;" % unicode_to_name["&"]
+        )
+        cls.LONG_HTML_ENTITY_PART_RE = re.compile(
+            "[%s]" % "".join(sorted(long_entity_parts))
+        )
 
     #: A map of Unicode strings to the corresponding named XML entities.
     #:
@@ -301,6 +351,38 @@ class EntitySubstitution(object):
         entity = cls.CHARACTER_TO_XML_ENTITY[matchobj.group(0)]
         return "&%s;" % entity
 
+    @classmethod
+    def _substitute_html_characters(cls, s: str, ampersands: bool) -> str:
+        """Replace characters with named HTML entities, the way
+        CHARACTER_TO_HTML_ENTITY_RE (or
+        CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE, if ``ampersands``
+        is True) would, while avoiding those expressions when possible.
+        """
+        if s.isascii():
+            # The only ASCII characters that get replaced are angle
+            # brackets and (maybe) ampersands.
+            if ampersands and "&" in s:
+                s = s.replace("&", "&amp;")
+            if "<" in s:
+                s = s.replace("<", "&lt;")
+            if ">" in s:
+                s = s.replace(">", "&gt;")
+            return s
+
+        if cls.LONG_HTML_ENTITY_PART_RE.search(s) is None:
+            # Every entity in this string is a single character.
+            if ampersands:
+                return s.translate(
+                    cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TRANSLATION
+                )
+            return s.translate(cls.CHARACTER_TO_HTML_ENTITY_TRANSLATION)
+
+        if ampersands:
+            regex = cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE
+        else:
+            regex = cls.CHARACTER_TO_HTML_ENTITY_RE
+        return regex.sub(cls._substitute_html_entity, s)
+
     @classmethod
     def _escape_entity_name(cls, matchobj: re.Match) -> str:
         return "&amp;%s;" % matchobj.group(1)
@@ -371,7 +453,12 @@ class EntitySubstitution(object):
          with named entities.
         """
         # Escape angle brackets and ampersands.
-        value = cls.AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        if "&" in value:
+            value = value.replace("&", "&amp;")
+        if "<" in value:
+            value = value.replace("<", "&lt;")
+        if ">" in value:
+            value = value.replace(">", "&gt;")
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -393,7 +480,10 @@ class EntitySubstitution(object):
         """
         # Escape angle brackets, and ampersands that aren't part of
         # entities.
-        value = cls.BARE_AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        if "&" in value or "<" in value or ">" in value:
+            value = cls.BARE_AMPERSAND_OR_BRACKET.sub(
+                cls._substitute_xml_entity, value
+            )
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -416,9 +506,7 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # Convert any appropriate characters to HTML entities.
-        return cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(
-            cls._substitute_html_entity, s
-        )
+        return cls._substitute_html_characters(s, ampersands=True)
 
     @classmethod
     def substitute_html5(cls, s: str) -> str:
@@ -447,12 +535,11 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # First, escape any HTML entities found in the markup.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
 
         # Next, convert any appropriate characters to unescaped HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
-
-        return s
+        return cls._substitute_html_characters(s, ampersands=False)
 
     @classmethod
     def substitute_html5_raw(cls, s: str) -> str:
@@ -470,13 +557,12 @@ class EntitySubstitution(object):
         # First, escape the ampersand for anything that looks like an
         # entity but isn't in the list of recognized entities. All other
         # ampersands can be left alone.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
 
         # Then, convert a range of Unicode characters to unescaped
         # HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
-
-        return s
+        return cls._substitute_html_characters(s, ampersands=False)
 
 
 EntitySubstitution._populate_class_variables()
@@ -502,12 +588,14 @@ class EncodingDetector:
        document), or in a <meta> tag (if the bytestring is to be
        interpreted as an HTML document.)
 
-    5. An encoding detected through textual analysis by chardet,
+    5. UTF-8, if the bytestring is valid UTF-8.
+
+    6. An encoding detected through textual analysis by chardet,
        cchardet, or a similar external library.
 
-    6. UTF-8.
+    7. UTF-8.
 
-    7. Windows-1252.
+    8. Windows-1252.
 
     :param markup: Some markup in an unknown encoding.
 
@@ -537,6 +625,15 @@ class EncodingDetector:
 
     """
 
+    #: An HTML document's <meta> tag is only looked for within this
+    #: many bytes of the start of the document.
+    HTML_DECLARATION_SEARCH_SIZE: int = 32768
+
+    #: Only this many bytes from the start of the document are passed
+    #: into chardet. That's plenty to guess an encoding from, and
+    #: chardet takes time proportional to the size of its input.
+    CHARDET_SAMPLE_SIZE: int = 65536
+
     def __init__(
         self,
         markup: bytes,
@@ -560,6 +657,8 @@ class EncodingDetector:
         self.chardet_encoding = None
         self.is_html = False if is_html is None else is_html
         self.declared_encoding: Optional[str] = None
+        self._utf8_checked = False
+        self._utf8_markup: Optional[str] = None
 
         # First order of business: strip a byte-order mark.
         self.markup, self.sniffed_encoding = self.strip_byte_order_mark(markup)
@@ -590,6 +689,29 @@ class EncodingDetector:
             return True
         return False
 
+    def _is_utf8(self) -> bool:
+        """Is the markup valid UTF-8?
+
+        This takes a single decode, and the decoded markup is kept so
+        `UnicodeDammit` doesn't have to decode it again.
+        """
+        if not self._utf8_checked:
+            self._utf8_checked = True
+            if isinstance(self.markup, bytes):
+                try:
+                    self._utf8_markup = self.markup.decode("utf-8")
+                except UnicodeDecodeError:
+                    pass
+        return self._utf8_markup is not None
+
+    def _take_utf8_markup(self) -> Optional[str]:
+        """Hand over the markup decoded by `EncodingDetector._is_utf8`,
+        if any, and stop holding on to it.
+        """
+        utf8_markup = self._utf8_markup
+        self._utf8_markup = None
+        return utf8_markup
+
     @property
     def encodings(self) -> Iterator[_Encoding]:
         """Yield a number of encodings that might work for this markup.
@@ -628,10 +750,17 @@ class EncodingDetector:
         ):
             yield self.declared_encoding
 
+        # Most documents are UTF-8, and checking whether this one is
+        # takes much less time than running chardet over it.
+        if self._is_utf8() and self._usable("utf-8", tried):
+            yield "utf-8"
+
         # Use third-party character set detection to guess at the
         # encoding.
         if self.chardet_encoding is None:
-            self.chardet_encoding = _chardet_dammit(self.markup)
+            self.chardet_encoding = _chardet_dammit(
+                self.markup[: self.CHARDET_SAMPLE_SIZE]
+            )
         if self.chardet_encoding is not None and self._usable(
             self.chardet_encoding, tried
         ):
@@ -701,15 +830,16 @@ class EncodingDetector:
         :param search_entire_document: Since an encoding is supposed
             to declared near the beginning of the document, most of
             the time it's only necessary to search a few kilobytes of
-            data.  Set this to True to force this method to search the
-            entire document.
+            data (`EncodingDetector.HTML_DECLARATION_SEARCH_SIZE`
+            bytes, for HTML). Set this to True to force this method
+            to search the entire document.
         :return: The declared encoding, if one is found.
         """
         if search_entire_document:
             xml_endpos = html_endpos = len(markup)
         else:
             xml_endpos = 1024
-            html_endpos = max(2048, int(len(markup) * 0.05))
+            html_endpos = cls.HTML_DECLARATION_SEARCH_SIZE
 
         if isinstance(markup, bytes):
             res = encoding_res[bytes]
@@ -956,7 +1086,12 @@ class UnicodeDammit:
         try:
             # print("Trying to convert document to %s (errors=%s)" % (
             #    proposed, errors))
-            u = self._to_unicode(markup, proposed, errors)
+            u = None
+            if proposed == "utf-8" and errors == "strict":
+                # The detector may already have decoded the markup.
+                u = self.detector._take_utf8_markup()
+            if u is None:
+                u = self._to_unicode(markup, proposed, errors)
             self.unicode_markup = u
             self.original_encoding = proposed
         except Exception:
@@ -1336,6 +1471,20 @@ class UnicodeDammit:
     #: :meta private:
     LAST_MULTIBYTE_MARKER: int = MULTIBYTE_MARKERS_AND_SIZES[-1][1]
 
+    #: `UnicodeDammit.detwingle` checks at most this many bytes at a
+    #: time for valid UTF-8, which it can leave alone.
+    #:
+    #: :meta private:
+    DETWINGLE_BLOCK_SIZE: int = 65536
+
+    #: Matches a run of Windows-1252 characters that
+    #: `UnicodeDammit.detwingle` converts through `WINDOWS_1252_TO_UTF8`.
+    #:
+    #: :meta private:
+    DETWINGLE_WINDOWS_1252_RE: Pattern[bytes] = re.compile(
+        b"[\x80\x82-\x8c\x8e\x91-\x9c\x9e-\xc1\xf5-\xfe]+"
+    )
+
     @classmethod
     def detwingle(
         cls,
@@ -1373,36 +1522,289 @@ class UnicodeDammit:
                 "UTF-8 is the only currently supported main encoding."
             )
 
+        return cls._detwingle(in_bytes)[0]
+
+    @classmethod
+    def _detwingle(cls, in_bytes: bytes, final: bool = True) -> Tuple[bytes, int]:
+        """Convert Windows-1252 characters embedded in UTF-8 to UTF-8.
+
+        :param in_bytes: Some UTF-8, possibly only part of a document.
+        :param final: If False, more of the document will follow
+            ``in_bytes``, so a multibyte character cut off by the end of
+            ``in_bytes`` is left unconsumed.
+        :return: A 2-tuple (converted bytes, number of bytes of
+            ``in_bytes`` that were consumed).
+        """
+        if in_bytes.isascii():
+            # Nothing to convert.
+            return in_bytes, len(in_bytes)
+
+        windows_1252 = cls.DETWINGLE_WINDOWS_1252_RE.match
+        to_utf8 = cls.WINDOWS_1252_TO_UTF8.__getitem__
+        view = memoryview(in_bytes)
         byte_chunks = []
 
         chunk_start = 0
         pos = 0
-        while pos < len(in_bytes):
+        end = len(in_bytes)
+        block_size = 64
+        while pos < end:
+            # Let the UTF-8 decoder skip over valid UTF-8, which is
+            # left alone. It stops at the first byte that needs a
+            # closer look.
+            block = view[pos : pos + block_size]
+            try:
+                valid = codecs.utf_8_decode(block, "strict", False)[1]
+            except UnicodeDecodeError as e:
+                valid = e.start
+            else:
+                if valid == len(block) or pos + len(block) < end:
+                    # Either the whole block is valid, or it ends
+                    # partway through a character that the next
+                    # block will pick up. Try a bigger block next time.
+                    pos += valid
+                    block_size = min(block_size * 2, cls.DETWINGLE_BLOCK_SIZE)
+                    continue
+            pos += valid
+            # Problems tend to cluster, so go back to small blocks.
+            block_size = 64
+
             byte = in_bytes[pos]
             if byte >= cls.FIRST_MULTIBYTE_MARKER and byte <= cls.LAST_MULTIBYTE_MARKER:
-                # This is the start of a UTF-8 multibyte character. Skip
-                # to the end.
-                for start, end, size in cls.MULTIBYTE_MARKERS_AND_SIZES:
-                    if byte >= start and byte <= end:
-                        pos += size
+                # This is the start of a UTF-8 multibyte character,
+                # though not necessarily a valid one. Skip to the end.
+                for start, stop, size in cls.MULTIBYTE_MARKERS_AND_SIZES:
+                    if byte >= start and byte <= stop:
                         break
-            elif byte >= 0x80 and byte in cls.WINDOWS_1252_TO_UTF8:
-                # We found a Windows-1252 character!
-                # Save the string up to this point as a chunk.
-                byte_chunks.append(in_bytes[chunk_start:pos])
-
-                # Now translate the Windows-1252 character into UTF-8
-                # and add it as another, one-byte chunk.
-                byte_chunks.append(cls.WINDOWS_1252_TO_UTF8[byte])
-                pos += 1
-                chunk_start = pos
-            else:
-                # Go on to the next character.
+                if pos + size > end and not final:
+                    # The character is cut off by the end of the
+                    # data. Wait for the rest of it.
+                    end = pos
+                    break
+                pos += size
+                continue
+
+            match = windows_1252(in_bytes, pos)
+            if match is None:
+                # This byte is undefined in Windows-1252. Leave it alone.
                 pos += 1
-        if chunk_start == 0:
+                continue
+            # We found some Windows-1252 characters! Save the string up
+            # to this point as a chunk, then convert the characters
+            # to UTF-8 and add them as another chunk.
+            byte_chunks.append(in_bytes[chunk_start:pos])
+            byte_chunks.append(b"".join(map(to_utf8, match.group())))
+            pos = chunk_start = match.end()
+
+        if chunk_start == 0 and end == len(in_bytes):
             # The string is unchanged.
-            return in_bytes
-        else:
-            # Store the final chunk.
-            byte_chunks.append(in_bytes[chunk_start:])
-        return b"".join(byte_chunks)
+            return in_bytes, end
+        # Store the final chunk.
+        byte_chunks.append(in_bytes[chunk_start:end])
+        return b"".join(byte_chunks), end
+
+
+class IncrementalDetwingler(object):
+    """Runs `UnicodeDammit.detwingle` over a bytestream one chunk at
+    a time, for documents that are too big to hold in memory or that
+    arrive a piece at a time.
+
+    A UTF-8 multibyte character that's split across two chunks is held
+    back until the rest of it arrives, so the output is the same as if
+    the whole document had been passed into `UnicodeDammit.detwingle`.
+
+    :param main_encoding: See `UnicodeDammit.detwingle`.
+    :param embedded_encoding: See `UnicodeDammit.detwingle`.
+    """
+
+    def __init__(
+        self,
+        main_encoding: _Encoding = "utf8",
+        embedded_encoding: _Encoding = "windows-1252",
+    ):
+        # Make sure the encodings are supported.
+        UnicodeDammit.detwingle(b"", main_encoding, embedded_encoding)
+        self._pending = b""
+
+    def detwingle(self, data: bytes, final: bool = False) -> bytes:
+        """Convert the next chunk of the document.
+
+        :param data: The next chunk of the document.
+        :param final: If True, this is the last chunk.
+        :return: Whatever converted bytes are ready.
+        """
+        if self._pending:
+            data = self._pending + data
+        converted, consumed = UnicodeDammit._detwingle(data, final)
+        self._pending = data[consumed:]
+        return converted
+
+    def close(self) -> bytes:
+        """Signal that there are no more chunks.
+
+        :return: Any bytes that were being held back.
+        """
+        return self.detwingle(b"", final=True)
+
+
+class IncrementalUnicodeDammit(object):
+    """Converts a bytestream to Unicode one chunk at a time, for
+    documents that arrive a piece at a time.
+
+    The encoding is chosen the way `UnicodeDammit` chooses it, by
+    running an `EncodingDetector` over the start of the document:
+    the first ``sniff_size`` bytes, or the whole document if it's
+    shorter than that. Every chunk after that is decoded as soon as it
+    arrives. Bytes that turn out to be invalid in the chosen encoding
+    are replaced with REPLACEMENT CHARACTER, since by then it's too late
+    to choose a different encoding.
+
+    :param known_definite_encodings: See `UnicodeDammit`.
+    :param is_html: If True, this markup is considered to be
+        HTML. Otherwise it's assumed to be XML.
+    :param exclude_encodings: These encodings will not be tried,
+        even if they otherwise would be.
+    :param user_encodings: See `UnicodeDammit`.
+    :param sniff_size: How many bytes to collect before choosing
+        an encoding.
+    """
+
+    #: By default, this many bytes are collected before an encoding is
+    #: chosen. Most documents declare their encoding well within this
+    #: space.
+    DEFAULT_SNIFF_SIZE: int = 1024
+
+    def __init__(
+        self,
+        known_definite_encodings: Optional[_Encodings] = None,
+        is_html: bool = False,
+        exclude_encodings: Optional[_Encodings] = None,
+        user_encodings: Optional[_Encodings] = None,
+        sniff_size: int = DEFAULT_SNIFF_SIZE,
+    ):
+        self.known_definite_encodings = known_definite_encodings
+        self.is_html = is_html
+        self.exclude_encodings = exclude_encodings
+        self.user_encodings = user_encodings
+        self.sniff_size = sniff_size
+        self.original_encoding = None
+        self.declared_html_encoding = None
+        self.contains_replacement_characters = False
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+
+    #: Unicode, Dammit's best guess as to the original character
+    #: encoding, or None if one hasn't been chosen yet.
+    original_encoding: Optional[_Encoding]
+
+    #: The encoding declared inside the document, if it's an HTML
+    #: document and the declaration was needed to choose an encoding.
+    declared_html_encoding: Optional[_Encoding]
+
+    #: This is True if any of the Unicode returned so far contains
+    #: U+FFFD REPLACEMENT_CHARACTER characters which were not present
+    #: in the original bytes.
+    contains_replacement_characters: bool
+
+    def decode(self, data: bytes, final: bool = False) -> str:
+        """Convert the next chunk of the document to Unicode.
+
+        :param data: The next chunk of the document.
+        :param final: If True, this is the last chunk.
+        :return: Whatever Unicode is ready. This may be the empty
+            string if an encoding hasn't been chosen yet, or if the
+            chunk ends partway through a character.
+        """
+        if self._decoder is None:
+            self._pending.append(data)
+            self._pending_size += len(data)
+            if self._pending_size < self.sniff_size and not final:
+                return ""
+            sample = b"".join(self._pending)
+            self._pending = []
+            if not sample:
+                # An empty document has no encoding.
+                return ""
+            return self._choose_encoding(sample, final)
+
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError:
+            return self._decode_with_replacement(data, final)
+
+    def close(self) -> str:
+        """Signal that there are no more chunks.
+
+        :return: Any Unicode that was being held back.
+        """
+        return self.decode(b"", final=True)
+
+    def _choose_encoding(self, sample: bytes, final: bool) -> str:
+        """Choose an encoding for the document based on a sample
+        from its start, and decode the sample.
+        """
+        detector = EncodingDetector(
+            sample,
+            self.known_definite_encodings,
+            self.is_html,
+            self.exclude_encodings,
+            self.user_encodings,
+        )
+        # The detector may have stripped a byte-order mark.
+        sample = detector.markup
+        first_usable: Optional[Tuple[_Encoding, codecs.IncrementalDecoder]] = None
+        for encoding in detector.encodings:
+            if encoding.lower() in ("ascii", "us-ascii"):
+                # The sample is plain ASCII, but that says nothing
+                # about the rest of the document. UTF-8 decodes ASCII
+                # the same way and is far more likely to be right.
+                encoding = "utf-8"
+            decoder = self._decoder_for(encoding)
+            if decoder is None:
+                continue
+            if first_usable is None and encoding != "ascii":
+                first_usable = (encoding, decoder)
+            try:
+                text = decoder.decode(sample, final)
+            except UnicodeDecodeError:
+                continue
+            self._use(detector, encoding, decoder)
+            return text
+
+        # None of the encodings worked. As UnicodeDammit does, fall back
+        # to character replacement.
+        if first_usable is None:
+            raise ValueError("Could not find a usable encoding for this document.")
+        encoding, decoder = first_usable
+        decoder.reset()
+        self._use(detector, encoding, decoder)
+        return self._decode_with_replacement(sample, final)
+
+    def _use(
+        self,
+        detector: EncodingDetector,
+        encoding: _Encoding,
+        decoder: codecs.IncrementalDecoder,
+    ) -> None:
+        self._decoder = decoder
+        self.original_encoding = encoding.lower()
+        if self.is_html:
+            self.declared_html_encoding = detector.declared_encoding
+
+    def _decoder_for(self, encoding: _Encoding) -> Optional[codecs.IncrementalDecoder]:
+        codec = UnicodeDammit.CHARSET_ALIASES.get(encoding, encoding)
+        try:
+            return codecs.getincrementaldecoder(codec)("strict")
+        except LookupError:
+            return None
+
+    def _decode_with_replacement(self, data: bytes, final: bool) -> str:
+        decoder = cast(codecs.IncrementalDecoder, self._decoder)
+        decoder.errors = "replace"
+        try:
+            text = decoder.decode(data, final)
+        finally:
+            decoder.errors = "strict"
+        self.contains_replacement_characters = True
+        return text
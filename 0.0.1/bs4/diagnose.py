@@ -11,11 +11,14 @@ from bs4 import BeautifulSoup, __version__
 from bs4.builder import builder_registry
 from typing import (
     Any,
+    Callable,
+    Dict,
     IO,
     List,
     Optional,
     Tuple,
     TYPE_CHECKING,
+    cast,
 )
 
 if TYPE_CHECKING:
@@ -263,6 +266,443 @@ def profile(num_elements: int = 100000, parser: str = "lxml") -> None:
     stats.print_stats("_html5lib|bs4", 50)
 
 
+def benchmark_memory(
+    num_elements: int = 100000,
+    parser: str = "html.parser",
+    data: Optional[str] = None,
+) -> Dict[str, float]:
+    """Measure parse time and memory use per node.
+
+    :param num_elements: The size of the randomly generated document
+        to parse, if ``data`` isn't provided.
+    :param parser: The name of the parser to use.
+    :param data: Markup to parse instead of a random document, such
+        as a large saved web page.
+    :return: A dictionary with the node count, the parse time in
+        seconds, and the bytes allocated per node.
+    """
+    import tracemalloc
+
+    if data is None:
+        data = rdoc(num_elements)
+    a = time.time()
+    BeautifulSoup(data, parser)
+    b = time.time()
+
+    tracemalloc.start()
+    try:
+        soup = BeautifulSoup(data, parser)
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    nodes = sum(1 for _ in soup.descendants)
+    tags = len(soup.find_all(True))
+    result = dict(
+        nodes=nodes,
+        tags=tags,
+        seconds=b - a,
+        bytes_per_node=allocated / max(nodes, 1),
+        peak_bytes_per_node=peak / max(nodes, 1),
+    )
+    print(
+        (
+            "BS4+%s parsed %d nodes (%d tags) in %.2fs, %.0f bytes per node (peak %.0f)."
+            % (
+                parser,
+                nodes,
+                tags,
+                result["seconds"],
+                result["bytes_per_node"],
+                result["peak_bytes_per_node"],
+            )
+        )
+    )
+    return result
+
+
+def benchmark_tree_construction(
+    num_elements: int = 100000, repeat: int = 3
+) -> Dict[str, float]:
+    """Compare html.parser's fast tree construction path against the
+    general path on a randomly generated document.
+
+    Passing a (trivial) element_classes mapping is enough to make
+    `BeautifulSoup` take the general path, so the two runs differ only
+    in how the tree is built.
+
+    :param num_elements: The size of the document to parse.
+    :param repeat: Parse the document this many times with each path
+        and keep the fastest time.
+    :return: A dictionary with the best time in seconds for each path.
+    """
+    from bs4.element import Tag
+
+    data = rdoc(num_elements)
+    print("Generated a large invalid HTML document (%d bytes)." % len(data))
+    results: Dict[str, float] = {}
+    for label, kwargs in (
+        ("fast", {}),
+        ("general", dict(element_classes={Tag: Tag})),
+    ):
+        best = None
+        for i in range(repeat):
+            a = time.time()
+            BeautifulSoup(data, "html.parser", **kwargs)
+            b = time.time()
+            if best is None or b - a < best:
+                best = b - a
+        results[label] = cast(float, best)
+        print("BS4+html.parser (%s path) parsed the markup in %.2fs." % (label, best))
+    print(
+        "The fast path took %.0f%% of the time of the general path."
+        % (100 * results["fast"] / results["general"])
+    )
+    return results
+
+
+def benchmark_filters(num_elements: int = 100000, repeat: int = 3) -> Dict[str, float]:
+    """Compare the time it takes to check every element of a randomly
+    generated document against some typical `SoupStrainer` objects,
+    using `SoupStrainer.match` one element at a time, and using
+    `SoupStrainer.filter`, which compiles the rules first.
+
+    :param num_elements: The size of the document to search.
+    :param repeat: Check the elements this many times with each
+        method and keep the fastest time.
+    :return: A dictionary with the best time per element, in
+        seconds, for each method.
+    """
+    import re
+    from bs4.filter import SoupStrainer
+
+    soup = BeautifulSoup(rdoc(num_elements), "html.parser")
+    elements = list(soup.descendants)
+    strainers = [
+        SoupStrainer("script"),
+        SoupStrainer(["b", "i", "table"]),
+        SoupStrainer(re.compile("^t"), id=True),
+        SoupStrainer(string=re.compile("ab")),
+    ]
+
+    def interpreted() -> None:
+        for strainer in strainers:
+            for element in elements:
+                if element:
+                    strainer.match(element, _known_rules=True)
+
+    def compiled() -> None:
+        for strainer in strainers:
+            for element in strainer.filter(iter(elements)):
+                pass
+
+    results: Dict[str, float] = {}
+    for label, function in (("match", interpreted), ("filter", compiled)):
+        best = None
+        for i in range(repeat):
+            a = time.time()
+            function()
+            b = time.time()
+            if best is None or b - a < best:
+                best = b - a
+        results[label] = cast(float, best) / (len(elements) * len(strainers))
+        print(
+            "SoupStrainer.%s took %.0fns per element."
+            % (label, results[label] * 1000000000)
+        )
+    return results
+
+
+def benchmark_small_queries(number: int = 20000, repeat: int = 3) -> Dict[str, float]:
+    """Time some find() and find_all() calls that only look at a
+    handful of elements, where the cost of setting up the search
+    matters more than the cost of checking each element.
+
+    :param number: Run each query this many times in a row.
+    :param repeat: Time each query this many times and keep the
+        fastest time.
+    :return: A dictionary mapping each query to the best time per
+        call, in seconds.
+    """
+    import re
+    from bs4.element import Tag
+
+    soup = BeautifulSoup(
+        "<div><p>one <b>two</b> <i>three</i> <a class='x y' href='/a'>four</a></p>"
+        "<p>five</p></div>",
+        "html.parser",
+    )
+    p = cast(Tag, soup.p)
+    queries: Dict[str, Callable[[], Any]] = {
+        "find('b')": lambda: p.find("b"),
+        "find_all('i')": lambda: p.find_all("i"),
+        "find(class_='x')": lambda: p.find(class_="x"),
+        "find('a', href=re.compile('^/'))": lambda: p.find(
+            "a", href=re.compile("^/")
+        ),
+        "find(string='five')": lambda: soup.find(string="five"),
+        "find(['b', 'i'])": lambda: p.find(["b", "i"]),
+    }
+    results: Dict[str, float] = {}
+    for label, query in queries.items():
+        best = None
+        for i in range(repeat):
+            a = time.time()
+            for j in range(number):
+                query()
+            b = time.time()
+            if best is None or b - a < best:
+                best = b - a
+        results[label] = cast(float, best) / number
+        print("%s: %.1f microseconds" % (label, results[label] * 1000000))
+    return results
+
+
+def benchmark_repeated_blocks(
+    sizes: Tuple[int, ...] = (250, 500, 1000, 2000), repeat: int = 3
+) -> Dict[str, List[float]]:
+    """Check that the time it takes to output a document grows
+    linearly with its size, even when the document repeats the same
+    structure over and over.
+
+    Two documents are tried at each size: a list of identical "event
+    cards", and a stack of nested tags that each look like their
+    parent. Each is output with `Tag.decode` and `Tag.prettify`.
+
+    :param sizes: The number of blocks in each document.
+    :param repeat: Output each document this many times and keep the
+        fastest time.
+    :return: A dictionary mapping each document and method to the
+        best time per block, in seconds, at each size. If the cost is
+        linear, the times for a given document and method will be
+        about the same.
+    """
+    card = (
+        '<div class="card"><div class="body"><h3>Hack night</h3>'
+        '<p class="food">Free <b>pizza</b></p></div></div>'
+    )
+    documents = {
+        "cards": lambda n: "<div>" + card * n + "</div>",
+        "nested": lambda n: "<div>" * n + "x" + "</div>x" * n,
+    }
+    results: Dict[str, List[float]] = {}
+    for doc_name, make_document in documents.items():
+        for size in sizes:
+            soup = BeautifulSoup(make_document(size), "html.parser")
+            for method in ("decode", "prettify"):
+                best = None
+                for i in range(repeat):
+                    a = time.time()
+                    getattr(soup, method)()
+                    b = time.time()
+                    if best is None or b - a < best:
+                        best = b - a
+                per_block = cast(float, best) / size
+                results.setdefault("%s %s" % (doc_name, method), []).append(per_block)
+    for label, times in results.items():
+        print(
+            "%s: %s microseconds per block"
+            % (label, ", ".join("%.1f" % (x * 1000000) for x in times))
+        )
+    return results
+
+
+def benchmark_select(num_cards: int = 2000, repeat: int = 3) -> Dict[str, float]:
+    """Compare the time it takes to run some typical CSS selectors
+    against a large page, with and without the index created by
+    `BeautifulSoup.enable_index`.
+
+    :param num_cards: The number of "event cards" on the page.
+    :param repeat: Run each selector this many times and keep the
+        fastest time.
+    :return: A dictionary mapping each selector, and whether the
+        index was used, to the best time in seconds.
+    """
+    card = (
+        '<div class="card c%d" id="card%d"><h3 class="title">Event %d</h3>'
+        '<p class="food">Free <b>pizza</b></p><span>Hall %d</span></div>'
+    )
+    markup = "".join(card % (i % 10, i, i, i) for i in range(num_cards))
+    selectors = ["#card%d" % (num_cards // 2), "div.c3 > h3", "h3.title, span"]
+    results: Dict[str, float] = {}
+    for indexed in (False, True):
+        soup = BeautifulSoup(markup, "html.parser")
+        if indexed:
+            soup.enable_index()
+        for selector in selectors:
+            best = None
+            for i in range(repeat):
+                a = time.time()
+                soup.select(selector)
+                b = time.time()
+                if best is None or b - a < best:
+                    best = b - a
+            label = "%s%s" % (selector, " (indexed)" if indexed else "")
+            results[label] = cast(float, best)
+            print("%s: %.2fms" % (label, results[label] * 1000))
+    return results
+
+
+def benchmark_relations(
+    depth: int = 30, num_cards: int = 40, repeat: int = 3
+) -> Dict[str, float]:
+    """Time some CSS selectors that use combinators, ``:has()`` and
+    ``:-soup-contains()`` against a page of deeply nested "event cards", the kind of markup
+    produced by sites built with component frameworks.
+
+    :param depth: The number of wrapper tags around each card's content.
+    :param num_cards: The number of cards on the page.
+    :param repeat: Run each selector this many times and keep the
+        fastest time.
+    :return: A dictionary mapping each selector to the best time in
+        seconds.
+    """
+    card = (
+        '<div class="card">'
+        + '<div class="wrap">' * depth
+        + "<h3>Hack night</h3>"
+        + '<p class="food">Free <b>pizza</b></p>' * 20
+        + "</div>" * depth
+        + "</div>"
+    )
+    soup = BeautifulSoup(
+        "<main><article>" + card * num_cards + "</article></main>", "html.parser"
+    )
+    selectors = [
+        "article div p",
+        "main article .card p > b",
+        "h3 ~ p",
+        "div:has(> h3)",
+        "div:not(:has(span))",
+        "div:-soup-contains('pizza')",
+        "p:-soup-contains-own('Free')",
+    ]
+    results: Dict[str, float] = {}
+    for selector in selectors:
+        best = None
+        for i in range(repeat):
+            a = time.time()
+            soup.select(selector)
+            b = time.time()
+            if best is None or b - a < best:
+                best = b - a
+        results[selector] = cast(float, best)
+        print("%s: %.2fms" % (selector, results[selector] * 1000))
+    return results
+
+
+def benchmark_encoding_detection(
+    num_cards: int = 20000, repeat: int = 3
+) -> Dict[str, float]:
+    """Time how long `UnicodeDammit` takes to detect the encoding of a
+    large page and convert it to Unicode, when the page doesn't declare
+    its encoding.
+
+    :param num_cards: The number of "event cards" on the page.
+    :param repeat: Convert each page this many times and keep the
+        fastest time.
+    :return: A dictionary mapping the encoding of each page to the
+        best time in seconds.
+    """
+    from bs4.dammit import UnicodeDammit
+
+    card = "<div class='card'><h3>Caf\xe9 night %d</h3><p>Free pizza \u2014 RSVP</p></div>"
+    text = "<html><body>" + "".join(card % i for i in range(num_cards)) + "</body></html>"
+    pages = {
+        "ascii": text.encode("ascii", "xmlcharrefreplace"),
+        "utf-8": text.encode("utf-8"),
+        "windows-1252": text.encode("windows-1252"),
+    }
+    results: Dict[str, float] = {}
+    for encoding, data in pages.items():
+        best = None
+        for i in range(repeat):
+            a = time.time()
+            dammit = UnicodeDammit(data, is_html=True)
+            b = time.time()
+            if best is None or b - a < best:
+                best = b - a
+        results[encoding] = cast(float, best)
+        print(
+            "%s (%.1fMB, detected %s): %.2fms"
+            % (
+                encoding,
+                len(data) / 1024 / 1024,
+                dammit.original_encoding,
+                results[encoding] * 1000,
+            )
+        )
+    return results
+
+
+def benchmark_detwingle(num_paragraphs: int = 50000, repeat: int = 3) -> Dict[str, float]:
+    """Measure the throughput of `UnicodeDammit.detwingle` on large
+    documents.
+
+    :param num_paragraphs: The number of paragraphs in each document.
+    :param repeat: Convert each document this many times and keep the
+        fastest time.
+    :return: A dictionary mapping the kind of each document to the
+        best throughput, in megabytes per second.
+    """
+    from bs4.dammit import UnicodeDammit
+
+    utf8 = "<p class='x'>Caf\xe9 \u2603 night \u2014 free pizza</p>\n".encode("utf8")
+    windows_1252 = "<p>\u201cQuoted\u201d caf\xe9</p>\n".encode("windows-1252")
+    documents = {
+        "ascii": b"<p>Free pizza</p>\n" * num_paragraphs,
+        "utf-8": utf8 * num_paragraphs,
+        "utf-8 with some windows-1252": (utf8 * 9 + windows_1252)
+        * (num_paragraphs // 10),
+        "utf-8 with lots of windows-1252": (utf8 + windows_1252)
+        * (num_paragraphs // 2),
+    }
+    results: Dict[str, float] = {}
+    for kind, data in documents.items():
+        best = None
+        for i in range(repeat):
+            a = time.time()
+            UnicodeDammit.detwingle(data)
+            b = time.time()
+            if best is None or b - a < best:
+                best = b - a
+        megabytes = len(data) / 1024 / 1024
+        results[kind] = megabytes / max(cast(float, best), 1e-9)
+        print("%s (%.1fMB): %.1fMB/s" % (kind, megabytes, results[kind]))
+    return results
+
+
+def benchmark_decode(num_cards: int = 5000, repeat: int = 3) -> Dict[str, float]:
+    """Time how long it takes to turn a large parse tree back into a
+    string with each of the standard formatters.
+
+    :param num_cards: The number of "event cards" on the page.
+    :param repeat: Decode the tree this many times and keep the
+        fastest time.
+    :return: A dictionary mapping each formatter to the best time in
+        seconds.
+    """
+    card = (
+        '<div class="card event-card" data-id="%d"><h3 class="title">Caf\xe9 '
+        "night #%d</h3><p class=\"food\">Free pizza &amp; drinks \u2014 "
+        '"bring a friend"</p><a class="link" href="/e/%d?ref=home&amp;x=1">'
+        "RSVP &gt;</a></div>"
+    )
+    markup = "".join(card % (i, i, i) for i in range(num_cards))
+    soup = BeautifulSoup(markup, "html.parser")
+    results: Dict[str, float] = {}
+    for formatter in ("minimal", "html", "html5"):
+        best = None
+        for i in range(repeat):
+            a = time.time()
+            soup.decode(formatter=formatter)
+            b = time.time()
+            if best is None or b - a < best:
+                best = b - a
+        results[formatter] = cast(float, best)
+        print("%s: %.2fms" % (formatter, results[formatter] * 1000))
+    return results
+
+
 # If this file is run as a script, standard input is diagnosed.
 if __name__ == "__main__":
     diagnose(sys.stdin.read())
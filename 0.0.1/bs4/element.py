@@ -5,6 +5,7 @@ __license__ = "MIT"
 
 import re
 import warnings
+import weakref
 
 from bs4.css import CSS
 from bs4._deprecation import (
@@ -31,6 +32,7 @@ from typing import (
     Optional,
     Pattern,
     Set,
+    SupportsIndex,
     TYPE_CHECKING,
     Tuple,
     Type,
@@ -222,6 +224,65 @@ class AttributeValueList(List[str]):
     instantiated instead.
     """
 
+    # The Tag to tell when this list is changed in place. This is only
+    # set for lists that are in a BeautifulSoup.enable_index() index.
+    _owner: Optional[Tag] = None
+
+    def _changed(self) -> None:
+        owner = self._owner
+        if owner is not None:
+            owner._attribute_changed()
+
+    def __getstate__(self) -> Any:
+        # The owner isn't part of the value, so it isn't copied or
+        # pickled.
+        state = dict(getattr(self, "__dict__", {}))
+        state.pop("_owner", None)
+        return state or None
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super(AttributeValueList, self).__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index: Any) -> None:
+        super(AttributeValueList, self).__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, values: Iterable[str]) -> AttributeValueList:  # type:ignore
+        super(AttributeValueList, self).__iadd__(values)
+        self._changed()
+        return self
+
+    def __imul__(self, n: int) -> AttributeValueList:  # type:ignore
+        super(AttributeValueList, self).__imul__(n)
+        self._changed()
+        return self
+
+    def append(self, value: str) -> None:
+        super(AttributeValueList, self).append(value)
+        self._changed()
+
+    def extend(self, values: Iterable[str]) -> None:
+        super(AttributeValueList, self).extend(values)
+        self._changed()
+
+    def insert(self, index: SupportsIndex, value: str) -> None:
+        super(AttributeValueList, self).insert(index, value)
+        self._changed()
+
+    def remove(self, value: str) -> None:
+        super(AttributeValueList, self).remove(value)
+        self._changed()
+
+    def pop(self, index: SupportsIndex = -1) -> str:
+        value = super(AttributeValueList, self).pop(index)
+        self._changed()
+        return value
+
+    def clear(self) -> None:
+        super(AttributeValueList, self).clear()
+        self._changed()
+
 
 class AttributeDict(Dict[Any,Any]):
     """Superclass for the dictionary used to hold a tag's
@@ -343,6 +404,20 @@ class ContentMetaAttributeValue(AttributeValueWithCharsetSubstitution):
         return self.CHARSET_RE.sub(rewrite, self.original_value)
 
 
+def _collapse_whitespace(strings: Iterable[str]) -> List[str]:
+    """Break strings into pieces at line breaks and runs of two or
+    more spaces, strip the pieces, and drop the empty ones.
+    """
+    pieces = []
+    for string in strings:
+        for line in string.splitlines():
+            for piece in line.split("  "):
+                piece = piece.strip()
+                if piece:
+                    pieces.append(piece)
+    return pieces
+
+
 class PageElement(object):
     """An abstract class representing a single element in the parse tree.
 
@@ -353,6 +428,11 @@ class PageElement(object):
     meaning "a `Tag` or a `NavigableString`."
     """
 
+    # PageElement has no per-instance state of its own; `Tag` declares
+    # the slots it needs. `NavigableString` can't use nonempty slots
+    # because it's a `str` subclass, so it keeps an instance dictionary.
+    __slots__ = ()
+
     #: In general, we can't tell just by looking at an element whether
     #: it's contained in an XML document or an HTML document. But for
     #: `Tag` objects (q.v.) we can store this information at parse time.
@@ -526,6 +606,7 @@ class PageElement(object):
         separator: str = "",
         strip: bool = False,
         types: Iterable[Type[NavigableString]] = default,
+        collapse_whitespace: bool = False,
     ) -> str:
         """Get all child strings of this PageElement, concatenated using the
         given separator.
@@ -542,9 +623,20 @@ class PageElement(object):
             and CData objects. That means no comments, processing
             instructions, etc.
 
+        :param collapse_whitespace: If True, each string will be
+            broken into pieces at line breaks and at runs of two or
+            more spaces. The pieces are stripped, empty pieces are
+            dropped, and the rest are concatenated using the
+            separator. This tidies up the text of a page laid out with
+            lots of whitespace, the way ``get_text("\\n")`` followed by
+            splitting, stripping and rejoining the lines would.
+
         :return: A string.
         """
-        return separator.join([s for s in self._all_strings(strip, types=types)])
+        strings: Iterable[str] = self._all_strings(strip, types=types)
+        if collapse_whitespace:
+            strings = _collapse_whitespace(strings)
+        return separator.join([s for s in strings])
 
     getText = get_text
     text = property(get_text)
@@ -593,7 +685,9 @@ class PageElement(object):
 
         :return: this `PageElement`, no longer part of the tree.
         """
+        index = _index_for(self) if isinstance(self, Tag) else None
         if self.parent is not None:
+            _forget_structural_hash(self.parent)
             if _self_index is None:
                 _self_index = self.parent.index(self)
             del self.parent.contents[_self_index]
@@ -630,6 +724,8 @@ class PageElement(object):
         ):
             self.next_sibling.previous_sibling = self.previous_sibling
         self.previous_sibling = self.next_sibling = None
+        if index is not None:
+            index.remove(cast(Tag, self))
         return self
 
     def decompose(self) -> None:
@@ -648,9 +744,11 @@ class PageElement(object):
         next_up: _AtMostOneElement = None
         while e is not None:
             next_up = e.next_element
-            e.__dict__.clear()
             if isinstance(e, Tag):
+                e._clear_slots()
                 e.contents = []
+            if hasattr(e, "__dict__"):
+                e.__dict__.clear()
             e._decomposed = True
             e = next_up
 
@@ -1566,6 +1664,121 @@ class RubyParenthesisString(NavigableString):
     """
 
 
+class _TagConfiguration(object):
+    """Settings that every `Tag` created by a given `TreeBuilder` has in
+    common.
+
+    Rather than storing its own reference to each of these values,
+    every `Tag` points to one shared `_TagConfiguration`. The object
+    is never modified in place: assigning one of these attributes on a
+    `Tag` gives that `Tag` a modified copy.
+
+    :meta private:
+    """
+
+    __slots__ = (
+        "parser_class",
+        "known_xml",
+        "attribute_value_list_class",
+        "cdata_list_attributes",
+        "preserve_whitespace_tags",
+    )
+
+    parser_class: Optional[type[BeautifulSoup]]
+    known_xml: Optional[bool]
+    attribute_value_list_class: Type[AttributeValueList]
+    cdata_list_attributes: Optional[Dict[str, Set[str]]]
+    preserve_whitespace_tags: Optional[Set[str]]
+
+    def __init__(
+        self,
+        parser_class: Optional[type[BeautifulSoup]] = None,
+        known_xml: Optional[bool] = None,
+        attribute_value_list_class: Type[AttributeValueList] = AttributeValueList,
+        cdata_list_attributes: Optional[Dict[str, Set[str]]] = None,
+        preserve_whitespace_tags: Optional[Set[str]] = None,
+    ):
+        self.parser_class = parser_class
+        self.known_xml = known_xml
+        self.attribute_value_list_class = attribute_value_list_class
+        self.cdata_list_attributes = cdata_list_attributes
+        self.preserve_whitespace_tags = preserve_whitespace_tags
+
+    def replace(self, name: str, value: Any) -> _TagConfiguration:
+        """Return a copy of this object with one value changed."""
+        values = dict((slot, getattr(self, slot)) for slot in self.__slots__)
+        values[name] = value
+        return _TagConfiguration(**values)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return dict((slot, getattr(self, slot)) for slot in self.__slots__)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    @classmethod
+    def for_builder(
+        cls, builder: TreeBuilder, parser_class: Optional[type[BeautifulSoup]]
+    ) -> _TagConfiguration:
+        """Find or create the configuration shared by every `Tag` that
+        ``builder`` creates for a ``parser_class`` document.
+
+        The configuration is cached on the builder. If any of the
+        builder's settings have been replaced since it was cached, a
+        new one is created.
+        """
+        config: Optional[_TagConfiguration] = getattr(
+            builder, "_tag_configuration", None
+        )
+        if (
+            config is None
+            or config.parser_class is not parser_class
+            or config.known_xml is not builder.is_xml
+            or config.attribute_value_list_class
+            is not builder.attribute_value_list_class
+            or config.cdata_list_attributes is not builder.cdata_list_attributes
+            or config.preserve_whitespace_tags is not builder.preserve_whitespace_tags
+        ):
+            config = cls(
+                parser_class,
+                builder.is_xml,
+                builder.attribute_value_list_class,
+                builder.cdata_list_attributes,
+                builder.preserve_whitespace_tags,
+            )
+            try:
+                setattr(builder, "_tag_configuration", config)
+            except AttributeError:
+                # The builder doesn't accept new attributes; we'll just
+                # have to make a new configuration every time.
+                pass
+        return config
+
+
+_DEFAULT_TAG_CONFIGURATION = _TagConfiguration()
+
+
+def _tag_configuration_property(name: str) -> Any:
+    """Make a `Tag` property that proxies one of the values in its
+    `_TagConfiguration`.
+    """
+
+    def fget(self: Tag) -> Any:
+        return getattr(self._configuration, name)
+
+    def fset(self: Tag, value: Any) -> None:
+        try:
+            config = self._configuration
+        except AttributeError:
+            # This can happen when BeautifulSoup.__init__ sets
+            # known_xml before calling Tag.__init__.
+            config = _DEFAULT_TAG_CONFIGURATION
+        self._configuration = config.replace(name, value)
+
+    return property(fget, fset)
+
+
 class Tag(PageElement):
     """An HTML or XML tag that is part of a parse tree, along with its
     attributes, contents, and relationships to other parts of the tree.
@@ -1615,6 +1828,34 @@ class Tag(PageElement):
 
     """
 
+    # Plain Tag objects don't get an instance dictionary. Values that
+    # are the same for every Tag built by a given TreeBuilder live in
+    # a shared _TagConfiguration. Subclasses that don't declare
+    # __slots__ (including BeautifulSoup itself) get a __dict__ as
+    # usual.
+    __slots__ = (
+        "parent",
+        "next_element",
+        "previous_element",
+        "next_sibling",
+        "previous_sibling",
+        "_decomposed",
+        "_configuration",
+        "name",
+        "namespace",
+        "_namespaces",
+        "prefix",
+        "attrs",
+        "sourceline",
+        "sourcepos",
+        "contents",
+        "hidden",
+        "can_be_empty_element",
+        "interesting_string_types",
+        "_structural_hash",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         parser: Optional[BeautifulSoup] = None,
@@ -1635,14 +1876,12 @@ class Tag(PageElement):
         namespaces: Optional[Dict[str, str]] = None,
         # NOTE: Any new arguments here need to be mirrored in
         # Tag.copy_self, and potentially BeautifulSoup.new_tag
-        # as well.
+        # as well. Any new attributes need to be set in
+        # BeautifulSoup._fast_handle_starttag.
     ):
-        if parser is None:
-            self.parser_class = None
-        else:
-            # We don't actually store the parser object: that lets extracted
-            # chunks be garbage-collected.
-            self.parser_class = parser.__class__
+        # We don't actually store the parser object: that lets extracted
+        # chunks be garbage-collected.
+        parser_class = None if parser is None else parser.__class__
         if name is None:
             raise ValueError("No value provided for new tag's name.")
         self.name = name
@@ -1658,18 +1897,43 @@ class Tag(PageElement):
             self.sourceline = sourceline
             self.sourcepos = sourcepos
 
+        self._decomposed = False
+        self._structural_hash = None
         attr_dict_class: type[AttributeDict]
-        attribute_value_list_class: type[AttributeValueList]
         if builder is None:
             if is_xml:
                 attr_dict_class = XMLAttributeDict
             else:
                 attr_dict_class = HTMLAttributeDict
-            attribute_value_list_class = AttributeValueList
+
+            # In the absence of a TreeBuilder, use whatever values were
+            # passed in here. They're probably None, unless this is a copy of some
+            # other tag.
+            self._configuration = _TagConfiguration(
+                parser_class,
+                is_xml,
+                AttributeValueList,
+                cdata_list_attributes,
+                preserve_whitespace_tags,
+            )
         else:
             attr_dict_class = builder.attribute_dict_class
-            attribute_value_list_class = builder.attribute_value_list_class
-        self.attribute_value_list_class = attribute_value_list_class
+
+            # Keep track of the list of attributes of this tag that
+            # might need to be treated as a list, and the names that
+            # might cause this tag to be treated as a
+            # whitespace-preserved tag.
+            #
+            # For performance reasons, we store the whole data structure
+            # rather than asking the question of every tag. Asking would
+            # require building a new data structure every time, and
+            # (unlike can_be_empty_element), we almost never need
+            # to check this. These values, along with whether or not
+            # this is an XML tag, are the same for every tag the
+            # builder creates, so they're shared.
+            self._configuration = _TagConfiguration.for_builder(
+                builder, parser_class
+            )
 
         if attrs is None:
             self.attrs = attr_dict_class()
@@ -1688,46 +1952,20 @@ class Tag(PageElement):
                         v = v.__class__(v)
                     self.attrs[k] = v
 
-        # If possible, determine ahead of time whether this tag is an
-        # XML tag.
-        if builder:
-            self.known_xml = builder.is_xml
-        else:
-            self.known_xml = is_xml
         self.contents: List[PageElement] = []
         self.setup(parent, previous)
         self.hidden = False
 
         if builder is None:
-            # In the absence of a TreeBuilder, use whatever values were
-            # passed in here. They're probably None, unless this is a copy of some
-            # other tag.
             self.can_be_empty_element = can_be_empty_element
-            self.cdata_list_attributes = cdata_list_attributes
-            self.preserve_whitespace_tags = preserve_whitespace_tags
             self.interesting_string_types = interesting_string_types
         else:
             # Set up any substitutions for this tag, such as the charset in a META tag.
-            self.attribute_value_list_class = builder.attribute_value_list_class
             builder.set_up_substitutions(self)
 
             # Ask the TreeBuilder whether this tag might be an empty-element tag.
             self.can_be_empty_element = builder.can_be_empty_element(name)
 
-            # Keep track of the list of attributes of this tag that
-            # might need to be treated as a list.
-            #
-            # For performance reasons, we store the whole data structure
-            # rather than asking the question of every tag. Asking would
-            # require building a new data structure every time, and
-            # (unlike can_be_empty_element), we almost never need
-            # to check this.
-            self.cdata_list_attributes = builder.cdata_list_attributes
-
-            # Keep track of the names that might cause this tag to be treated as a
-            # whitespace-preserved tag.
-            self.preserve_whitespace_tags = builder.preserve_whitespace_tags
-
             if self.name in builder.string_containers:
                 # This sort of tag uses a special string container
                 # subclass for most of its strings. We need to be able
@@ -1736,21 +1974,32 @@ class Tag(PageElement):
             else:
                 self.interesting_string_types = self.MAIN_CONTENT_STRING_TYPES
 
-    parser_class: Optional[type[BeautifulSoup]]
     name: str
     namespace: Optional[str]
     prefix: Optional[str]
     attrs: _AttributeValues
     sourceline: Optional[int]
     sourcepos: Optional[int]
-    known_xml: Optional[bool]
     contents: List[PageElement]
     hidden: bool
     interesting_string_types: Optional[Set[Type[NavigableString]]]
-
     can_be_empty_element: Optional[bool]
-    cdata_list_attributes: Optional[Dict[str, Set[str]]]
-    preserve_whitespace_tags: Optional[Set[str]]
+    _configuration: _TagConfiguration
+    _structural_hash: Optional[int]
+
+    # Only a BeautifulSoup object ever has an index; see
+    # BeautifulSoup.enable_index().
+    _element_index: Optional[_ElementIndex] = None
+
+    parser_class = _tag_configuration_property("parser_class")
+    known_xml = _tag_configuration_property("known_xml")
+    attribute_value_list_class = _tag_configuration_property(
+        "attribute_value_list_class"
+    )
+    cdata_list_attributes = _tag_configuration_property("cdata_list_attributes")
+    preserve_whitespace_tags = _tag_configuration_property(
+        "preserve_whitespace_tags"
+    )
 
     #: :meta private:
     parserClass = _deprecated_alias("parserClass", "parser_class", "4.0.0")
@@ -1809,6 +2058,18 @@ class Tag(PageElement):
             setattr(clone, attr, getattr(self, attr))
         return clone
 
+    def _clear_slots(self) -> None:
+        """Wipe out all of this Tag's slotted attributes, as part of
+        decomposing it.
+        """
+        for attr in Tag.__slots__:
+            if attr != "__weakref__":
+                try:
+                    object.__delattr__(self, attr)
+                except AttributeError:
+                    # This slot was never set.
+                    pass
+
     @property
     def is_empty_element(self) -> bool:
         """Is this tag an empty-element tag? (aka a self-closing tag)
@@ -1886,22 +2147,14 @@ class Tag(PageElement):
             considered. That means no comments, processing
             instructions, etc.
         """
-        if types is self.default:
-            if self.interesting_string_types is None:
-                types = self.MAIN_CONTENT_STRING_TYPES
-            else:
-                types = self.interesting_string_types
-
+        string_types = self._string_types(types)
         for descendant in self.descendants:
-            if not isinstance(descendant, NavigableString):
-                continue
-            descendant_type = type(descendant)
-            if isinstance(types, type):
-                if descendant_type is not types:
-                    # We're not interested in strings of this type.
+            if string_types is None:
+                if not isinstance(descendant, NavigableString):
                     continue
-            elif types is not None and descendant_type not in types:
-                # We're not interested in strings of this type.
+            elif type(descendant) not in string_types:
+                # This is a Tag, or we're not interested in strings
+                # of this type.
                 continue
             if strip:
                 stripped = descendant.strip()
@@ -1913,6 +2166,91 @@ class Tag(PageElement):
 
     strings = property(_all_strings)
 
+    def _string_types(
+        self, types: _OneOrMoreStringTypes
+    ) -> Optional[Set[Type[NavigableString]]]:
+        """Turn the ``types`` argument to `Tag._all_strings` or
+        `Tag.get_text` into a set of the string classes to look for.
+
+        A `Tag` is never in the set, so a single lookup in the set
+        tells whether an element is a string of an interesting type.
+
+        :return: A set of `NavigableString` subclasses, or None if
+            every kind of string is interesting.
+        """
+        if types is self.default:
+            if self.interesting_string_types is None:
+                types = self.MAIN_CONTENT_STRING_TYPES
+            else:
+                types = self.interesting_string_types
+        if types is None:
+            return None
+        if isinstance(types, type):
+            types = (types,)
+        return set(
+            x for x in types if isinstance(x, type) and issubclass(x, NavigableString)
+        )
+
+    def get_text(
+        self,
+        separator: str = "",
+        strip: bool = False,
+        types: _OneOrMoreStringTypes = PageElement.default,
+        collapse_whitespace: bool = False,
+    ) -> str:
+        """Get all child strings of this `Tag`, concatenated using the
+        given separator.
+
+        This does the same thing as `PageElement.get_text`, but walks
+        the tree directly instead of going through
+        `Tag._all_strings`, which makes it a lot faster on a large
+        document.
+
+        :param separator: Strings will be concatenated using this separator.
+
+        :param strip: If True, strings will be stripped before being
+            concatenated.
+
+        :param types: A tuple of NavigableString subclasses. Any
+            strings of a subclass not found in this list will be
+            ignored. By default, the subclasses considered are the
+            ones found in self.interesting_string_types. If that's not
+            specified, only NavigableString and CData objects will be
+            considered.
+
+        :param collapse_whitespace: If True, each string will be
+            broken into pieces at line breaks and at runs of two or
+            more spaces. The pieces are stripped, empty pieces are
+            dropped, and the rest are concatenated using the
+            separator.
+
+        :return: A string.
+        """
+        string_types = self._string_types(types)
+        pieces: List[str] = []
+        if self.contents:
+            append = pieces.append
+            stop = cast(PageElement, self._last_descendant()).next_element
+            element: _AtMostOneElement = self.contents[0]
+            if string_types is None:
+                while element is not stop and element is not None:
+                    if isinstance(element, NavigableString):
+                        append(element)
+                    element = element.next_element
+            else:
+                while element is not stop and element is not None:
+                    if type(element) in string_types:
+                        append(cast(NavigableString, element))
+                    element = element.next_element
+        if collapse_whitespace:
+            pieces = _collapse_whitespace(pieces)
+        elif strip:
+            pieces = [x for x in map(str.strip, pieces) if x]
+        return separator.join(pieces)
+
+    getText = get_text
+    text = property(get_text)
+
     def insert(self, position: int, *new_children: _InsertableElement) -> List[PageElement]:
         """Insert one or more new PageElements as a child of this `Tag`.
 
@@ -1946,6 +2284,11 @@ class Tag(PageElement):
             # object contains another. Insert the BeautifulSoup's children and
             # return them.
             return self.insert(position, *list(new_child.contents))
+        if isinstance(new_child, Tag):
+            index = _index_for(self)
+            if index is not None:
+                index.invalidate()
+        _forget_structural_hash(self)
         position = min(position, len(self.contents))
         if hasattr(new_child, "parent") and new_child.parent is not None:
             # We're 'inserting' an element that's already one
@@ -2200,6 +2543,72 @@ class Tag(PageElement):
     def __hash__(self) -> int:
         return str(self).__hash__()
 
+    def __getstate__(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        # This is the state pickle would store by default, minus the
+        # structural hash, which is only meaningful within the
+        # process that calculated it.
+        slots = {}
+        for attr in Tag.__slots__:
+            if attr != "__weakref__" and attr != "_structural_hash":
+                try:
+                    slots[attr] = object.__getattribute__(self, attr)
+                except AttributeError:
+                    # This slot was never set.
+                    pass
+        return getattr(self, "__dict__", None) or None, slots
+
+    def __setstate__(self, state: Any) -> None:
+        self._structural_hash = None
+        if isinstance(state, tuple):
+            state, slots = state
+            for attr, value in slots.items():
+                setattr(self, attr, value)
+        if state:
+            self.__dict__.update(state)
+
+    def structural_hash(self) -> int:
+        """Calculate a hash of this `Tag`'s name, attributes and
+        contents (recursively): the things `Tag.__eq__` looks at.
+
+        Two `Tag` objects that are equal always have the same
+        structural hash. Two with different structural hashes are
+        never equal, so a dictionary keyed on the structural hash is a
+        cheap way to find duplicate subtrees, such as the same block
+        of markup repeated across many pages. Since hashes can
+        collide, use == to confirm that two `Tag` objects with the
+        same hash really are duplicates.
+
+        The hash is calculated once and cached on this `Tag` and all
+        of its descendants. The cached hash is thrown away when the
+        tree is modified with methods like `Tag.append`,
+        `PageElement.extract`, or by setting ``tag[key]``. Changes
+        made by assigning directly to `Tag.name`, `Tag.attrs` or
+        `Tag.contents`, or by changing an attribute value in place
+        (such as appending to ``tag['class']``), are not noticed, and
+        the cached hash will be out of date. == never uses the cached
+        hash, so it's always correct. Hashes of strings vary between
+        Python processes, and so do structural hashes.
+        """
+        cached = self._structural_hash
+        if cached is not None:
+            return cached
+        # Calculate the hashes of descendants before their parents,
+        # without recursing.
+        stack: List[Tuple[Tag, bool]] = [(self, False)]
+        while stack:
+            tag, children_done = stack.pop()
+            if children_done:
+                tag._structural_hash = _calculate_structural_hash(tag)
+                continue
+            stack.append((tag, True))
+            for child in tag.contents:
+                if (
+                    isinstance(child, Tag)
+                    and getattr(child, "_structural_hash", None) is None
+                ):
+                    stack.append((child, False))
+        return cast(int, self._structural_hash)
+
     def __getitem__(self, key: str) -> _AttributeValue:
         """tag[key] returns the value of the 'key' attribute for the Tag,
         and throws an exception if it's not there."""
@@ -2224,10 +2633,22 @@ class Tag(PageElement):
         """Setting tag[key] sets the value of the 'key' attribute for the
         tag."""
         self.attrs[key] = value
+        _forget_structural_hash(self)
+        if key == "id" or key == "class":
+            self._attribute_changed()
 
     def __delitem__(self, key: str) -> None:
         "Deleting tag[key] deletes all 'key' attributes for the tag."
         self.attrs.pop(key, None)
+        _forget_structural_hash(self)
+        if key == "id" or key == "class":
+            self._attribute_changed()
+
+    def _attribute_changed(self) -> None:
+        """An indexed attribute of this tag has changed."""
+        index = _index_for(self)
+        if index is not None:
+            index.invalidate()
 
     def __call__(
         self,
@@ -2260,8 +2681,13 @@ class Tag(PageElement):
                 stacklevel=2,
             )
             result = self.find(tag_name)
-        # We special case contents to avoid recursion.
-        elif not subtag.startswith("__") and not subtag == "contents":
+        # We special case contents to avoid recursion, and
+        # _structural_hash because it's looked up with getattr().
+        elif (
+            not subtag.startswith("__")
+            and subtag != "contents"
+            and subtag != "_structural_hash"
+        ):
             result = self.find(subtag)
         else:
             raise AttributeError(
@@ -2367,6 +2793,9 @@ class Tag(PageElement):
         if indent_level is True:
             indent_level = 0
 
+        if indent_level is None and iterator is None and self._can_serialize(formatter):
+            return "".join(self._serialize(eventual_encoding, formatter))
+
         # The currently active tag that put us into string literal
         # mode. Until this element is closed, children will be treated
         # as string literals and not pretty-printed. String literal
@@ -2435,7 +2864,7 @@ class Tag(PageElement):
                         piece = self._indent_string(
                             piece, indent_level, formatter, indent_before, indent_after
                         )
-                if event == Tag.START_ELEMENT_EVENT:
+                if event is Tag.START_ELEMENT_EVENT:
                     indent_level += 1
             pieces.append(piece)
         return "".join(pieces)
@@ -2478,8 +2907,10 @@ class Tag(PageElement):
         for c in iterator:
             # If the parent of the element we're about to yield is not
             # the tag currently on the stack, it means that the tag on
-            # the stack closed before this element appeared.
-            while tag_stack and c.parent != tag_stack[-1]:
+            # the stack closed before this element appeared. (This
+            # compares by identity; Tag.__eq__ would compare the two
+            # tags' entire contents.)
+            while tag_stack and c.parent is not tag_stack[-1]:
                 now_closed_tag = tag_stack.pop()
                 yield Tag.END_ELEMENT_EVENT, now_closed_tag
 
@@ -2587,6 +3018,189 @@ class Tag(PageElement):
             + ">"
         )
 
+    #: How many pieces of output `Tag._serialize` gathers up before
+    #: yielding them as a single string.
+    SERIALIZE_CHUNK_PIECES: int = 4096
+
+    @classmethod
+    def _can_serialize(cls, formatter: Formatter) -> bool:
+        """Can `Tag._serialize` produce the same output as `Tag.decode`
+        with this formatter?
+
+        It can if the formatter is one of the standard classes, which
+        change output only through the values passed into their
+        constructors.
+        """
+        return type(formatter) in (Formatter, HTMLFormatter, XMLFormatter)
+
+    def _serialize(
+        self,
+        eventual_encoding: _Encoding,
+        formatter: Formatter,
+        include_self: bool = True,
+    ) -> Iterator[str]:
+        """Render this `Tag` as a Unicode string, in chunks, without
+        pretty-printing.
+
+        This produces the same output as `Tag.decode` (or
+        `Tag.decode_contents`, if ``include_self`` is False) with a
+        formatter approved by `Tag._can_serialize`, but it walks the
+        tree directly, compares tags by identity rather than with
+        `Tag.__eq__`, and formats tags and strings inline instead of
+        going through `Tag._format_tag`, `PageElement.output_ready`
+        and the `Formatter` methods.
+
+        :yield: Strings that, concatenated, are the rendered `Tag`.
+        """
+        substitute = formatter.entity_substitution
+        cdata_containing_tags = formatter.cdata_containing_tags
+        empty_attributes_are_booleans = formatter.empty_attributes_are_booleans
+        void_element_close_prefix = formatter.void_element_close_prefix or ""
+        attribute_value = formatter.attribute_value
+        quoted_attribute_value = formatter.quoted_attribute_value
+        chunk_pieces = self.SERIALIZE_CHUNK_PIECES
+        # Attribute values, especially class names, tend to repeat
+        # throughout a document, so each one is only formatted once.
+        formatted_values: Dict[str, str] = {}
+
+        element: _AtMostOneElement
+        if include_self:
+            element = self
+        elif self.contents:
+            element = self.contents[0]
+        else:
+            return
+        stop = cast(PageElement, self._last_descendant()).next_element
+
+        pieces: List[str] = []
+        append = pieces.append
+        # The open tags, and the closing tag to write for each one.
+        open_tags: List[Tag] = []
+        end_tags: List[str] = []
+
+        while element is not stop and element is not None:
+            parent = element.parent
+            while open_tags and open_tags[-1] is not parent:
+                open_tags.pop()
+                append(end_tags.pop())
+
+            if isinstance(element, Tag):
+                if type(element)._format_tag is not Tag._format_tag:
+                    # A subclass that formats itself differently.
+                    start_tag = element._format_tag(
+                        eventual_encoding, formatter, opening=True
+                    )
+                    end_tag = element._format_tag(
+                        eventual_encoding, formatter, opening=False
+                    )
+                elif element.hidden:
+                    start_tag = end_tag = ""
+                else:
+                    name = element.name
+                    if element.prefix:
+                        name = element.prefix + ":" + name
+                    start_tag = "<" + name
+                    end_tag = "</" + name + ">"
+                    attrs = element.attrs
+                    if attrs:
+                        items: Iterable[Tuple[str, Any]] = attrs.items()
+                        if len(attrs) > 1:
+                            # The standard formatters sort attributes.
+                            items = sorted(items)
+                        for key, val in items:
+                            if val is None or (
+                                empty_attributes_are_booleans and val == ""
+                            ):
+                                start_tag += " " + key
+                                continue
+                            if isinstance(val, list) or isinstance(val, tuple):
+                                val = " ".join(val)
+                            elif not isinstance(val, str):
+                                val = str(val)
+                            elif (
+                                isinstance(val, AttributeValueWithCharsetSubstitution)
+                                and eventual_encoding is not None
+                            ):
+                                val = val.substitute_encoding(eventual_encoding)
+                            if type(val) is str:
+                                formatted = formatted_values.get(val)
+                                if formatted is None:
+                                    formatted = formatted_values[val] = (
+                                        quoted_attribute_value(attribute_value(val))
+                                    )
+                            else:
+                                formatted = quoted_attribute_value(attribute_value(val))
+                            start_tag += " " + str(key) + "=" + formatted
+                    if element.is_empty_element:
+                        start_tag += void_element_close_prefix
+                    start_tag += ">"
+                append(start_tag)
+                if not element.is_empty_element:
+                    open_tags.append(element)
+                    end_tags.append(end_tag)
+            else:
+                string_class = type(element)
+                if string_class.output_ready is not NavigableString.output_ready:
+                    append(cast(NavigableString, element).output_ready(formatter))
+                else:
+                    text: str = cast(NavigableString, element)
+                    if substitute is not None and (
+                        parent is None or parent.name not in cdata_containing_tags
+                    ):
+                        text = substitute(text)
+                    if string_class.PREFIX or string_class.SUFFIX:
+                        text = string_class.PREFIX + text + string_class.SUFFIX
+                    append(text)
+
+            if len(pieces) >= chunk_pieces:
+                yield "".join(pieces)
+                del pieces[:]
+            if element is self:
+                # A BeautifulSoup object's .next_element isn't its
+                # first child.
+                if not self.contents:
+                    break
+                element = self.contents[0]
+            else:
+                element = element.next_element
+
+        while end_tags:
+            append(end_tags.pop())
+        yield "".join(pieces)
+
+    def write_to(
+        self,
+        writer: Callable[[str], Any],
+        indent_level: Optional[int] = None,
+        eventual_encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        formatter: _FormatterOrName = "minimal",
+    ) -> None:
+        """Render this `Tag` and its contents as a Unicode string, a
+        chunk at a time, passing each chunk to a function.
+
+        This produces the same output as `Tag.decode`, but the whole
+        string never has to be in memory at once, so a very large
+        document can be written out to a file::
+
+         with open("page.html", "w", encoding="utf8") as f:
+             soup.write_to(f.write)
+
+        :param writer: A function to call with each chunk of output,
+            such as the ``write`` method of a file opened in text mode.
+
+        All other arguments have the same meaning as in `Tag.decode`.
+        When pretty-printing (if ``indent_level`` is not None), the
+        output is passed to ``writer`` all at once.
+        """
+        if not isinstance(formatter, Formatter):
+            formatter = self.formatter_for_name(formatter)
+        if indent_level is None and self._can_serialize(formatter):
+            for chunk in self._serialize(eventual_encoding, formatter):
+                if chunk:
+                    writer(chunk)
+        else:
+            writer(self.decode(indent_level, eventual_encoding, formatter))
+
     def _should_pretty_print(self, indent_level: int = 1) -> bool:
         """Should this tag be pretty-printed?
 
@@ -2640,6 +3254,12 @@ class Tag(PageElement):
         :param formatter: A `Formatter` object, or a string naming one of
             the standard Formatters.
         """
+        if not isinstance(formatter, Formatter):
+            formatter = self.formatter_for_name(formatter)
+        if indent_level is None and self._can_serialize(formatter):
+            return "".join(
+                self._serialize(eventual_encoding, formatter, include_self=False)
+            )
         return self.decode(
             indent_level, eventual_encoding, formatter, iterator=self.descendants
         )
@@ -2740,6 +3360,16 @@ class Tag(PageElement):
         generator = self.descendants
         if not recursive:
             generator = self.children
+        elif _indexes and self.contents:
+            # If this document has an index, it may be able to rule
+            # out most of the tags without looking at them.
+            from bs4.filter import ElementFilter
+
+            index = _index_for(self)
+            if index is not None and not isinstance(name, ElementFilter):
+                candidates = index.candidates(self, name, attrs, kwargs)
+                if candidates is not None:
+                    generator = iter(candidates)
         return self._find_all(
             name, attrs, string, limit, generator, _stacklevel=_stacklevel + 1, **kwargs
         )
@@ -2855,6 +3485,256 @@ class Tag(PageElement):
         return self.has_attr(key)
 
 
+class _ElementIndex(object):
+    """An index of the tags in a document, by name, ``id`` and each
+    ``class`` value, which lets `Tag.find_all` look at just the tags
+    that might match instead of every tag in the document.
+
+    The index is built the first time it's needed. Removing a tag
+    from the document (with `PageElement.extract` and the methods
+    that call it) removes it from the index; adding a tag, or
+    reparsing the document, means the index will be rebuilt the next
+    time it's used. So does changing the "id" or "class" attribute
+    through `Tag.__setitem__` or `Tag.__delitem__`, or changing an
+    `AttributeValueList` value of one of those attributes in place.
+
+    The index only ever suggests candidates; every candidate is still
+    checked against the full query. Changes the index can't see--a
+    change to `Tag.name`, to `Tag.attrs` directly, or in place to a
+    value that isn't an `AttributeValueList`--may cause it to miss
+    matches. Call `BeautifulSoup.enable_index` again after making
+    such changes.
+
+    :meta private:
+    """
+
+    def __init__(self, root: Tag):
+        self.root = root
+        self.built = False
+        self.by_name: Dict[str, Dict[int, Tag]] = {}
+        self.by_id: Dict[str, Dict[int, Tag]] = {}
+        self.by_class: Dict[str, Dict[int, Tag]] = {}
+        # Every bucket each tag is in, so it can be removed even if
+        # its name or attributes have changed since it was indexed.
+        self.buckets: Dict[int, List[Dict[int, Tag]]] = {}
+        # The position of each tag in the document.
+        self.positions: Dict[int, int] = {}
+
+    def invalidate(self) -> None:
+        """Throw the index away. It'll be rebuilt when it's next used."""
+        if self.built:
+            self.built = False
+            self.by_name = {}
+            self.by_id = {}
+            self.by_class = {}
+            self.buckets = {}
+            self.positions = {}
+
+    def build(self) -> None:
+        for element in self.root.descendants:
+            if isinstance(element, Tag):
+                self.add(element)
+        self.built = True
+
+    @classmethod
+    def _keys(cls, value: Any) -> Iterator[str]:
+        if isinstance(value, str):
+            yield value
+            yield from nonwhitespace_re.findall(value)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                yield from cls._keys(item)
+        elif isinstance(value, bytes):
+            yield from cls._keys(value.decode("utf8", "replace"))
+        elif value is not None:
+            yield from cls._keys(str(value))
+
+    def add(self, tag: Tag) -> None:
+        key = id(tag)
+        self.positions[key] = len(self.positions)
+        buckets = self.buckets.setdefault(key, [])
+        bucket = self.by_name.setdefault(tag.name, {})
+        bucket[key] = tag
+        buckets.append(bucket)
+        for attribute, value in tag.attrs.items():
+            # Attribute names are compared case-insensitively by CSS
+            # selectors in HTML documents, so "ID" is indexed along
+            # with "id".
+            if attribute == "id" or attribute == "class":
+                lowered = attribute
+            else:
+                lowered = attribute.lower()
+                if lowered != "id" and lowered != "class":
+                    continue
+            table = self.by_id if lowered == "id" else self.by_class
+            if isinstance(value, AttributeValueList):
+                # Changing the list in place will throw the index away.
+                value._owner = tag
+            for value_key in set(self._keys(value)):
+                bucket = table.setdefault(value_key, {})
+                bucket[key] = tag
+                buckets.append(bucket)
+
+    def discard(self, tag: Tag) -> None:
+        key = id(tag)
+        self.positions.pop(key, None)
+        for bucket in self.buckets.pop(key, ()):
+            bucket.pop(key, None)
+
+    def remove(self, tag: Tag) -> None:
+        """Remove a tag and everything beneath it from the index."""
+        if not self.built:
+            return
+        for element in tag.self_and_descendants:
+            if isinstance(element, Tag):
+                self.discard(element)
+
+    def candidates(
+        self,
+        scope: Tag,
+        name: Any,
+        attrs: Any,
+        kwargs: Dict[str, Any],
+    ) -> Optional[List[Tag]]:
+        """Find the tags beneath ``scope`` that might match a
+        find_all() query, in document order.
+
+        :return: A list of candidates, or None if the index can't
+            narrow down this query.
+        """
+        buckets: List[Dict[int, Tag]] = []
+        if not self.built:
+            self.build()
+        if isinstance(name, str) and ":" not in name:
+            buckets.append(self.by_name.get(name, {}))
+        if not isinstance(attrs, dict):
+            attrs = {"class": attrs}
+        rules = list(attrs.items())
+        for attribute, value in kwargs.items():
+            rules.append(("class" if attribute == "class_" else attribute, value))
+        for attribute, value in rules:
+            if not isinstance(value, str):
+                continue
+            tokens = nonwhitespace_re.findall(value)
+            if not tokens:
+                continue
+            if attribute == "id":
+                buckets.append(self.by_id.get(value, {}))
+            elif attribute == "class":
+                # Any tag that matches has all of these values in its
+                # class, so any one of them will do.
+                buckets.append(self.by_class.get(tokens[0], {}))
+        if not buckets:
+            return None
+
+        return self._in_scope(scope, list(min(buckets, key=len).values()))
+
+    def tag_names(self) -> List[str]:
+        """List the names of all the tags in the document."""
+        if not self.built:
+            self.build()
+        return list(self.by_name)
+
+    def tags_with(
+        self,
+        scope: Tag,
+        names: Iterable[str] = (),
+        ids: Iterable[str] = (),
+        classes: Iterable[str] = (),
+    ) -> List[Tag]:
+        """Find the tags beneath ``scope`` that have any of the given
+        names, any of the given ids, or any of the given classes, in
+        document order.
+        """
+        if not self.built:
+            self.build()
+        buckets = []
+        for table, keys in (
+            (self.by_name, names),
+            (self.by_id, ids),
+            (self.by_class, classes),
+        ):
+            for key in keys:
+                bucket = table.get(key)
+                if bucket:
+                    buckets.append(bucket)
+        if not buckets:
+            return []
+        if len(buckets) == 1:
+            tags = list(buckets[0].values())
+        else:
+            found: Dict[int, Tag] = {}
+            for bucket in buckets:
+                found.update(bucket)
+            positions = self.positions
+            tags = [found[key] for key in sorted(found, key=positions.__getitem__)]
+        return self._in_scope(scope, tags)
+
+    def _in_scope(self, scope: Tag, candidates: List[Tag]) -> List[Tag]:
+        if scope is self.root:
+            return candidates
+        in_scope = []
+        for candidate in candidates:
+            parent = candidate.parent
+            while parent is not None and parent is not scope:
+                parent = parent.parent
+            if parent is scope:
+                in_scope.append(candidate)
+        return in_scope
+
+
+# The indexes of documents that have called BeautifulSoup.enable_index().
+# When there are none, tree modifications don't need to look for one.
+_indexes: weakref.WeakSet[_ElementIndex] = weakref.WeakSet()
+
+
+def _index_for(element: PageElement) -> Optional[_ElementIndex]:
+    """Find the index of the document containing ``element``, if it
+    has one.
+    """
+    if not _indexes:
+        return None
+    root = element
+    while root.parent is not None:
+        root = root.parent
+    return root._element_index if isinstance(root, Tag) else None
+
+
+def _forget_structural_hash(tag: Optional[Tag]) -> None:
+    """Throw away the cached structural hashes of ``tag`` and its
+    ancestors, because something inside ``tag`` has changed.
+    """
+    # A Tag only has a cached hash if all of its descendants do, so
+    # once we find a Tag without one, its ancestors don't have one
+    # either.
+    while tag is not None and getattr(tag, "_structural_hash", None) is not None:
+        tag._structural_hash = None
+        tag = tag.parent
+
+
+def _calculate_structural_hash(tag: Tag) -> int:
+    """Hash a `Tag` whose children already have structural hashes."""
+    # Attributes are hashed in a way that doesn't depend on their
+    # order, just as dictionary comparison doesn't.
+    attribute_hash = 0
+    for key, value in tag.attrs.items():
+        if isinstance(value, list):
+            value = tuple(value)
+        try:
+            attribute_hash += hash((key, value))
+        except TypeError:
+            attribute_hash += hash(key)
+    parts: List[int] = [hash(tag.name), attribute_hash]
+    for child in tag.contents:
+        if isinstance(child, Tag):
+            parts.append(cast(int, child._structural_hash))
+        else:
+            # Strings of different classes are equal if their
+            # values are, so only the value counts.
+            parts.append(str.__hash__(child))
+    return hash(tuple(parts))
+
+
 _PageElementT = TypeVar("_PageElementT", bound=PageElement)
 
 
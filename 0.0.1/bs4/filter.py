@@ -1,5 +1,6 @@
 from __future__ import annotations
 from collections import defaultdict
+from itertools import islice
 import re
 from typing import (
     Any,
@@ -11,6 +12,8 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Set,
+    Tuple,
     Type,
     Union,
 )
@@ -343,6 +346,297 @@ class StringMatchRule(MatchRule):
     function: Optional[_StringMatchFunction]
 
 
+#: The `MatchRule` classes whose behavior depends only on the
+#: attributes set in `MatchRule.__init__`.
+_KNOWN_RULE_CLASSES = (MatchRule, TagNameMatchRule, AttributeValueMatchRule, StringMatchRule)
+
+
+class _CompiledRules(object):
+    """A list of `MatchRule` objects, rearranged so a string can be
+    checked against all of them at once.
+
+    Exact string matches become a set lookup, and regular expressions
+    are combined into a single pattern where that's safe. The cheap
+    checks run before any user-defined functions are called.
+
+    :meta private:
+    """
+
+    rules: Sequence[MatchRule]
+    matches_present: bool
+    matches_none: bool
+    strings: Set[str]
+    patterns: List[_RegularExpressionProtocol]
+    functions: List[Callable]
+    other_rules: List[MatchRule]
+    cost: int
+
+    def __init__(self, rules: Sequence[MatchRule]):
+        self.rules = rules
+        self.matches_present = False
+        self.matches_none = False
+        self.strings = set()
+        self.patterns = []
+        self.functions = []
+        self.other_rules = []
+        for rule in rules:
+            rule_class = type(rule)
+            if (
+                rule_class.matches_string is not MatchRule.matches_string
+                or rule_class._base_match is not MatchRule._base_match
+                or (
+                    isinstance(rule, TagNameMatchRule)
+                    and rule_class.matches_tag is not TagNameMatchRule.matches_tag
+                )
+            ):
+                # A subclass with its own idea of what matches.
+                self.other_rules.append(rule)
+            elif rule.exclude_everything:
+                continue
+            elif rule.present is True:
+                self.matches_present = True
+            elif rule.present is False:
+                self.matches_none = True
+            elif rule.string is not None:
+                self.strings.add(rule.string)
+            elif rule.pattern is not None:
+                self.patterns.append(rule.pattern)
+            elif rule.function is not None:
+                self.functions.append(rule.function)
+        self.patterns = self._combine(self.patterns)
+        self.cost = len(self.patterns) + 10 * (
+            len(self.functions) + len(self.other_rules)
+        )
+        self.match_value = self._value_matcher()
+        self.match_name = self._tag_name_matcher()
+
+    def _only(self, strings: bool = False, patterns: int = 0) -> bool:
+        """Are these exactly the kinds of rules left after compiling?"""
+        return (
+            bool(self.strings) == strings
+            and len(self.patterns) == patterns
+            and not (
+                self.matches_present
+                or self.matches_none
+                or self.functions
+                or self.other_rules
+            )
+        )
+
+    def _value_matcher(self) -> Callable[[Optional[str]], bool]:
+        """Find the fastest function that does the same thing as
+        `_CompiledRules.match` for these rules.
+        """
+        if self._only(strings=True):
+            strings = self.strings
+            return lambda value: value in strings
+        if self._only(patterns=1):
+            search = self.patterns[0].search
+            return lambda value: value is not None and search(value) is not None
+        return self.match
+
+    def _tag_name_matcher(self) -> Callable[[Tag], bool]:
+        """Find the fastest function that does the same thing as
+        `_CompiledRules.match_tag_name` for these rules.
+        """
+        if self._only(strings=True):
+            strings = self.strings
+
+            def match(tag: Tag) -> bool:
+                if tag.name in strings:
+                    return True
+                prefix = tag.prefix
+                return bool(prefix) and f"{prefix}:{tag.name}" in strings
+
+            return match
+        return self.match_tag_name
+
+    @classmethod
+    def _combine(
+        cls, patterns: List[_RegularExpressionProtocol]
+    ) -> List[_RegularExpressionProtocol]:
+        """Turn a list of regular expressions into one, if they're all
+        compiled the same way and none of them has groups a
+        backreference could refer to.
+        """
+        if len(patterns) < 2:
+            return patterns
+        flags = set()
+        for pattern in patterns:
+            if (
+                not isinstance(pattern, re.Pattern)
+                or not isinstance(pattern.pattern, str)
+                or pattern.groups
+                or pattern.flags & re.VERBOSE
+            ):
+                return patterns
+            flags.add(pattern.flags)
+        if len(flags) != 1:
+            return patterns
+        source = "|".join(
+            "(?:%s)" % cast(re.Pattern, pattern).pattern for pattern in patterns
+        )
+        try:
+            return [re.compile(source, flags.pop())]
+        except re.error:
+            # Probably an inline flag that's only allowed at the
+            # start of a pattern.
+            return patterns
+
+    def base_match(self, value: Optional[str]) -> bool:
+        """Does ``value`` match one of the rules, not counting the
+        rules that call a function?
+        """
+        if value is None:
+            return self.matches_none
+        if self.matches_present or value in self.strings:
+            return True
+        for pattern in self.patterns:
+            if pattern.search(value) is not None:
+                return True
+        return False
+
+    def match(self, value: Optional[str]) -> bool:
+        """The equivalent of calling `MatchRule.matches_string` on each
+        rule in turn.
+        """
+        if self.base_match(value):
+            return True
+        for function in self.functions:
+            if function(value):
+                return True
+        for rule in self.other_rules:
+            if rule.matches_string(value):
+                return True
+        return False
+
+    def match_attribute(self, value: Optional[_AttributeValue]) -> bool:
+        """The equivalent of `SoupStrainer._attribute_match`."""
+        match = self.match_value
+        if not isinstance(value, list):
+            return match(value)
+        for item in value:
+            if match(item):
+                return True
+        if len(value) > 1:
+            return match(" ".join(value))
+        return False
+
+    def match_tag_name(self, tag: Tag) -> bool:
+        """The equivalent of checking a `Tag` against a list of
+        `TagNameMatchRule` in `SoupStrainer.matches_tag`.
+        """
+        name = tag.name
+        prefixed_name = None
+        if tag.prefix:
+            prefixed_name = f"{tag.prefix}:{name}"
+        if self.base_match(name) or (
+            prefixed_name is not None and self.base_match(prefixed_name)
+        ):
+            return True
+        for function in self.functions:
+            if function(tag) or (prefixed_name is not None and function(prefixed_name)):
+                return True
+        for rule in self.other_rules:
+            if cast(TagNameMatchRule, rule).matches_tag(tag) or (
+                prefixed_name is not None and rule.matches_string(prefixed_name)
+            ):
+                return True
+        return False
+
+
+class _CompiledStrainer(object):
+    """A `SoupStrainer`'s rules, compiled into a form that's faster to
+    check against a lot of `PageElement` objects.
+
+    This is created by `SoupStrainer._compile`, which shares it
+    between `SoupStrainer` objects whose rules have the same values,
+    and makes a new one if the rules change.
+
+    :meta private:
+    """
+
+    key: Any
+    names: Optional[_CompiledRules]
+    attributes: List[Tuple[str, _CompiledRules]]
+    strings: Optional[_CompiledRules]
+    matches_tags: bool
+
+    #: The equivalent of `SoupStrainer.match`, specialized for
+    #: common kinds of rules.
+    match: Callable[[PageElement], bool]
+
+    def __init__(self, strainer: SoupStrainer, key: Any):
+        self.key = key
+        self.names = None
+        if strainer.name_rules:
+            self.names = _CompiledRules(list(strainer.name_rules))
+        # Check the attributes with the cheapest rules first, since
+        # any one of them can rule out a tag.
+        self.attributes = sorted(
+            (
+                (attr, _CompiledRules(list(rules)))
+                for attr, rules in strainer.attribute_rules.items()
+            ),
+            key=lambda x: x[1].cost,
+        )
+        self.strings = None
+        if strainer.string_rules:
+            self.strings = _CompiledRules(list(strainer.string_rules))
+        self.matches_tags = bool(strainer.name_rules or strainer.attribute_rules)
+        self.match = self._matcher()
+
+    def _matcher(self) -> Callable[[PageElement], bool]:
+        if not self.matches_tags:
+            if self.strings is None:
+                return lambda element: not isinstance(element, Tag)
+            match_string = self.strings.match_value
+            return lambda element: not isinstance(element, Tag) and match_string(
+                cast(NavigableString, element)
+            )
+        if self.names is not None and not self.attributes and self.strings is None:
+            # The most common case: a search by tag name.
+            match_name = self.names.match_name
+            return lambda element: isinstance(element, Tag) and match_name(element)
+        match_tag = self.match_tag
+        return lambda element: isinstance(element, Tag) and match_tag(element)
+
+    def allow_tag_creation(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
+    ) -> bool:
+        """The equivalent of `SoupStrainer.allow_tag_creation`, for a
+        `SoupStrainer` with no string rules.
+        """
+        if self.names is not None:
+            match_name = self.names.match_value
+            if not match_name(name) and not (
+                nsprefix and match_name(f"{nsprefix}:{name}")
+            ):
+                return False
+        if attrs is None:
+            attrs = {}
+        for attr, rules in self.attributes:
+            if not rules.match_attribute(attrs.get(attr)):
+                return False
+        return True
+
+    def match_tag(self, tag: Tag) -> bool:
+        """The equivalent of `SoupStrainer.matches_tag`."""
+        if not self.matches_tags:
+            return False
+        if self.names is not None and not self.names.match_name(tag):
+            return False
+        attrs = tag.attrs
+        for attr, rules in self.attributes:
+            if not rules.match_attribute(attrs.get(attr)):
+                return False
+        if self.strings is not None:
+            string = tag.string
+            if string is None or not self.strings.match_value(string):
+                return False
+        return True
+
+
 class SoupStrainer(ElementFilter):
     """The `ElementFilter` subclass used internally by Beautiful Soup.
 
@@ -375,6 +669,19 @@ class SoupStrainer(ElementFilter):
     attribute_rules: Dict[str, List[AttributeValueMatchRule]]
     string_rules: List[StringMatchRule]
 
+    _compiled: Optional[_CompiledStrainer] = None
+
+    #: Compiled rules shared between `SoupStrainer` objects, keyed by
+    #: the values of their rules. It's emptied when it holds this
+    #: many entries.
+    COMPILED_CACHE_SIZE: int = 256
+
+    #: `SoupStrainer.filter` checks this many elements with
+    #: `SoupStrainer.match` before it decides the search is big
+    #: enough to be worth compiling the rules.
+    COMPILE_AFTER: int = 32
+    _compiled_cache: Dict[Any, _CompiledStrainer] = {}
+
     def __init__(
         self,
         name: Optional[_StrainableElement] = None,
@@ -487,6 +794,113 @@ class SoupStrainer(ElementFilter):
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} name={self.name_rules} attrs={self.attribute_rules} string={self.string_rules}>"
 
+    def _compile(self) -> Optional[_CompiledStrainer]:
+        """Compile this `SoupStrainer`'s rules, or reuse rules that
+        were already compiled for a `SoupStrainer` with the same rules.
+
+        :return: A `_CompiledStrainer`, or None if this is a subclass
+            that changes how matching works.
+        """
+        cls = type(self)
+        if (
+            cls.match is not SoupStrainer.match
+            or cls.matches_tag is not SoupStrainer.matches_tag
+            or cls._attribute_match is not SoupStrainer._attribute_match
+            or cls.matches_any_string_rule is not SoupStrainer.matches_any_string_rule
+        ):
+            return None
+        try:
+            key = self._rule_values()
+            hash(key)
+        except TypeError:
+            # One of the rules can't be used as a dictionary key.
+            key = None
+        compiled = self._compiled
+        if compiled is not None and key is not None and compiled.key == key:
+            return compiled
+        if key is None:
+            compiled = _CompiledStrainer(self, None)
+        else:
+            # find() and find_all() make a new SoupStrainer every
+            # time they're called, so share compiled rules between
+            # strainers that have the same rules.
+            cache = SoupStrainer._compiled_cache
+            compiled = cache.get(key)
+            if compiled is None:
+                if len(cache) >= self.COMPILED_CACHE_SIZE:
+                    cache.clear()
+                compiled = cache[key] = _CompiledStrainer(self, key)
+        self._compiled = compiled
+        return compiled
+
+    def _rule_values(self) -> Tuple[Any, ...]:
+        """Describe this `SoupStrainer`'s rules by value, so that two
+        strainers with the same rules can share a `_CompiledStrainer`.
+
+        :return: A hashable tuple.
+        :raises TypeError: If one of the rules is a `MatchRule`
+            subclass that Beautiful Soup doesn't know how to describe,
+            or if a rule's value is unhashable.
+        """
+        rule_value = self._rule_value
+        return (
+            tuple(map(rule_value, self.name_rules)),
+            tuple(
+                (attr, tuple(map(rule_value, rules)))
+                for attr, rules in self.attribute_rules.items()
+            ),
+            tuple(map(rule_value, self.string_rules)),
+        )
+
+    @staticmethod
+    def _rule_value(rule: MatchRule) -> Tuple[Any, ...]:
+        rule_class = type(rule)
+        if rule_class not in _KNOWN_RULE_CLASSES:
+            # A subclass might match based on something other than
+            # these attributes.
+            raise TypeError(rule_class)
+        return (
+            rule_class,
+            rule.string,
+            rule.pattern,
+            rule.function,  # type:ignore
+            rule.present,
+            rule.exclude_everything,
+        )
+
+    def filter(self, generator: Iterator[PageElement]) -> Iterator[_OneElement]:
+        """Acts like Python's built-in `filter`, using `SoupStrainer.match`
+        as the filtering function.
+
+        If there are more than `SoupStrainer.COMPILE_AFTER` elements
+        to check, the rules are compiled, which makes checking each
+        of the remaining elements faster.
+        """
+        if self.includes_everything:
+            yield from super(SoupStrainer, self).filter(generator)
+            return
+
+        # Searches like find() often stop after a few elements, and
+        # it's faster to check those one at a time than to compile
+        # the rules.
+        generator = iter(generator)
+        checked = 0
+        for i in islice(generator, self.COMPILE_AFTER):
+            checked += 1
+            if i and self.match(i, _known_rules=True):
+                yield cast("_OneElement", i)
+        if checked < self.COMPILE_AFTER:
+            return
+
+        compiled = self._compile()
+        if compiled is None:
+            yield from super(SoupStrainer, self).filter(generator)
+            return
+        match = compiled.match
+        for i in generator:
+            if i and match(i):
+                yield cast("_OneElement", i)
+
     @classmethod
     def _make_match_rules(
         cls,
@@ -659,6 +1073,9 @@ class SoupStrainer(ElementFilter):
             # evaluated until after the tag and all of its contents
             # have been parsed.
             return False
+        compiled = self._compile()
+        if compiled is not None:
+            return compiled.allow_tag_creation(nsprefix, name, attrs)
         prefixed_name = None
         if nsprefix:
             prefixed_name = f"{nsprefix}:{name}"
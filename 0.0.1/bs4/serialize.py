@@ -0,0 +1,937 @@
+"""A compact binary format for parse trees.
+
+`dumps` flattens a `BeautifulSoup` object into a bytestring and
+`loads` turns it back into a `BeautifulSoup` object without running a
+parser, so a cached document loads much faster than it parses. Unlike
+pickle, loading a tree never imports or calls arbitrary code.
+
+A `TreeView` answers simple `find_all` and `get_text` queries directly
+from a serialized tree--for instance, a file opened with
+`TreeView.open`, which is memory-mapped--without building any
+`PageElement` objects at all.
+
+The format is a header followed by a series of arrays of unsigned
+32-bit integers:
+
+* A string table. Every tag name, attribute, namespace and string in
+  the document is stored once, as UTF-8, and referred to by its index.
+* A class table, naming the class of each `PageElement`.
+* One fixed-size record for each node, in document order. A node's
+  descendants are the nodes between it and its ``end`` index.
+* Attribute records, the values of multi-valued attributes, and
+  namespace mappings, each referred to by a range in one of the node
+  records.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+import struct
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+    cast,
+)
+
+from bs4 import element as _element
+from bs4.builder import HTMLTreeBuilder, TreeBuilder, builder_registry
+from bs4.builder._htmlparser import HTMLParserTreeBuilder
+from bs4.element import (
+    NamespacedAttribute,
+    NavigableString,
+    PageElement,
+    Tag,
+    _TagConfiguration,
+)
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4._typing import _AttributeValues
+
+__all__ = [
+    "dumps",
+    "loads",
+    "NodeView",
+    "TreeView",
+]
+
+MAGIC: bytes = b"BS4T"
+VERSION: int = 1
+
+#: Stands in for None wherever the format expects an index or a number.
+NONE: int = 0xFFFFFFFF
+
+# Header: magic, version, flags, then the builder name,
+# original_encoding and declared_html_encoding (as string indexes)
+# and the sizes of each section.
+_HEADER = struct.Struct("<4sHH10I")
+
+# A node: class index | (flags << 16), parent, end, name (or string
+# value), prefix, namespace, attribute start and count, namespace
+# mapping start and count, sourceline, sourcepos.
+_NODE = struct.Struct("<12I")
+_NODE_WORDS = 12
+
+# An attribute: kind, name, prefix, namespace, value, number of
+# values (NONE if the value is a single string rather than a list).
+# A namespace mapping is two words: prefix, URL.
+_ATTRIBUTE_WORDS = 6
+
+# Bits in the header's flags.
+_IS_XML = 1
+_CONTAINS_REPLACEMENT_CHARACTERS = 2
+
+# Bits in a node's flags.
+_TAG = 1
+_HIDDEN = 2
+_CAN_BE_EMPTY_ELEMENT = 4
+
+# Kinds of attribute name.
+_PLAIN_ATTRIBUTE = 0
+_NAMESPACED_ATTRIBUTE = 1
+
+
+class _StringTable(object):
+    """Assigns each distinct string an index as a tree is serialized."""
+
+    def __init__(self) -> None:
+        self.indexes: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.indexes)
+        return index
+
+    def encode(self) -> Tuple[List[int], bytes]:
+        offsets = [0]
+        pieces = []
+        position = 0
+        for value in self.indexes:
+            encoded = value.encode("utf8", "surrogatepass")
+            pieces.append(encoded)
+            position += len(encoded)
+            offsets.append(position)
+        return offsets, b"".join(pieces)
+
+
+def dumps(soup: BeautifulSoup) -> bytes:
+    """Serialize a parse tree.
+
+    :param soup: A `BeautifulSoup` object.
+    :return: A bytestring that can be passed into `loads` or `TreeView`.
+    """
+    strings = _StringTable()
+    classes: Dict[type, int] = {}
+    nodes: List[List[int]] = []
+    attributes: List[int] = []
+    values: List[int] = []
+    namespaces: List[int] = []
+    add = strings.add
+
+    def add_namespaces(mapping: Optional[Dict[str, str]]) -> Tuple[int, int]:
+        if not mapping:
+            return 0, 0
+        start = len(namespaces) // 2
+        for prefix, url in mapping.items():
+            namespaces.append(add(prefix))
+            namespaces.append(add(url))
+        return start, len(mapping)
+
+    # Walk the tree in document order, using .contents rather than
+    # .next_element so the output is sound even if the linkage isn't.
+    todo: List[Tuple[PageElement, int]] = [(soup, NONE)]
+    while todo:
+        node, parent = todo.pop()
+        cls = node.__class__
+        class_index = classes.get(cls)
+        if class_index is None:
+            class_index = classes[cls] = len(classes)
+        index = len(nodes)
+        if isinstance(node, Tag):
+            flags = _TAG
+            if node.hidden:
+                flags |= _HIDDEN
+            if node.can_be_empty_element:
+                flags |= _CAN_BE_EMPTY_ELEMENT
+            attribute_start = len(attributes) // _ATTRIBUTE_WORDS
+            for key, value in node.attrs.items():
+                if isinstance(key, NamespacedAttribute):
+                    attributes.extend(
+                        (
+                            _NAMESPACED_ATTRIBUTE,
+                            add(key.name),
+                            add(key.prefix),
+                            add(key.namespace),
+                        )
+                    )
+                else:
+                    attributes.extend((_PLAIN_ATTRIBUTE, add(key), NONE, NONE))
+                if isinstance(value, list):
+                    attributes.append(len(values))
+                    attributes.append(len(value))
+                    values.extend(add(v) for v in value)
+                else:
+                    attributes.append(add(value))
+                    attributes.append(NONE)
+            namespace_start, namespace_count = add_namespaces(node._namespaces)
+            nodes.append(
+                [
+                    class_index | (flags << 16),
+                    parent,
+                    index + 1,
+                    add(node.name),
+                    add(node.prefix),
+                    add(node.namespace),
+                    attribute_start,
+                    len(node.attrs),
+                    namespace_start,
+                    namespace_count,
+                    _position(node.sourceline),
+                    _position(node.sourcepos),
+                ]
+            )
+            for child in reversed(node.contents):
+                todo.append((child, index))
+        else:
+            nodes.append(
+                [class_index, parent, index + 1, add(cast(str, node))]
+                + [0, 0, 0, 0, 0, 0, NONE, NONE]
+            )
+
+    # A node's subtree ends where its last descendant's subtree ends.
+    # Descendants come after their ancestors, so one backwards pass
+    # propagates this all the way up.
+    for record in reversed(nodes):
+        parent = record[1]
+        if parent != NONE and nodes[parent][2] < record[2]:
+            nodes[parent][2] = record[2]
+
+    class_names = [add(cls.__name__) for cls in classes]
+    builder = soup.builder
+    flags = 0
+    if soup.is_xml:
+        flags |= _IS_XML
+    if soup.contains_replacement_characters:
+        flags |= _CONTAINS_REPLACEMENT_CHARACTERS
+    header_strings = (
+        add(builder.NAME if builder is not None else None),
+        add(soup.original_encoding),
+        add(soup.declared_html_encoding),
+    )
+    offsets, blob = strings.encode()
+
+    node_words = [word for record in nodes for word in record]
+    sizes = (
+        len(offsets) - 1,
+        len(class_names),
+        len(nodes),
+        len(attributes) // _ATTRIBUTE_WORDS,
+        len(values),
+        len(namespaces) // 2,
+        len(blob),
+    )
+    return b"".join(
+        (
+            _HEADER.pack(MAGIC, VERSION, flags, *header_strings, *sizes),
+            _pack_words(offsets),
+            _pack_words(class_names),
+            _pack_words(node_words),
+            _pack_words(attributes),
+            _pack_words(values),
+            _pack_words(namespaces),
+            blob,
+        )
+    )
+
+
+def _position(value: Optional[int]) -> int:
+    """Turn a sourceline or sourcepos into a word. html5lib sets
+    sourcepos to -1 on some of the tags it creates; that, like
+    anything else that won't fit, is stored as NONE.
+    """
+    if value is None or not 0 <= value < NONE:
+        return NONE
+    return value
+
+
+def _pack_words(words: List[int]) -> bytes:
+    return struct.pack("<%dI" % len(words), *words)
+
+
+class _Sections(object):
+    """Locates the sections of a serialized tree."""
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap.mmap]):
+        buffer = memoryview(data)
+        if buffer.nbytes < _HEADER.size:
+            raise ValueError("Not a serialized parse tree: too short.")
+        (
+            magic,
+            version,
+            self.flags,
+            self.builder_name,
+            self.original_encoding,
+            self.declared_html_encoding,
+            string_count,
+            class_count,
+            node_count,
+            attribute_count,
+            value_count,
+            namespace_count,
+            blob_size,
+        ) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a serialized parse tree: bad magic number.")
+        if version != VERSION:
+            raise ValueError(
+                "Serialized parse tree has version %d; only version %d is supported."
+                % (version, VERSION)
+            )
+        self.node_count = node_count
+
+        position = _HEADER.size
+
+        def words(count: int) -> memoryview:
+            nonlocal position
+            start = position
+            position += count * 4
+            return buffer[start:position].cast("I")
+
+        self.offsets = words(string_count + 1)
+        self.classes = words(class_count)
+        self.nodes = words(node_count * _NODE_WORDS)
+        self.attributes = words(attribute_count * _ATTRIBUTE_WORDS)
+        self.values = words(value_count)
+        self.namespaces = words(namespace_count * 2)
+        self.blob = buffer[position : position + blob_size]
+        if self.blob.nbytes != blob_size or node_count == 0:
+            raise ValueError("Serialized parse tree is truncated.")
+
+    def string(self, index: int) -> str:
+        offsets = self.offsets
+        return str(
+            self.blob[offsets[index] : offsets[index + 1]], "utf8", "surrogatepass"
+        )
+
+    def all_strings(self) -> List[Optional[str]]:
+        blob = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        return [
+            blob[start:end].decode("utf8", "surrogatepass")
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def release(self) -> None:
+        for view in (
+            self.offsets,
+            self.classes,
+            self.nodes,
+            self.attributes,
+            self.values,
+            self.namespaces,
+            self.blob,
+        ):
+            view.release()
+
+
+def _resolve_classes(
+    names: List[str],
+    element_classes: Dict[Type[PageElement], Type[PageElement]],
+) -> List[type]:
+    """Find the class for each entry in a serialized tree's class table.
+
+    Only classes defined in `bs4.element`, and classes that were
+    passed in through ``element_classes``, are used. Any other class
+    is replaced by the `Tag` or `NavigableString` class that would be
+    used for a newly parsed document.
+    """
+    known: Dict[str, type] = {}
+    for name in dir(_element):
+        value = getattr(_element, name)
+        if isinstance(value, type) and issubclass(value, (Tag, NavigableString)):
+            known[value.__name__] = value
+    for cls in element_classes.values():
+        known[cls.__name__] = cls
+    tag_class = element_classes.get(Tag, Tag)
+    string_class = element_classes.get(NavigableString, NavigableString)
+    known["Tag"] = tag_class
+    known["NavigableString"] = string_class
+
+    classes: List[type] = []
+    for name in names:
+        cls = known.get(name)
+        if cls is None:
+            # We can't tell whether this was a Tag or a string
+            # class, but the node records can. Use None as a
+            # placeholder.
+            classes.append(type(None))
+        else:
+            classes.append(cls)
+    return classes
+
+
+def loads(
+    data: Union[bytes, bytearray, memoryview, mmap.mmap],
+    features: Optional[Union[str, List[str]]] = None,
+    builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+    element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+) -> BeautifulSoup:
+    """Rebuild a parse tree serialized by `dumps`.
+
+    :param data: The output of `dumps`.
+    :param features: The tree builder to associate with the new
+        `BeautifulSoup` object. By default, the tree builder that built
+        the original document is used, if it's available.
+    :param builder: A `TreeBuilder` to use instead of ``features``.
+    :param element_classes: As in the `BeautifulSoup` constructor.
+    :return: A `BeautifulSoup` object.
+    """
+    from bs4 import BeautifulSoup
+
+    sections = _Sections(data)
+    try:
+        if features is None and builder is None:
+            name = (
+                sections.string(sections.builder_name)
+                if sections.builder_name != NONE
+                else None
+            )
+            if name is None or builder_registry.lookup(name) is None:
+                builder = HTMLParserTreeBuilder
+            else:
+                features = name
+        soup = BeautifulSoup(
+            "", features, builder, element_classes=element_classes
+        )
+        _load_into(soup, sections)
+    finally:
+        sections.release()
+    return soup
+
+
+def _load_into(soup: BeautifulSoup, data: Union[bytes, _Sections]) -> None:
+    """Rebuild a serialized parse tree inside a `BeautifulSoup` object
+    that has just been reset.
+
+    :meta private:
+    """
+    if not isinstance(data, _Sections):
+        sections = _Sections(data)
+        try:
+            _load_into(soup, sections)
+        finally:
+            sections.release()
+        return
+    sections = data
+    strings: List[Optional[str]] = sections.all_strings()
+    strings.append(None)
+
+    def string(index: int) -> Optional[str]:
+        # NONE is -1 as far as list indexing is concerned.
+        return strings[index] if index != NONE else None
+
+    classes = _resolve_classes(
+        [cast(str, strings[i]) for i in sections.classes], soup.element_classes
+    )
+    tag_class = soup.element_classes.get(Tag, Tag)
+    string_class = soup.element_classes.get(NavigableString, NavigableString)
+
+    soup.is_xml = soup.known_xml = bool(sections.flags & _IS_XML)
+    soup.contains_replacement_characters = bool(
+        sections.flags & _CONTAINS_REPLACEMENT_CHARACTERS
+    )
+    soup.original_encoding = string(sections.original_encoding)
+    soup.declared_html_encoding = string(sections.declared_html_encoding)
+
+    builder = soup.builder
+    attribute_dict_class = builder.attribute_dict_class
+    attribute_value_list_class = builder.attribute_value_list_class
+    configuration = _TagConfiguration.for_builder(builder, soup.__class__)
+    words = sections.attributes.tolist()
+    values = sections.values.tolist()
+    namespaces = sections.namespaces.tolist()
+
+    def load_attributes(start: int, count: int) -> _AttributeValues:
+        attrs = attribute_dict_class()
+        position = start * _ATTRIBUTE_WORDS
+        for _ in range(count):
+            kind, name, prefix, namespace, value, value_count = words[
+                position : position + _ATTRIBUTE_WORDS
+            ]
+            position += _ATTRIBUTE_WORDS
+            key: str
+            if kind == _NAMESPACED_ATTRIBUTE:
+                key = NamespacedAttribute(
+                    cast(str, string(prefix)), string(name), string(namespace)
+                )
+            else:
+                key = cast(str, string(name))
+            if value_count == NONE:
+                attrs[key] = string(value)
+            else:
+                attrs[key] = attribute_value_list_class(
+                    [strings[v] for v in values[value : value + value_count]]
+                )
+        return attrs
+
+    def load_namespaces(start: int, count: int) -> Dict[str, str]:
+        pairs = namespaces[start * 2 : (start + count) * 2]
+        return dict(
+            (cast(str, string(pairs[i])), cast(str, string(pairs[i + 1])))
+            for i in range(0, len(pairs), 2)
+        )
+
+    # The first node is the BeautifulSoup object itself.
+    root = sections.nodes[:_NODE_WORDS].tolist()
+    if root[8:10] != [0, 0]:
+        soup._namespaces.update(load_namespaces(root[8], root[9]))
+
+    objects: List[PageElement] = [soup]
+    previous: PageElement = soup
+    tag_name_info = soup._tag_name_info
+    for record in _NODE.iter_unpack(sections.nodes[_NODE_WORDS:]):
+        (
+            kind,
+            parent_index,
+            _,
+            name,
+            prefix,
+            namespace,
+            attribute_start,
+            attribute_count,
+            namespace_start,
+            namespace_count,
+            sourceline,
+            sourcepos,
+        ) = record
+        parent = cast(Tag, objects[parent_index])
+        flags = kind >> 16
+        cls = classes[kind & 0xFFFF]
+        node: PageElement
+        if flags & _TAG:
+            if not issubclass(cls, Tag):
+                cls = tag_class
+            tag_name = cast(str, strings[name])
+            attrs = load_attributes(attribute_start, attribute_count)
+            if cls is Tag:
+                # This is a trimmed-down version of
+                # BeautifulSoup._fast_handle_starttag.
+                tag = Tag.__new__(Tag)
+                tag._configuration = configuration
+                tag._decomposed = False
+                tag._structural_hash = None
+                tag.name = tag_name
+                tag.namespace = string(namespace)
+                tag.prefix = string(prefix)
+                tag.attrs = attrs
+                tag.contents = []
+                tag.interesting_string_types = tag_name_info(tag_name)[1]
+            else:
+                tag = cls(
+                    soup,
+                    builder,
+                    tag_name,
+                    string(namespace),
+                    string(prefix),
+                    attrs,
+                )
+            tag._namespaces = (
+                load_namespaces(namespace_start, namespace_count)
+                if namespace_count
+                else {}
+            )
+            tag.sourceline = None if sourceline == NONE else sourceline
+            tag.sourcepos = None if sourcepos == NONE else sourcepos
+            tag.hidden = bool(flags & _HIDDEN)
+            tag.can_be_empty_element = bool(flags & _CAN_BE_EMPTY_ELEMENT)
+            if tag_name == "meta":
+                builder.set_up_substitutions(tag)
+            node = tag
+        else:
+            if not issubclass(cls, NavigableString):
+                cls = string_class
+            node = str.__new__(cls, strings[name])
+            node.hidden = False
+
+        # This is PageElement.setup() for a node that's being added
+        # to the end of the document.
+        node.parent = parent
+        node.previous_element = previous
+        previous.next_element = node
+        node.next_element = None
+        contents = parent.contents
+        if contents:
+            sibling = contents[-1]
+            node.previous_sibling = sibling
+            sibling.next_sibling = node
+        else:
+            node.previous_sibling = None
+        node.next_sibling = None
+        contents.append(node)
+        objects.append(node)
+        previous = node
+    soup._most_recent_element = previous
+
+
+_Matcher = Union[None, bool, str, "re.Pattern[str]", Callable[..., bool], Iterable[Any]]
+
+
+class NodeView(object):
+    """A read-only view of one node in a `TreeView`.
+
+    A `NodeView` for a tag supports a subset of the `Tag` API:
+    `NodeView.name`, `NodeView.attrs`, `NodeView.get`,
+    `NodeView.get_text`, `NodeView.find` and `NodeView.find_all`.
+    A `NodeView` for a string can be converted to a string with
+    ``str()``.
+    """
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree: TreeView, index: int):
+        self.tree = tree
+        self.index = index
+
+    def _word(self, offset: int) -> int:
+        return self.tree._sections.nodes[self.index * _NODE_WORDS + offset]
+
+    @property
+    def is_tag(self) -> bool:
+        """Is this node a tag, rather than a string?"""
+        return bool((self._word(0) >> 16) & _TAG)
+
+    @property
+    def class_name(self) -> str:
+        """The name of the `PageElement` class this node was created as."""
+        return self.tree._class_names[self._word(0) & 0xFFFF]
+
+    @property
+    def name(self) -> Optional[str]:
+        """The tag's name, or None if this node is a string."""
+        if not self.is_tag:
+            return None
+        return self.tree._string(self._word(3))
+
+    @property
+    def prefix(self) -> Optional[str]:
+        return self.tree._string(self._word(4)) if self.is_tag else None
+
+    @property
+    def namespace(self) -> Optional[str]:
+        return self.tree._string(self._word(5)) if self.is_tag else None
+
+    @property
+    def attrs(self) -> Dict[str, Union[str, List[str]]]:
+        """The tag's attributes. Multi-valued attributes are lists."""
+        if not self.is_tag:
+            return {}
+        return self.tree._attributes(self.index)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key: str) -> Union[str, List[str]]:
+        return self.attrs[key]
+
+    @property
+    def parent(self) -> Optional[NodeView]:
+        parent = self._word(1)
+        return None if parent == NONE else NodeView(self.tree, parent)
+
+    @property
+    def children(self) -> Iterator[NodeView]:
+        """Iterate over the node's direct children."""
+        index = self.index + 1
+        end = self._word(2)
+        nodes = self.tree._sections.nodes
+        while index < end:
+            yield NodeView(self.tree, index)
+            index = nodes[index * _NODE_WORDS + 2]
+
+    @property
+    def descendants(self) -> Iterator[NodeView]:
+        for index in range(self.index + 1, self._word(2)):
+            yield NodeView(self.tree, index)
+
+    def get_text(
+        self,
+        separator: str = "",
+        strip: bool = False,
+        types: Optional[Iterable[Type[NavigableString]]] = None,
+    ) -> str:
+        """Get all the strings beneath this node, as `Tag.get_text` would.
+
+        :param types: The `NavigableString` subclasses to include. By
+            default, these are the same ones `Tag.get_text` includes.
+        """
+        tree = self.tree
+        if not self.is_tag:
+            return tree._string(self._word(3)) or ""
+        if types is None:
+            class_ids = tree._default_text_classes(self.name)
+        else:
+            class_ids = tree._class_ids(cls.__name__ for cls in types)
+        nodes = tree._sections.nodes
+        pieces = []
+        for index in range(self.index + 1, self._word(2)):
+            kind = nodes[index * _NODE_WORDS]
+            if kind in class_ids:
+                text = cast(str, tree._string(nodes[index * _NODE_WORDS + 3]))
+                if strip:
+                    text = text.strip()
+                    if not text:
+                        continue
+                pieces.append(text)
+        return separator.join(pieces)
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    def find_all(
+        self,
+        name: _Matcher = None,
+        attrs: Optional[Dict[str, _Matcher]] = None,
+        recursive: bool = True,
+        limit: Optional[int] = None,
+        **kwargs: _Matcher,
+    ) -> List[NodeView]:
+        """Find the tags beneath this node that match the given criteria.
+
+        Tag names and attribute values can be matched against a
+        string, a regular expression, a callable, True, or an
+        iterable of these, as in `Tag.find_all`. As there, ``class_``
+        may be used to match the "class" attribute, and a callable
+        ``name`` is called with each candidate tag (here, a
+        `NodeView`).
+        """
+        attrs = dict(attrs or {})
+        if "class_" in kwargs:
+            kwargs["class"] = kwargs.pop("class_")
+        attrs.update(kwargs)
+        tree = self.tree
+        nodes = tree._sections.nodes
+        names: Optional[Set[int]] = None
+        tag_function: Optional[Callable[[NodeView], bool]] = None
+        if isinstance(name, (str, re.Pattern)) or (
+            name is not None and name is not True and not callable(name)
+        ):
+            names = tree._matching_name_ids(name)
+        elif callable(name):
+            tag_function = name
+        results: List[NodeView] = []
+        index = self.index + 1
+        end = self._word(2)
+        while index < end:
+            base = index * _NODE_WORDS
+            if (nodes[base] >> 16) & _TAG and (names is None or nodes[base + 3] in names):
+                if (not attrs or tree._attributes_match(index, attrs)) and (
+                    tag_function is None or tag_function(NodeView(tree, index))
+                ):
+                    results.append(NodeView(tree, index))
+                    if limit and len(results) >= limit:
+                        break
+            if recursive:
+                index += 1
+            else:
+                index = nodes[base + 2]
+        return results
+
+    def find(
+        self,
+        name: _Matcher = None,
+        attrs: Optional[Dict[str, _Matcher]] = None,
+        recursive: bool = True,
+        **kwargs: _Matcher,
+    ) -> Optional[NodeView]:
+        """Find the first tag beneath this node that matches the given
+        criteria. See `NodeView.find_all`.
+        """
+        results = self.find_all(name, attrs, recursive, 1, **kwargs)
+        return results[0] if results else None
+
+    def __str__(self) -> str:
+        if self.is_tag:
+            return self.get_text()
+        return cast(str, self.tree._string(self._word(3)))
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, NodeView)
+            and other.tree is self.tree
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self) -> str:
+        if self.is_tag:
+            return "<NodeView %d: %s>" % (self.index, self.name)
+        return "<NodeView %d: %r>" % (self.index, str(self))
+
+
+class TreeView(NodeView):
+    """A read-only view of a serialized parse tree.
+
+    Queries are answered from the serialized data itself, so opening
+    a large document this way is nearly free::
+
+     with TreeView.open("page.bs4") as tree:
+         for link in tree.find_all("a", class_="external"):
+             print(link["href"], link.get_text())
+
+    The `TreeView` itself stands for the `BeautifulSoup` object. The
+    `NodeView` objects it returns are only valid until the `TreeView`
+    is closed.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap.mmap]):
+        super(TreeView, self).__init__(self, 0)
+        self._sections = _Sections(data)
+        self._mmap: Optional[mmap.mmap] = None
+        self._strings: Dict[int, Optional[str]] = {NONE: None}
+        self._class_names = [self._string(i) for i in self._sections.classes]
+        self.is_xml = bool(self._sections.flags & _IS_XML)
+
+    @classmethod
+    def open(cls, path: str) -> TreeView:
+        """Memory-map a file written with the output of `dumps`."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            tree = cls(mapped)
+        except Exception:
+            mapped.close()
+            raise
+        tree._mmap = mapped
+        return tree
+
+    def close(self) -> None:
+        """Release the underlying data, unmapping it if it came from
+        `TreeView.open`.
+        """
+        self._sections.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> TreeView:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """The number of nodes in the tree, including the root."""
+        return self._sections.node_count
+
+    def __repr__(self) -> str:
+        return "<TreeView of %d nodes>" % len(self)
+
+    def _string(self, index: int) -> Optional[str]:
+        value = self._strings.get(index, self)
+        if value is self:
+            value = self._strings[index] = self._sections.string(index)
+        return cast(Optional[str], value)
+
+    def _class_ids(self, names: Iterable[str]) -> Set[int]:
+        """Find the first word of the node records of strings whose
+        classes have the given names.
+        """
+        wanted = set(names)
+        return set(
+            index
+            for index, name in enumerate(self._class_names)
+            if name in wanted
+        )
+
+    def _default_text_classes(self, tag_name: Optional[str]) -> Set[int]:
+        container = None
+        if not self.is_xml and tag_name is not None:
+            container = HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS.get(tag_name)
+        if container is not None:
+            return self._class_ids([container.__name__])
+        return self._class_ids(cls.__name__ for cls in Tag.MAIN_CONTENT_STRING_TYPES)
+
+    def _matching_name_ids(self, matcher: _Matcher) -> Set[int]:
+        """Find the string indexes of all the tag names that match."""
+        nodes = self._sections.nodes
+        ids = set(
+            nodes[i * _NODE_WORDS + 3]
+            for i in range(len(self))
+            if (nodes[i * _NODE_WORDS] >> 16) & _TAG
+        )
+        return set(i for i in ids if _matches(matcher, self._string(i)))
+
+    def _attributes(self, index: int) -> Dict[str, Union[str, List[str]]]:
+        sections = self._sections
+        base = index * _NODE_WORDS
+        start = sections.nodes[base + 6]
+        count = sections.nodes[base + 7]
+        words = sections.attributes
+        string = self._string
+        attrs: Dict[str, Union[str, List[str]]] = {}
+        for position in range(
+            start * _ATTRIBUTE_WORDS, (start + count) * _ATTRIBUTE_WORDS, _ATTRIBUTE_WORDS
+        ):
+            kind, name, prefix, _, value, value_count = words[
+                position : position + _ATTRIBUTE_WORDS
+            ]
+            key = cast(str, string(name))
+            if kind == _NAMESPACED_ATTRIBUTE and prefix != NONE:
+                key = "%s:%s" % (string(prefix), key) if name != NONE else cast(str, string(prefix))
+            if value_count == NONE:
+                attrs[key] = cast(str, string(value))
+            else:
+                attrs[key] = [
+                    cast(str, string(v))
+                    for v in sections.values[value : value + value_count]
+                ]
+        return attrs
+
+    def _attributes_match(self, index: int, matchers: Dict[str, _Matcher]) -> bool:
+        attrs = self._attributes(index)
+        for key, matcher in matchers.items():
+            value = attrs.get(key)
+            if isinstance(value, list):
+                # As with Tag.find_all, a multi-valued attribute matches
+                # if any one value matches, or if the whole thing does.
+                if not any(_matches(matcher, v) for v in value) and not _matches(
+                    matcher, " ".join(value)
+                ):
+                    return False
+            elif not _matches(matcher, value):
+                return False
+        return True
+
+
+def _matches(matcher: _Matcher, value: Optional[str]) -> bool:
+    """Does a string match a find_all()-style matcher?"""
+    if matcher is None:
+        return value is None
+    if matcher is True:
+        return value is not None
+    if matcher is False:
+        return value is None
+    if isinstance(matcher, str):
+        return value == matcher
+    if isinstance(matcher, re.Pattern):
+        return value is not None and matcher.search(value) is not None
+    if callable(matcher):
+        return bool(matcher(value))
+    return any(_matches(m, value) for m in matcher)
@@ -374,6 +374,34 @@ class TreeBuilderSmokeTest(SoupTest):
         assert tag["attr2"] == ["val2", "extra"]
         assert isinstance(tag["attr2"], MyCustomAttributeValueList)
 
+    def test_repeated_multi_valued_attribute(self):
+        # The tokens from a multi-valued attribute value are reused
+        # when the same value shows up again, but each tag still gets
+        # its own list. (The root element keeps the markup a valid
+        # XML document.)
+        markup = '<root><a class="x  y　z">1</a><a class="x  y　z">2</a></root>'
+        soup = self.soup(markup, multi_valued_attributes={"*": ["class"]})
+        a1, a2 = soup.find_all("a")
+        assert a1["class"] == ["x", "y", "z"]
+        assert a2["class"] == ["x", "y", "z"]
+        assert a1["class"] is not a2["class"]
+        a1["class"].append("extra")
+        assert a2["class"] == ["x", "y", "z"]
+
+        # The cache of tokens doesn't grow without limit.
+        builder = self.default_builder(multi_valued_attributes={"*": ["class"]})
+        builder.ATTRIBUTE_VALUE_CACHE_SIZE = 5
+        markup = (
+            "<root>"
+            + "".join('<a class="c%d d">x</a>' % i for i in range(12))
+            + "</root>"
+        )
+        soup = self.soup(markup, builder=builder)
+        assert [a["class"] for a in soup.find_all("a")] == [
+            ["c%d" % i, "d"] for i in range(12)
+        ]
+        assert len(builder._attribute_value_tokens) <= 5
+
 
 class HTMLTreeBuilderSmokeTest(TreeBuilderSmokeTest):
     """A basic test of a treebuilder's competence.
@@ -542,6 +570,9 @@ class HTMLTreeBuilderSmokeTest(TreeBuilderSmokeTest):
         [warning] = w
         assert isinstance(warning.message, XMLParsedAsHTMLWarning)
         assert str(warning.message) == XMLParsedAsHTMLWarning.MESSAGE
+        # The warning points at the code that created the
+        # BeautifulSoup object, in SoupTest.soup.
+        assert warning.filename == __file__
 
         # NOTE: the warning is not issued if the document appears to
         # be XHTML (tested with test_real_xhtml_document in the
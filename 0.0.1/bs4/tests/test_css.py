@@ -5,6 +5,7 @@ from bs4 import (
     BeautifulSoup,
     ResultSet,
 )
+from bs4.css import CSS
 
 from typing import (
     Any,
@@ -534,3 +535,269 @@ class TestCSSSelectors(SoupTest):
         assert m(".foo#bar") == "\\.foo\\#bar"
         assert m("()[]{}") == "\\(\\)\\[\\]\\{\\}"
         assert m(".foo") == self._soup.css.escape(".foo")
+
+
+@pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+class TestIndexedSelect(SoupTest):
+    """Test that selecting from a document with an element index gives
+    the same results as selecting from one without.
+    """
+
+    HTML = TestCSSSelectors.HTML
+
+    @pytest.mark.parametrize(
+        "selector",
+        [
+            "#inner",
+            "p.onep",
+            ".onep, #header2, div",
+            "h2, h1",
+            "P",
+            "div > p",
+            "div#main span.s1 > *",
+            "p:not(.onep)",
+            "*",
+            "div, *",
+            "#nosuchid",
+            "[lang]",
+            ":root > head",
+        ],
+    )
+    def test_same_results(self, selector):
+        plain = self.soup(self.HTML)
+        indexed = self.soup(self.HTML)
+        indexed.enable_index()
+        for plain_scope, indexed_scope in (
+            (plain, indexed),
+            (plain.find(id="main"), indexed.find(id="main")),
+        ):
+            expect = self.positions(plain_scope.select(selector))
+            assert self.positions(indexed_scope.select(selector)) == expect
+            assert self.positions(indexed_scope.select(selector, limit=1)) == expect[:1]
+
+    def positions(self, tags):
+        return [(tag.sourceline, tag.sourcepos) for tag in tags]
+
+    def test_results_in_document_order(self):
+        soup = self.soup("<b id='a'></b><i class='c'></i><b></b><i id='d'></i>")
+        soup.enable_index()
+        assert [str(x) for x in soup.select("b, i")] == [
+            str(x) for x in soup.find_all(["b", "i"])
+        ]
+        assert [x.name for x in soup.select(".c, #a, #d")] == ["b", "i", "i"]
+
+    def test_index_follows_tree_changes(self):
+        soup = self.soup("<div><p class='a'>one</p></div>")
+        soup.enable_index()
+        assert len(soup.select("p.a")) == 1
+        soup.div.append(soup.new_tag("P", attrs={"class": "a"}))
+        assert len(soup.select("p.a")) == 2
+        soup.p.extract()
+        assert len(soup.select("p.a")) == 1
+        soup.find("P")["class"] = "b"
+        assert soup.select("p.a") == []
+        assert len(soup.select(".b")) == 1
+
+
+@pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+class TestRelationCache(SoupTest):
+    """Test selectors whose results are cached for each element during
+    a query.
+    """
+
+    HTML = (
+        "<article><div id='d1'><h3>t</h3><p id='p1'>a</p><p id='p2'>b</p>"
+        "<div id='d2'><p id='p3'>c</p><span id='s1'></span></div></div>"
+        "<section><p id='p4'>d</p><h3></h3><p id='p5'>e</p></section></article>"
+        "<p id='p6'>f</p>"
+    )
+
+    @pytest.mark.parametrize(
+        "selector, expect",
+        [
+            ("article div p", ["p1", "p2", "p3"]),
+            ("article p", ["p1", "p2", "p3", "p4", "p5"]),
+            ("div > p", ["p1", "p2", "p3"]),
+            ("h3 ~ p", ["p1", "p2", "p5"]),
+            ("h3 + p", ["p1", "p5"]),
+            ("div:has(span)", ["d1", "d2"]),
+            ("div:has(> span)", ["d2"]),
+            ("div:not(:has(div))", ["d2"]),
+            ("p:has(~ div)", ["p1", "p2"]),
+            ("p:has(+ h3)", ["p4"]),
+            ("p:not(div p)", ["p4", "p5", "p6"]),
+            ("div:has(div p) > p", ["p1", "p2"]),
+        ],
+    )
+    def test_relations(self, selector, expect):
+        soup = self.soup(self.HTML)
+        assert [tag["id"] for tag in soup.select(selector)] == expect
+
+    def test_deeply_nested(self):
+        depth = 500
+        soup = self.soup("<div>" * depth + "<p>x</p>" + "</div>" * depth)
+        assert len(soup.select("div p")) == 1
+        assert len(soup.select("div:has(p)")) == depth
+        assert len(soup.select("div:not(:has(span))")) == depth
+
+
+@pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+class TestElementDataCache(SoupTest):
+    """Test selectors that look at data derived from each element, which
+    is cached for the length of a query.
+    """
+
+    HTML = (
+        "<div id='d1' class='a B'><p id='p1' class='a' title='x'>one "
+        "<b id='b1'>pizza</b></p><div id='d2' class='b'><p id='p2'>two</p>"
+        "<iframe id='f1'><p id='p3'>pizza</p></iframe></div></div>"
+        "<p id='p4' class=' a  b '>pizza <!--pizza--></p>"
+    )
+
+    @pytest.mark.parametrize(
+        "selector, expect",
+        [
+            # The text of an <iframe> isn't part of an HTML document's text.
+            ("div:-soup-contains('pizza')", ["d1"]),
+            ("div:-soup-contains('two', 'one')", ["d1", "d2"]),
+            ("p:-soup-contains('pizza')", ["p1", "p3", "p4"]),
+            ("p:-soup-contains-own('pizza')", ["p3", "p4"]),
+            ("p:-soup-contains-own('one')", ["p1"]),
+            (":-soup-contains('pizza'):not(:-soup-contains('one'))", ["b1", "p3", "p4"]),
+            (".a.b, .a[title=x]", ["p1", "p4"]),
+            ("[class~=b]:not(.a)", ["d2"]),
+            ("[id]:not([title])[class]", ["d1", "d2", "p4"]),
+        ],
+    )
+    def test_derived_data(self, selector, expect):
+        soup = self.soup(self.HTML)
+        assert [tag["id"] for tag in soup.select(selector)] == expect
+
+    def test_deeply_nested_text(self):
+        depth = 500
+        soup = self.soup("<div>" * depth + "<p>pizza</p>" + "</div>" * depth)
+        assert len(soup.select("div:-soup-contains('pizza')")) == depth
+        assert len(soup.select("div:-soup-contains-own('pizza')")) == 0
+
+
+class TestPrecompiledSelectors(SoupTest):
+    PATTERNS = {
+        "title": "h1.title, [data-title]",
+        "food": "p:-soup-contains('pizza')",
+        "links": "a[href^='https://']",
+    }
+    HTML = (
+        "<h1 class='title'>Hack night</h1><p>Free pizza</p>"
+        "<a href='https://example.com/'>link</a>"
+    )
+
+    def setup_method(self):
+        import soupsieve
+
+        self.sv = soupsieve
+        soupsieve.purge()
+
+    def teardown_method(self):
+        self.sv.purge()
+
+    def test_round_trip(self):
+        compiled = self.sv.precompile(self.PATTERNS)
+        data = self.sv.dump_compiled(compiled)
+        self.sv.purge()
+
+        loaded = self.sv.load_compiled(data)
+        assert loaded == compiled
+        assert self.sv.cache_info().compiled == 0
+        soup = self.soup(self.HTML)
+        for name, pattern in self.PATTERNS.items():
+            assert soup.select(loaded[name]) == soup.select(pattern)
+
+        # Compiling a loaded pattern, even with different namespaces,
+        # doesn't parse it again.
+        assert self.sv.cache_info().compiled == 0
+        assert self.sv.cache_info().precompiled == 3
+
+    def test_other_version_compiled_again(self, monkeypatch):
+        from soupsieve import css_parser
+
+        data = self.sv.dump_compiled(self.sv.precompile(self.PATTERNS))
+        self.sv.purge()
+        monkeypatch.setattr(css_parser, "__version__", "0.0")
+        loaded = self.sv.load_compiled(data)
+        assert self.sv.cache_info().compiled == 3
+        assert loaded["title"].pattern == self.PATTERNS["title"]
+
+    def test_bad_data(self):
+        with pytest.raises(ValueError):
+            self.sv.load_compiled(b"not compiled patterns")
+        with pytest.raises(TypeError):
+            self.sv.dump_compiled({"title": "h1"})
+
+    def test_cache_info(self):
+        self.sv.compile("p > b")
+        self.sv.compile("p > b")
+        self.sv.compile("p > i")
+        info = self.sv.cache_info()
+        assert (info.hits, info.misses, info.currsize, info.compiled) == (1, 2, 2, 2)
+        assert info.compile_time > 0
+
+        self.sv.set_cache_size(1)
+        try:
+            assert self.sv.cache_info().currsize == 1
+            self.sv.compile("p > b")
+            assert self.sv.cache_info().compiled == 3
+        finally:
+            self.sv.set_cache_size(info.maxsize)
+
+
+@pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+class TestSelectMany(SoupTest):
+    SELECTORS = {
+        "title": "h1.title",
+        "date": "time[datetime]",
+        "paragraphs": "div p, p.intro",
+        "ids": "#first, #last",
+        "dashed": "[data-x]",
+        "everything": ":not(html)",
+        "nothing": "table, :focus",
+        "rare": "p:-soup-contains('pizza') b",
+    }
+    HTML = (
+        "<h1 class='title'>T</h1><p class='intro' id='first'>i</p>"
+        "<div><p>Free <b>pizza</b></p><time datetime='2024'>t</time>"
+        "<P CLASS='intro'>x</P><span data-x ID='last'></span></div>"
+    )
+
+    def test_same_as_select(self):
+        soup = self.soup(self.HTML)
+        for scope in (soup, soup.div):
+            results = scope.css.select_many(self.SELECTORS)
+            assert list(results) == list(self.SELECTORS)
+            for name, selector in self.SELECTORS.items():
+                assert isinstance(results[name], ResultSet)
+                assert results[name] == scope.select(selector)
+
+    def test_limit(self):
+        soup = self.soup(self.HTML)
+        results = soup.css.select_many(self.SELECTORS, limit=1)
+        for name, selector in self.SELECTORS.items():
+            assert results[name] == soup.select(selector, limit=1)
+
+    def test_precompiled_selector(self):
+        soup = self.soup(self.HTML)
+        compiled = soup.css.compile("h1")
+        assert soup.css.select_many({"h1": compiled})["h1"] == [soup.h1]
+
+    def test_without_soupsieve_support(self):
+        # If the Soup Sieve API doesn't have select_many, each
+        # selector is run separately.
+        import soupsieve
+
+        class OldAPI:
+            SoupSieve = soupsieve.SoupSieve
+            compile = staticmethod(soupsieve.compile)
+
+        soup = self.soup(self.HTML)
+        results = CSS(soup, api=OldAPI).select_many(self.SELECTORS)
+        for name, selector in self.SELECTORS.items():
+            assert results[name] == soup.select(selector)
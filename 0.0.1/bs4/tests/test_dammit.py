@@ -7,6 +7,8 @@ from bs4 import BeautifulSoup
 from bs4.dammit import (
     EntitySubstitution,
     EncodingDetector,
+    IncrementalDetwingler,
+    IncrementalUnicodeDammit,
     UnicodeDammit,
 )
 
@@ -82,6 +84,57 @@ class TestUnicodeDammit(object):
         assert dammit.original_encoding is None
 
 
+class TestIncrementalUnicodeDammit(object):
+    """Standalone tests of IncrementalUnicodeDammit."""
+
+    def decode_in_chunks(self, data, size, **kwargs):
+        dammit = IncrementalUnicodeDammit(**kwargs)
+        pieces = [
+            dammit.decode(data[i : i + size]) for i in range(0, len(data), size)
+        ]
+        pieces.append(dammit.close())
+        return dammit, "".join(pieces)
+
+    def test_multibyte_characters_split_across_chunks(self):
+        text = "Sacr\N{LATIN SMALL LETTER E WITH ACUTE} bleu! \N{SNOWMAN}" * 100
+        dammit, decoded = self.decode_in_chunks(text.encode("utf8"), 7)
+        assert decoded == text
+        assert dammit.original_encoding == "utf-8"
+        assert dammit.contains_replacement_characters is False
+
+    def test_encoding_chosen_after_sniff_size(self):
+        dammit = IncrementalUnicodeDammit(sniff_size=10)
+        assert dammit.decode(b"<p>abc") == ""
+        assert dammit.original_encoding is None
+        assert dammit.decode(b"def</p>") == "<p>abcdef</p>"
+
+        # An ASCII sample is decoded as UTF-8, in case the rest of the
+        # document isn't ASCII.
+        assert dammit.original_encoding == "utf-8"
+        assert dammit.decode("\N{SNOWMAN}".encode("utf8")) == "\N{SNOWMAN}"
+
+    def test_declared_encoding(self):
+        data = '<meta charset="koi8-r"><p>\u041f\u0440\u0438\u0432\u0435\u0442</p>'
+        dammit, decoded = self.decode_in_chunks(data.encode("koi8-r"), 4, is_html=True)
+        assert decoded == data
+        assert dammit.original_encoding == "koi8-r"
+        assert dammit.declared_html_encoding == "koi8-r"
+
+    def test_byte_order_mark_removed(self):
+        data = "\ufeff<a>\N{SNOWMAN}</a>".encode("utf-16le")
+        dammit, decoded = self.decode_in_chunks(data, 3)
+        assert decoded == "<a>\N{SNOWMAN}</a>"
+        assert dammit.original_encoding == "utf-16le"
+
+    def test_replacement_after_encoding_is_chosen(self):
+        dammit = IncrementalUnicodeDammit(sniff_size=4)
+        assert dammit.decode(b"abcd") == "abcd"
+        assert dammit.decode(b"\xffe") == "\ufffde"
+        assert dammit.contains_replacement_characters is True
+        assert dammit.decode(b"\xc3") == ""
+        assert dammit.close() == "\ufffd"
+
+
 class TestEncodingDetector(object):
     def test_encoding_detector_replaces_junk_in_encoding_name_with_replacement_character(
         self,
@@ -238,6 +291,52 @@ class TestEncodingDetector(object):
             output = UnicodeDammit.detwingle(input)
             assert output == input
 
+    def test_detwingle_leaves_other_bytes_alone(self):
+        # Bytes that are undefined in Windows-1252 are left alone, as
+        # are UTF-8 multibyte characters, even invalid ones.
+        for data in (b"\x81\x8d\x8f\x90\x9d\xff", b"\xe2ab", b"\xed\xa0\x80", b"\xf0"):
+            assert UnicodeDammit.detwingle(data) == data
+
+        # Bytes that can't start a multibyte character are converted.
+        assert UnicodeDammit.detwingle(b"\xc0a\xfe") == "\xc0a\xfe".encode("utf8")
+
+    def test_detwingle_large_document(self):
+        utf8 = ("\N{SNOWMAN} caf\xe9 " * 20000).encode("utf8")
+        windows_1252 = "\N{LEFT DOUBLE QUOTATION MARK}Hi\N{RIGHT DOUBLE QUOTATION MARK}"
+        doc = utf8 + windows_1252.encode("windows_1252") + utf8
+        fixed = UnicodeDammit.detwingle(doc)
+        assert fixed == utf8 + windows_1252.encode("utf8") + utf8
+        assert UnicodeDammit.detwingle(utf8) is utf8
+
+    def test_incremental_detwingler(self):
+        doc = (
+            "\N{SNOWMAN}\N{GRINNING FACE}".encode("utf8")
+            + "\N{LEFT DOUBLE QUOTATION MARK}Hi\N{RIGHT DOUBLE QUOTATION MARK}".encode(
+                "windows_1252"
+            )
+            + "\N{LATIN SMALL LIGATURE OE}".encode("utf8")
+        )
+        expect = UnicodeDammit.detwingle(doc)
+
+        # However the document is split into chunks, the result is the
+        # same as converting it all at once.
+        for size in range(1, 6):
+            detwingler = IncrementalDetwingler()
+            converted = [
+                detwingler.detwingle(doc[i : i + size])
+                for i in range(0, len(doc), size)
+            ]
+            converted.append(detwingler.close())
+            assert b"".join(converted) == expect
+
+        # A character cut off by the end of the document is left alone.
+        detwingler = IncrementalDetwingler()
+        assert detwingler.detwingle(b"a\xe2\x98") == b"a"
+        assert detwingler.close() == b"\xe2\x98"
+
+        with pytest.raises(NotImplementedError):
+            IncrementalDetwingler(main_encoding="utf16")
+
     def test_find_declared_encoding(self):
         # Test our ability to find a declared encoding inside an
         # XML or HTML document.
@@ -279,6 +378,56 @@ class TestEncodingDetector(object):
         assert m(b" " + xml_bytes, search_entire_document=True) == "iso-8859-1"
         assert m(b"a" + xml_bytes, search_entire_document=True) is None
 
+    def test_html_declaration_searched_for_in_fixed_size_prefix(self):
+        m = EncodingDetector.find_declared_encoding
+        html_bytes = b'<html><head><meta charset="utf-8"></head></html>'
+        limit = EncodingDetector.HTML_DECLARATION_SEARCH_SIZE
+        spacer = b" " * (limit - len(html_bytes))
+        assert m(spacer + html_bytes, is_html=True) == "utf-8"
+
+        # The size of the prefix doesn't depend on the size of the
+        # document.
+        spacer = b" " * limit
+        filler = b"<p>filler</p>" * limit
+        assert m(spacer + html_bytes + filler, is_html=True) is None
+
+    def test_utf8_tried_before_chardet(self, monkeypatch):
+        def fail(data):
+            raise AssertionError("chardet should not have been run")
+
+        monkeypatch.setattr(bs4.dammit, "_chardet_dammit", fail)
+        for data in (b"<p>plain ASCII</p>", "<p>Caf\xe9 \u2603</p>".encode("utf8")):
+            detector = EncodingDetector(data, is_html=True)
+            assert next(detector.encodings) == "utf-8"
+            dammit = UnicodeDammit(data, is_html=True)
+            assert dammit.original_encoding == "utf-8"
+            assert dammit.unicode_markup == data.decode("utf8")
+            assert dammit.tried_encodings == [("utf-8", "strict")]
+
+    def test_declared_encoding_tried_before_utf8(self):
+        data = b'<meta charset="iso-8859-8"><p>\xed\xe5</p>'
+        dammit = UnicodeDammit(data, is_html=True)
+        assert dammit.original_encoding == "iso-8859-8"
+
+        # Even if the document is valid UTF-8.
+        data = '<meta charset="koi8-r"><p>\u0436</p>'.encode("utf8")
+        dammit = UnicodeDammit(data, is_html=True)
+        assert dammit.original_encoding == "koi8-r"
+
+    def test_chardet_run_on_a_sample(self, monkeypatch):
+        sizes = []
+
+        def chardet(data):
+            sizes.append(len(data))
+            return None
+
+        monkeypatch.setattr(bs4.dammit, "_chardet_dammit", chardet)
+        data = "<p>\N{LEFT DOUBLE QUOTATION MARK}Hi\N{RIGHT DOUBLE QUOTATION MARK}</p>"
+        data = (data * 100000).encode("windows-1252")
+        dammit = UnicodeDammit(data, is_html=True)
+        assert dammit.original_encoding == "windows-1252"
+        assert sizes == [EncodingDetector.CHARDET_SAMPLE_SIZE]
+
 
 class TestEntitySubstitution(object):
     """Standalone tests of the EntitySubstitution class."""
@@ -338,6 +487,37 @@ class TestEntitySubstitution(object):
         markup = "fjords &sqcups; penguins"
         assert self.sub.substitute_html(data) == markup
 
+    @pytest.mark.parametrize(
+        "s",
+        [
+            "",
+            "plain ASCII",
+            "<a & b>",
+            "Caf\xe9 \u2014 \u201cquoted\u201d",
+            "\u65e5\u672c\u8a9e",
+            # Strings that may contain two-character entities.
+            "\u2267\u0338 but \u2267 and \u0338",
+            "<\u20d2 and < and \u20d2",
+            "=\u20e5 &",
+            "\u2242\u0338\u2242",
+            "\u205f\u200a \u200a",
+        ],
+    )
+    def test_substitute_html_matches_regular_expressions(self, s):
+        # The ways substitute_html and substitute_html5 avoid their
+        # regular expressions don't change the output.
+        sub = self.sub._substitute_html_entity
+        expect = self.sub.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(sub, s)
+        assert self.sub.substitute_html(s) == expect
+        expect = self.sub.CHARACTER_TO_HTML_ENTITY_RE.sub(sub, s)
+        assert self.sub.substitute_html5(s) == expect
+
+    def test_two_character_entities(self):
+        assert (
+            self.sub.substitute_html("\u2267\u0338\u2267 <\u20d2<")
+            == "&ngeqq;&geqq; &nvlt;&lt;"
+        )
+
     def test_xml_converstion_includes_no_quotes_if_make_quoted_attribute_is_false(self):
         s = 'Welcome to "my bar"'
         assert self.sub.substitute_xml(s, False) == s
@@ -672,3 +672,180 @@ and they lived at the bottom of a well.</p>
         )
         string_soup = self.soup(html_doc, parse_only=only_short_strings)
         assert "\n\n\nElsie,\nLacie and\nTillie\n...\n" == string_soup.decode()
+
+
+class TestCompiledSoupStrainer(SoupTest):
+    """Test that the compiled form of a SoupStrainer, used by
+    SoupStrainer.filter(), agrees with SoupStrainer.match().
+    """
+
+    MARKUP = (
+        "<div id='main' class='content wide'><p class='a'>one <b>two</b></p>"
+        "<p class='b a' id='second' data-x=''>three</p><div><p>four</p>"
+        "<b class='a'>x</b></div></div><p>five</p><ns:rect class='a'/>"
+        "<a href='http://example.com/'>link</a>"
+    )
+
+    STRAINERS = [
+        dict(name="p"),
+        dict(name=["b", "a", "ns:rect"]),
+        dict(name=[re.compile("^d"), re.compile("v$"), re.compile("(?i)^A$")]),
+        dict(name=re.compile(r"(\w)\1")),
+        dict(name=lambda tag: getattr(tag, "name", tag) == "b" or tag == "ns:rect"),
+        dict(name=True),
+        dict(name=False),
+        dict(name=[]),
+        dict(class_="a"),
+        dict(class_="b a"),
+        dict(class_=["wide", re.compile("^b")]),
+        dict(attrs={"id": True, "class": "a"}),
+        dict(id=False),
+        dict(id=None),
+        dict(attrs={"data-x": ""}),
+        dict(href=re.compile("example")),
+        dict(class_=lambda value: value is not None and len(value) == 1),
+        dict(name="p", string="three"),
+        dict(name="b", string=re.compile("t")),
+        dict(string="four"),
+        dict(string=["one ", re.compile("iv")]),
+        dict(string=lambda s: s is not None and s.startswith("t")),
+        dict(),
+    ]
+
+    def assert_compiled_matches(self, strainer, soup):
+        # This document is too small for filter() to compile the
+        # rules on its own.
+        strainer.COMPILE_AFTER = 0
+        elements = list(soup.descendants)
+        expect = [x for x in elements if x and strainer.match(x)]
+        assert list(strainer.filter(iter(elements))) == expect
+        return expect
+
+    @pytest.mark.parametrize("kwargs", STRAINERS)
+    def test_compiled_strainer_matches_like_match(self, kwargs):
+        soup = self.soup(self.MARKUP)
+        strainer = SoupStrainer(**kwargs)
+        self.assert_compiled_matches(strainer, soup)
+
+        # find_all() and parse_only go through the compiled rules.
+        assert soup.find_all(**kwargs) == self.assert_compiled_matches(
+            SoupStrainer(**kwargs), soup
+        )
+
+    @pytest.mark.parametrize("compile_after", [0, 1, 5, 1000])
+    def test_short_searches_are_not_compiled(self, compile_after):
+        soup = self.soup(self.MARKUP)
+        elements = list(soup.descendants)
+        strainer = SoupStrainer(["p", "b"])
+        strainer.COMPILE_AFTER = compile_after
+        calls = []
+        compile = strainer._compile
+        strainer._compile = lambda: calls.append(1) or compile()
+        expect = [x for x in elements if strainer.match(x)]
+        assert list(strainer.filter(iter(elements))) == expect
+        assert len(calls) == (1 if compile_after <= len(elements) else 0)
+
+    @pytest.mark.parametrize("kwargs", STRAINERS)
+    def test_compiled_allow_tag_creation(self, kwargs):
+        strainer = SoupStrainer(**kwargs)
+        interpreted = SoupStrainer(**kwargs)
+        interpreted._compile = lambda: None
+        for prefix, name, attrs in (
+            (None, "p", {"class": ["a"]}),
+            (None, "p", {"class": ["b", "a"], "id": "second"}),
+            ("ns", "rect", {"class": "a"}),
+            (None, "a", {"href": "http://example.com/"}),
+            (None, "div", None),
+            (None, "b", {"data-x": ""}),
+        ):
+            assert strainer.allow_tag_creation(
+                prefix, name, attrs
+            ) == interpreted.allow_tag_creation(prefix, name, attrs)
+
+    def test_combined_patterns(self):
+        strainer = SoupStrainer(name=[re.compile("^d"), re.compile("v$")])
+        [pattern] = strainer._compile().names.patterns
+        assert pattern.search("div")
+        assert not pattern.search("p")
+
+        # Patterns that can't be safely combined are kept separate.
+        strainer = SoupStrainer(
+            name=[re.compile("^d"), re.compile("v$", re.I), re.compile(r"(.)\1")]
+        )
+        assert len(strainer._compile().names.patterns) == 3
+
+    def test_compiled_rules_are_cached(self):
+        soup = self.soup(self.MARKUP)
+        strainer = SoupStrainer("p")
+        compiled = strainer._compile()
+        assert strainer._compile() is compiled
+        assert len(strainer.find_all(soup.descendants)) == 4
+        assert strainer._compile() is compiled
+
+        # Changing the rules makes the strainer compile them again.
+        strainer.name_rules.append(TagNameMatchRule(string="b"))
+        assert len(strainer.find_all(soup.descendants)) == 6
+        assert strainer._compile() is not compiled
+
+        strainer.name_rules = []
+        strainer.attribute_rules["id"] = [AttributeValueMatchRule("second")]
+        assert strainer.find_all(soup.descendants) == [soup.find(id="second")]
+
+    def test_strainers_with_the_same_rules_share_compiled_rules(self):
+        # find() makes a new SoupStrainer every time, so the compiled
+        # rules are looked up by the values of the rules.
+        pattern = re.compile("^/")
+        compiled = SoupStrainer("a", href=pattern)._compile()
+        assert SoupStrainer("a", href=re.compile("^/"))._compile() is compiled
+        assert SoupStrainer("a", href=re.compile("^/x"))._compile() is not compiled
+        assert SoupStrainer("b", href=pattern)._compile() is not compiled
+
+        # Changing a rule in place changes what it's looked up by.
+        strainer = SoupStrainer("a", href=pattern)
+        assert strainer._compile() is compiled
+        strainer.name_rules[0].string = "b"
+        soup = self.soup('<a href="/1"></a><b href="/2"></b>')
+        assert strainer.find_all(soup.descendants) == [soup.b]
+
+    def test_compiled_rule_cache_is_bounded(self):
+        cache = SoupStrainer._compiled_cache
+        for i in range(SoupStrainer.COMPILED_CACHE_SIZE + 10):
+            SoupStrainer("tag%d" % i)._compile()
+            assert len(cache) <= SoupStrainer.COMPILED_CACHE_SIZE
+
+    def test_unhashable_rules_are_compiled_but_not_shared(self):
+        class Unhashable(object):
+            __hash__ = None
+
+            def __call__(self, tag):
+                return tag.name == "b"
+
+        strainer = SoupStrainer(Unhashable())
+        compiled = strainer._compile()
+        assert compiled is not None
+        assert compiled.key is None
+        assert compiled not in SoupStrainer._compiled_cache.values()
+        soup = self.soup("<a></a><b></b>")
+        assert strainer.find_all(soup.descendants) == [soup.b]
+
+    def test_subclasses_are_not_compiled(self):
+        class EveryOtherTag(SoupStrainer):
+            count = 0
+
+            def matches_tag(self, tag):
+                self.count += 1
+                return self.count % 2 == 1
+
+        soup = self.soup("<a></a><a></a><a></a>")
+        strainer = EveryOtherTag("a")
+        assert strainer._compile() is None
+        assert len(strainer.find_all(soup.descendants)) == 2
+
+        class ShoutingRule(TagNameMatchRule):
+            def matches_tag(self, tag):
+                return tag.name.upper() == self.string
+
+        strainer = SoupStrainer()
+        strainer.COMPILE_AFTER = 0
+        strainer.name_rules = [ShoutingRule(string="A")]
+        assert len(strainer.find_all(soup.descendants)) == 3
@@ -168,3 +168,18 @@ class TestFormatter(SoupTest):
         soup = self.soup(markup)
         assert "<p>a &amp; b</p>" == soup.p.decode(formatter="html")
         assert "<p>a & b</p>" == soup.p.decode(formatter="html5")
+
+    def test_repeated_attribute_values(self):
+        # Attribute values that show up more than once are formatted
+        # the same way each time.
+        markup = '<p class="a&amp;b" title="caf\xe9"><b class="a&amp;b" title="caf\xe9">x</b></p>'
+        soup = self.soup(markup)
+        soup.b["id"] = soup.b.string
+        assert soup.decode(formatter="html") == (
+            '<p class="a&amp;b" title="caf&eacute;"><b class="a&amp;b" id="x"'
+            ' title="caf&eacute;">x</b></p>'
+        )
+        assert soup.decode(formatter="minimal") == (
+            '<p class="a&amp;b" title="caf\xe9"><b class="a&amp;b" id="x"'
+            ' title="caf\xe9">x</b></p>'
+        )
@@ -1,5 +1,6 @@
 """Tests to ensure that the html5lib tree builder generates good trees."""
 
+import pickle
 import pytest
 import warnings
 
@@ -198,6 +199,18 @@ class TestHTML5LibBuilder(HTML5TreeBuilderSmokeTest):
         assert None is soup.p.sourceline
         assert None is soup.p.sourcepos
 
+    def test_pickle_reconstructed_formatting_element(self):
+        # When html5lib reopens a formatting element, the new tag's
+        # sourcepos is -1. That doesn't stop the tree from being
+        # pickled; the position just isn't preserved.
+        soup = self.soup("<p><i>a</p>\n<b>c")
+        reopened = soup.find_all("i")[1]
+        assert reopened.sourcepos == -1
+        loaded = pickle.loads(pickle.dumps(soup))
+        assert loaded.decode() == soup.decode()
+        assert loaded.find_all("i")[1].sourcepos is None
+        assert loaded.b.sourcepos == soup.b.sourcepos
+
     def test_special_string_containers(self):
         # The html5lib tree builder doesn't support this standard feature,
         # because there's no way of knowing, when a string is created,
@@ -8,7 +8,13 @@ from bs4.builder._htmlparser import (
     BeautifulSoupHTMLParser,
     HTMLParserTreeBuilder,
 )
+from bs4.element import (
+    CharsetMetaAttributeValue,
+    Script,
+    Tag,
+)
 from bs4.exceptions import ParserRejectedMarkup
+from bs4.filter import SoupStrainer
 from typing import Any
 from . import HTMLTreeBuilderSmokeTest
 
@@ -159,3 +165,48 @@ class TestHTMLParserTreeBuilder(HTMLTreeBuilderSmokeTest):
         markup = "<p>a &nosuchentity; b</p>"
         soup = self.soup(markup)
         assert "<p>a &amp;nosuchentity b</p>" == soup.p.decode()
+
+    def test_fast_path_is_only_used_by_default(self):
+        assert self.soup("<a></a>")._fast_path is True
+        assert self.soup("<a></a>", parse_only=SoupStrainer("a"))._fast_path is False
+        soup = self.soup("<a></a>", element_classes={Tag: Tag})
+        assert soup._fast_path is False
+
+    def test_fast_path_builds_same_tree_as_general_path(self):
+        markup = """<html><head><meta charset="utf-8"><script>x < y</script></head>
+<body><p class="a b" id="c">Some <b>bold</b>   <i>text</i></p>
+<pre>  keep
+  this  </pre>   <br><textarea> x </textarea><p>unclosed<div>end</body>"""
+        fast = self.soup(markup)
+        general = self.soup(markup, element_classes={Tag: Tag})
+        assert fast.decode() == general.decode()
+
+        def describe(element):
+            if element is None:
+                return None
+            if isinstance(element, Tag):
+                return (element.name, element.sourceline, element.sourcepos)
+            return (element.__class__, str(element))
+
+        for x, y in zip(fast.descendants, general.descendants):
+            for attr in (
+                "parent",
+                "next_element",
+                "previous_element",
+                "next_sibling",
+                "previous_sibling",
+            ):
+                assert describe(getattr(x, attr)) == describe(getattr(y, attr))
+            if isinstance(x, Tag):
+                assert x.attrs == y.attrs
+                assert x.can_be_empty_element == y.can_be_empty_element
+                assert x.interesting_string_types == y.interesting_string_types
+                assert x.preserve_whitespace_tags == y.preserve_whitespace_tags
+                assert x.parser_class is y.parser_class
+        assert len(list(fast.descendants)) == len(list(general.descendants))
+
+        # Substitutions and string containers still work.
+        assert isinstance(fast.meta["charset"], CharsetMetaAttributeValue)
+        assert isinstance(fast.script.string, Script)
+        assert fast.p["class"] == ["a", "b"]
+        assert fast.pre.string == "  keep\n  this  "
@@ -10,8 +10,10 @@ from bs4 import BeautifulSoup
 from bs4.element import (
     AttributeValueList,
     Comment,
+    Tag,
 )
 from bs4.filter import SoupStrainer
+from bs4.formatter import HTMLFormatter
 from . import (
     SoupTest,
 )
@@ -269,6 +271,123 @@ class TestFormatters(SoupTest):
         assert soup.contents[0].name == "pre"
 
 
+class TestSerializer(SoupTest):
+    """Test the fast path used by Tag.decode and Tag.write_to when
+    the output isn't pretty-printed.
+    """
+
+    MARKUP = (
+        "<!DOCTYPE html><html><head>"
+        '<meta content="text/html; charset=ISO-Latin-1" http-equiv="Content-type"/>'
+        "<meta charset='utf8'><script>if (a < b && c) {}</script>"
+        "<style>a > b {}</style></head><body>"
+        "<p class='one two' id=\"x&y\" data-q='say \"hi\"' hidden "
+        "data-e=''>Fish &amp; <b>chips</b>&nbsp;\N{SNOWMAN}<br/><!--a comment-->"
+        "<pre>\n  kept  </pre></p><textarea> <b>not a tag</b> </textarea>"
+        "<![CDATA[cdata]]><?php echo 1 ?><p></p><img src='a.png'></body></html>"
+    )
+
+    FORMATTERS = [
+        "minimal",
+        "html",
+        "html5",
+        None,
+        HTMLFormatter(void_element_close_prefix=""),
+        HTMLFormatter(empty_attributes_are_booleans=True),
+    ]
+
+    def slow_decode(self, tag, formatter, encoding="utf-8"):
+        """Render a tag the general way, without the fast path."""
+        return tag.decode(
+            eventual_encoding=encoding,
+            formatter=formatter,
+            iterator=tag.self_and_descendants,
+        )
+
+    @pytest.mark.parametrize("formatter", FORMATTERS)
+    def test_fast_path_matches_general_path(self, formatter):
+        soup = self.soup(self.MARKUP)
+        soup.body.append(soup.new_tag("rect", nsprefix="svg", attrs={"x": "1"}))
+        tags = [soup] + soup.find_all(True)
+        for tag in tags:
+            assert tag.decode(formatter=formatter) == self.slow_decode(tag, formatter)
+            assert tag.decode(
+                eventual_encoding="euc-jp", formatter=formatter
+            ) == self.slow_decode(tag, formatter, "euc-jp")
+            assert tag.decode_contents(formatter=formatter) == tag.decode(
+                formatter=formatter, iterator=tag.descendants
+            )
+
+    def test_strings_and_modified_trees(self):
+        soup = self.soup("<div><p>a</p><p>b<i>c</i></p></div>")
+        soup.div.p.decompose()
+        soup.i.append(soup.new_string("&d", Comment))
+        soup.div.insert(0, "<e>")
+        for tag in soup, soup.div, soup.i:
+            assert str(tag) == self.slow_decode(tag, "minimal")
+        assert str(soup) == "<div>&lt;e&gt;<p>b<i>c<!--&d--></i></p></div>"
+        assert self.soup("").decode() == ""
+        assert soup.new_tag("br").decode() == "<br/>"
+
+    def test_formatter_subclass_uses_general_path(self):
+        class UnsortedAttributes(HTMLFormatter):
+            def attributes(self, tag):
+                return tag.attrs.items()
+
+        soup = self.soup('<p z="1" a="2">text</p>')
+        formatter = UnsortedAttributes()
+        assert not soup.p._can_serialize(formatter)
+        assert soup.p.decode(formatter=formatter) == '<p z="1" a="2">text</p>'
+        assert soup.p.decode() == '<p a="2" z="1">text</p>'
+
+    def test_write_to(self):
+        soup = self.soup(self.MARKUP * 5)
+        chunks = []
+        soup.write_to(chunks.append)
+        assert "".join(chunks) == soup.decode()
+
+        # Output is passed along in pieces.
+        soup.SERIALIZE_CHUNK_PIECES = 10
+        chunks = []
+        soup.write_to(chunks.append, eventual_encoding="euc-jp", formatter="html")
+        assert len(chunks) > 5
+        assert "".join(chunks) == soup.decode(
+            eventual_encoding="euc-jp", formatter="html"
+        )
+
+        # Pretty-printed output is passed along all at once.
+        chunks = []
+        soup.body.p.write_to(chunks.append, indent_level=0)
+        assert chunks == [soup.body.p.prettify()]
+
+    def test_traversal_does_not_compare_tags(self, monkeypatch):
+        # Parsing and output keep track of open tags by identity.
+        # Comparing them with Tag.__eq__ would compare their entire
+        # contents, which is slow when a document repeats the same
+        # structure over and over.
+        def fail(self, other):
+            raise AssertionError("Tag.__eq__ was called")
+
+        card = "<div class='card'><div><pre>Free <b>pizza</b></pre></div></div>"
+        markup = "<div>" + card * 20 + "</div><pre><pre>a</pre></pre>"
+        monkeypatch.setattr(Tag, "__eq__", fail)
+        monkeypatch.setattr(Tag, "__ne__", fail)
+        soup = self.soup(markup)
+        soup.decode()
+        soup.prettify()
+        soup.div.decode_contents(indent_level=0)
+        list(soup._event_stream())
+
+    def test_deeply_nested_similar_tags(self):
+        # Each <div> here is structurally similar to its parent, which
+        # used to make pretty-printing take quadratic time, and blow
+        # the stack on a large enough document.
+        n = 500
+        soup = self.soup("<div>" * n + "x" + "</div>x" * n)
+        assert soup.prettify().count("<div>") == n
+        assert str(soup) == "<div>" * n + "x" + "</div>x" * n
+
+
 class TestPersistence(SoupTest):
     "Testing features like pickle and deepcopy."
 
@@ -299,6 +418,14 @@ class TestPersistence(SoupTest):
         assert loaded.__class__ == BeautifulSoup
         assert loaded.decode() == self.tree.decode()
 
+    def test_pickle_and_unpickle_tag(self):
+        tag = self.tree.find("a")
+        loaded = pickle.loads(pickle.dumps(tag, 2))
+        assert loaded.decode() == tag.decode()
+        assert loaded.name == "a"
+        assert loaded.preserve_whitespace_tags == tag.preserve_whitespace_tags
+        assert loaded.parent.decode() == self.tree.body.decode()
+
     def test_deepcopy_identity(self):
         # Making a deepcopy of a tree yields an identical tree.
         copied = copy.deepcopy(self.tree)
@@ -435,3 +562,93 @@ class TestEquality(SoupTest):
         # NavigableStrings with the same contents hash to the value of
         # the contents.
         assert hash(first_string) == hash(second_string) == hash("string")
+
+    def test_structural_hash(self):
+        soup = self.soup(
+            '<div><p class="a b" id="x">one<b>two</b></p></div>'
+            '<div><p id="x" class="a b">one<!--two--><b>two</b></p></div>'
+            '<div><p class="a b" id="x">one<b>two</b></p></div>'
+        )
+        first, second, third = soup.find_all("div")
+        assert first.structural_hash() == third.structural_hash()
+        assert first.structural_hash() != second.structural_hash()
+        assert first == third
+        assert first != second
+
+        # Descendants get cached hashes too.
+        assert first.p._structural_hash == first.p.structural_hash()
+
+        # A string's class doesn't count, just as it doesn't for ==.
+        soup2 = self.soup("<p>text</p>")
+        soup2.p.string.replace_with(Comment("text"))
+        assert soup2.p == soup.new_tag("p", string="text")
+        assert soup2.p.structural_hash() == soup.new_tag(
+            "p", string="text"
+        ).structural_hash()
+
+    def test_structural_hash_forgotten_on_change(self):
+        soup = self.soup("<div><p>one</p></div><div><p>one</p></div>")
+        first, second = soup.find_all("div")
+        original = first.structural_hash()
+        second.structural_hash()
+        assert first == second
+
+        # Changing an attribute of a descendant invalidates the
+        # cached hashes all the way up.
+        second.p["class"] = "new"
+        assert second._structural_hash is None
+        assert second.structural_hash() != original
+        assert first != second
+        del second.p["class"]
+        assert first == second
+        assert second.structural_hash() == original
+
+        # So does adding and removing children.
+        second.p.append("two")
+        assert first != second
+        second.p.contents[-1].extract()
+        assert first == second
+        assert second.structural_hash() == original
+        second.p.string = "changed"
+        assert first != second
+
+        # A subtree moved elsewhere keeps its hash, since it hasn't
+        # changed.
+        p = first.p
+        p_hash = p.structural_hash()
+        second.append(p)
+        assert p._structural_hash == p_hash
+        assert first._structural_hash is None
+
+    def test_equality_ignores_out_of_date_structural_hash(self):
+        # Changes made in place aren't noticed, but == doesn't trust
+        # the cached hashes, so it still gives the right answer.
+        soup = self.soup('<div><p class="a z">x</p></div><div><p class="a">x</p></div>')
+        first, second = soup.find_all("div")
+        first.structural_hash()
+        second.structural_hash()
+        assert first != second
+        p = second.p
+        p["class"].append("z")
+        assert first == second
+        assert first.p == p
+
+        p.attrs["id"] = "new"
+        assert first != second
+        del p.attrs["id"]
+        p.name = "b"
+        assert first != second
+        p.name = "p"
+        assert first == second
+
+    def test_structural_hash_not_pickled(self):
+        soup = self.soup("<p class='a'>one</p>")
+        soup.p.structural_hash()
+        loaded = pickle.loads(pickle.dumps(soup.p))
+        assert loaded._structural_hash is None
+        assert loaded == soup.p
+        assert loaded.structural_hash() == soup.p.structural_hash()
+
+    def test_deep_structural_hash(self):
+        soup = self.soup("<div>" * 2000 + "</div>" * 2000)
+        assert isinstance(soup.structural_hash(), int)
@@ -0,0 +1,206 @@
+"""Tests of the compact parse tree format in bs4.serialize."""
+
+import re
+import pytest
+
+from bs4.element import (
+    Comment,
+    Doctype,
+    NavigableString,
+    Script,
+    Stylesheet,
+    Tag,
+)
+from bs4.serialize import (
+    TreeView,
+    dumps,
+    loads,
+)
+
+from . import SoupTest
+
+
+class TestDumpsAndLoads(SoupTest):
+    MARKUP = (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Café</title>"
+        "<script>if (a < b) {}</script><style>p { color: red }</style></head>"
+        "<body><p class='a b' id='first'>Fish &amp; <b>chips</b><br/><!--c-->"
+        "<pre>\n  keep</pre></p><p class=''>two</p><a href>empty</a>"
+        "<p>😀</p></body></html>"
+    )
+
+    def test_round_trip(self):
+        soup = self.soup(self.MARKUP)
+        loaded = loads(dumps(soup))
+        assert loaded.decode() == soup.decode()
+        assert loaded.get_text() == soup.get_text()
+        self.linkage_validator(loaded)
+        self.assertConnectedness(loaded)
+
+        # String classes, multi-valued attributes and source
+        # positions survive.
+        assert isinstance(loaded.contents[0], Doctype)
+        assert isinstance(loaded.script.string, Script)
+        assert isinstance(loaded.style.string, Stylesheet)
+        assert isinstance(loaded.find(string="c"), Comment)
+        assert loaded.p["class"] == ["a", "b"]
+        assert isinstance(loaded.p["class"], soup.p["class"].__class__)
+        assert loaded.find_all("p")[1]["class"] == []
+        assert loaded.a["href"] == ""
+        assert (loaded.b.sourceline, loaded.b.sourcepos) == (
+            soup.b.sourceline,
+            soup.b.sourcepos,
+        )
+        assert loaded.br.can_be_empty_element is True
+        assert loaded.p.can_be_empty_element is False
+        assert loaded.script.interesting_string_types == {Script}
+        assert loaded.meta.encode("utf16") == soup.meta.encode("utf16")
+
+    def test_encoding_information_survives(self):
+        soup = self.soup(self.MARKUP.encode("utf8"))
+        loaded = loads(dumps(soup))
+        assert loaded.original_encoding == "utf-8"
+        assert loaded.declared_html_encoding == soup.declared_html_encoding
+        assert loaded.builder.NAME == soup.builder.NAME
+
+    def test_modified_tree(self):
+        soup = self.soup("<div><p>one</p><p>two</p></div>")
+        soup.p.extract()
+        soup.div.append(soup.new_tag("span", string="three"))
+        soup.div.insert(0, "zero")
+        loaded = loads(dumps(soup))
+        assert loaded.decode() == "<div>zero<p>two</p><span>three</span></div>"
+        self.linkage_validator(loaded)
+
+    def test_empty_document(self):
+        loaded = loads(dumps(self.soup("")))
+        assert loaded.decode() == ""
+        assert loaded.contents == []
+
+    def test_element_classes(self):
+        class MyTag(Tag):
+            pass
+
+        class MyString(NavigableString):
+            pass
+
+        classes = {Tag: MyTag, NavigableString: MyString}
+        soup = self.soup("<p>text</p>", element_classes=classes)
+        data = dumps(soup)
+
+        loaded = loads(data, element_classes=classes)
+        assert isinstance(loaded.p, MyTag)
+        assert isinstance(loaded.p.string, MyString)
+
+        # Classes that aren't available when the tree is loaded are
+        # replaced with the default classes.
+        loaded = loads(data)
+        assert type(loaded.p) is Tag
+        assert type(loaded.p.string) is NavigableString
+        assert loaded.decode() == "<p>text</p>"
+
+    def test_bad_data(self):
+        with pytest.raises(ValueError):
+            loads(b"")
+        with pytest.raises(ValueError):
+            loads(b"not a tree" * 10)
+        data = dumps(self.soup("<p>text</p>"))
+        with pytest.raises(ValueError):
+            loads(data[:-2])
+
+
+class TestTreeView(SoupTest):
+    MARKUP = (
+        "<html><head><title>T</title><script>var x;</script></head><body>"
+        "<div id='main' class='content wide'><p class='a'>one <b>two</b></p>"
+        "<p class='b'>three</p><div><p>four</p></div></div>"
+        "<p>five</p></body></html>"
+    )
+
+    def setup_method(self):
+        self.soup_ = self.soup(self.MARKUP)
+        self.tree = TreeView(dumps(self.soup_))
+
+    def names(self, nodes):
+        return [node.name for node in nodes]
+
+    def texts(self, nodes):
+        return [node.get_text() for node in nodes]
+
+    def test_get_text(self):
+        assert self.tree.get_text() == self.soup_.get_text()
+        assert self.tree.get_text("|", strip=True) == self.soup_.get_text(
+            "|", strip=True
+        )
+        assert self.tree.find("script").get_text() == "var x;"
+        assert self.tree.get_text(types=[Script]) == "var x;"
+
+    @pytest.mark.parametrize(
+        "args, kwargs",
+        [
+            (("p",), {}),
+            ((["b", "title"],), {}),
+            ((re.compile("^d"),), {}),
+            ((True,), {}),
+            ((), {"class_": "a"}),
+            ((), {"class_": "content wide"}),
+            ((), {"id": "main"}),
+            ((), {"id": True}),
+            (("p",), {"class_": re.compile("b")}),
+            ((lambda tag: len(tag.name) > 3,), {}),
+        ],
+    )
+    def test_find_all_matches_tag_find_all(self, args, kwargs):
+        expect = self.soup_.find_all(*args, **kwargs)
+        found = self.tree.find_all(*args, **kwargs)
+        assert self.names(found) == self.names(expect)
+        assert self.texts(found) == self.texts(expect)
+
+    def test_find_all_options(self):
+        div = self.tree.find("div")
+        assert self.texts(div.find_all("p")) == ["one two", "three", "four"]
+        assert self.texts(div.find_all("p", recursive=False)) == ["one two", "three"]
+        assert self.texts(self.tree.find_all("p", limit=2)) == ["one two", "three"]
+        assert self.tree.find("nosuchtag") is None
+
+    def test_navigation(self):
+        div = self.tree.find(id="main")
+        assert div.attrs == {"id": "main", "class": ["content", "wide"]}
+        assert div["class"] == ["content", "wide"]
+        assert div.get("nosuchattr", "default") == "default"
+        assert div.parent.name == "body"
+        assert [node.name or str(node) for node in div.find("p").children] == [
+            "one ",
+            "b",
+        ]
+        assert len(list(div.descendants)) == len(list(self.soup_.div.descendants))
+        assert self.tree.parent is None
+        assert len(self.tree) == len(list(self.soup_.descendants)) + 1
+
+    def test_open_memory_maps_a_file(self, tmp_path):
+        path = tmp_path / "page.bs4"
+        path.write_bytes(dumps(self.soup_))
+        with TreeView.open(str(path)) as tree:
+            assert self.texts(tree.find_all("p")) == self.texts(
+                self.soup_.find_all("p")
+            )
+            assert tree._mmap is not None
+        assert tree._mmap is None
+
+    def test_view_and_soup_agree_on_a_large_document(self):
+        markup = "".join(
+            "<div class='row r%d'><p id='p%d'>para %d <i>x</i></p></div>"
+            % (i % 7, i, i)
+            for i in range(500)
+        )
+        soup = self.soup(markup)
+        tree = TreeView(dumps(soup))
+        for args, kwargs in (
+            (("i",), {}),
+            (("div",), {"class_": "r3"}),
+            ((), {"id": "p250"}),
+        ):
+            assert self.texts(tree.find_all(*args, **kwargs)) == self.texts(
+                soup.find_all(*args, **kwargs)
+            )
+        assert tree.get_text() == soup.get_text()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Tests of Beautiful Soup as a whole."""
 
+from io import BytesIO
 import logging
 import pickle
 import pytest
@@ -12,6 +13,7 @@ from bs4 import (
     dammit,
 )
 from bs4.builder import (
+    HTMLParserTreeBuilder,
     TreeBuilder,
 )
 from bs4.element import (
@@ -28,6 +30,7 @@ from bs4.exceptions import (
 )
 from bs4._warnings import (
     MarkupResemblesLocatorWarning,
+    XMLParsedAsHTMLWarning,
 )
 
 
@@ -465,6 +468,235 @@ class TestSelectiveParsing(SoupTest):
         assert soup.encode() == b"<b>Yes</b><b>Yes <c>Yes</c></b>"
 
 
+class TestIncrementalParsing(SoupTest):
+    """Test BeautifulSoup.incremental(), feed() and close()."""
+
+    def feed_in_chunks(self, data, size, **kwargs):
+        soup = BeautifulSoup.incremental("html.parser", **kwargs)
+        for i in range(0, len(data), size):
+            soup.feed(data[i : i + size])
+        soup.close()
+        return soup
+
+    @pytest.mark.parametrize("size", [1, 3, 64, 100000])
+    def test_chunks_build_same_tree(self, size):
+        markup = (
+            "<!DOCTYPE html><html><head><title>Caf\u00e9</title>"
+            "<script>if (a < b) { x(); }</script></head>"
+            '<body><p class="a b">Fish &amp; chips &eacute; &#233; &#x41;</p>'
+            "<!-- a comment --><br><p>unclosed<pre>  keep  </pre>"
+        )
+        expect = BeautifulSoup(markup, "html.parser")
+        soup = self.feed_in_chunks(markup, size)
+        assert soup.decode() == expect.decode()
+        assert soup.original_encoding is None
+
+        data = markup.encode("utf8")
+        soup = self.feed_in_chunks(data, size)
+        assert soup.decode() == expect.decode()
+        assert soup.original_encoding == "utf-8"
+        assert soup.p.sourceline == expect.p.sourceline
+        assert soup.p.sourcepos == expect.p.sourcepos
+
+    def test_encoding_detected_from_first_chunk(self):
+        data = (
+            '<html><head><meta charset="windows-1252"></head>'
+            "<body><p>Caf\u00e9 \u20ac</p></body></html>"
+        ).encode("windows-1252")
+        soup = self.feed_in_chunks(data, 5)
+        assert soup.original_encoding == "windows-1252"
+        assert soup.declared_html_encoding == "windows-1252"
+        assert soup.p.string == "Caf\u00e9 \u20ac"
+
+        soup = self.feed_in_chunks(data, 5, from_encoding="iso-8859-1")
+        assert soup.original_encoding == "iso-8859-1"
+
+    def test_invalid_bytes_after_encoding_is_chosen(self):
+        data = b"<p>" + b"a" * 2000 + b"\xff</p>"
+        soup = self.feed_in_chunks(data, 1000)
+        assert soup.original_encoding == "utf-8"
+        assert soup.p.string.endswith("a\ufffd")
+        assert soup.contains_replacement_characters is True
+
+    def test_empty_document(self):
+        soup = BeautifulSoup.incremental("html.parser")
+        soup.close()
+        assert soup.decode() == ""
+
+    def test_builder_that_cannot_feed_incrementally(self):
+        class WholeDocumentBuilder(HTMLParserTreeBuilder):
+            CAN_FEED_INCREMENTALLY = False
+
+        data = "<p>Caf\u00e9</p>".encode("utf8")
+        soup = BeautifulSoup.incremental(builder=WholeDocumentBuilder)
+        soup.feed(data[:5])
+        assert soup.decode() == ""
+        soup.feed(data[5:])
+        soup.close()
+        assert soup.decode() == "<p>Caf\u00e9</p>"
+        assert soup.original_encoding == "utf-8"
+
+    def test_feed_requires_incremental_soup(self):
+        soup = self.soup("<p></p>")
+        with pytest.raises(ValueError):
+            soup.feed("<p>")
+
+        soup = BeautifulSoup.incremental("html.parser")
+        soup.close()
+        with pytest.raises(ValueError):
+            soup.close()
+
+    def test_chunks_must_have_the_same_type(self):
+        soup = BeautifulSoup.incremental("html.parser")
+        soup.feed(b"<p>")
+        with pytest.raises(TypeError):
+            soup.feed("</p>")
+
+    def test_xml_parsed_as_html_warning_points_at_caller(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            soup = BeautifulSoup.incremental("html.parser")
+            soup.feed('<?xml version="1.0"?><root>')
+            soup.feed("text</root>")
+            soup.close()
+        [warning] = w
+        assert isinstance(warning.message, XMLParsedAsHTMLWarning)
+        assert warning.filename == __file__
+
+
+class TestIterparse(SoupTest):
+    """Test BeautifulSoup.iterparse()."""
+
+    MARKUP = (
+        "<html><head><title>T</title><script>if (a < b) {}</script></head>"
+        "<body><p class='a'>Hello <b>bold</b><br> there</p><!--c-->"
+        "<p>two</body></html>"
+    )
+
+    def describe(self, events):
+        return [
+            (event, element.name if isinstance(element, Tag) else str(element))
+            for event, element in events
+        ]
+
+    def expected_events(self, markup):
+        # The same events _event_stream() yields after the fact,
+        # without EMPTY_ELEMENT_EVENT.
+        soup = self.soup(markup)
+        events = []
+        for event, element in soup._event_stream():
+            if element is soup:
+                continue
+            if event is Tag.EMPTY_ELEMENT_EVENT:
+                events.append((Tag.START_ELEMENT_EVENT, element))
+                events.append((Tag.END_ELEMENT_EVENT, element))
+            else:
+                events.append((event, element))
+        return self.describe(events)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 100000])
+    def test_events_match_event_stream(self, chunk_size):
+        expect = self.expected_events(self.MARKUP)
+        for source in (self.MARKUP, self.MARKUP.encode("utf8")):
+            events = BeautifulSoup.iterparse(
+                source, "html.parser", chunk_size=chunk_size
+            )
+            assert self.describe(events) == expect
+
+    def test_sources(self):
+        expect = self.expected_events(self.MARKUP)
+        data = self.MARKUP.encode("utf8")
+        for source in (BytesIO(data), [data[:10], data[10:]]):
+            events = BeautifulSoup.iterparse(source, "html.parser", chunk_size=5)
+            assert self.describe(events) == expect
+
+    def test_event_arrives_when_element_is_complete(self):
+        # With a large chunk size the parser may be further along than
+        # the event being handled, so feed one character at a time.
+        for event, element in BeautifulSoup.iterparse(
+            self.MARKUP, "html.parser", chunk_size=1
+        ):
+            if event is Tag.START_ELEMENT_EVENT:
+                assert element.contents == []
+                if element.name == "p" and element.next_sibling is None:
+                    assert element.get("class") in (["a"], None)
+            elif event is Tag.END_ELEMENT_EVENT and element.name == "b":
+                assert element.string == "bold"
+            elif event is Tag.STRING_ELEMENT_EVENT and element == "c":
+                assert isinstance(element, Comment)
+
+    def test_removing_processed_elements(self):
+        markup = "<html><body>%s</body></html>" % "".join(
+            "<div><p>para %d <b>x</b></p></div>" % i for i in range(200)
+        )
+        strings = []
+        max_tags = 0
+        soup = None
+        for event, element in BeautifulSoup.iterparse(
+            markup, "html.parser", chunk_size=50
+        ):
+            if event is Tag.STRING_ELEMENT_EVENT:
+                strings.append(str(element))
+            if event is Tag.START_ELEMENT_EVENT:
+                soup = element
+                while soup.parent is not None:
+                    soup = soup.parent
+                max_tags = max(max_tags, len(soup.find_all(True)))
+                continue
+            element.decompose()
+
+        assert "".join(strings) == self.soup(markup).get_text()
+        # Only the open tags, plus whatever was in the chunk being
+        # handled, were ever in the tree at once.
+        assert max_tags < 10
+        assert soup.decode() == ""
+
+    def test_tree_stays_sound_when_elements_are_removed(self):
+        markup = "<div><p>one</p><p>two</p><span>three</span></div><p>four</p>"
+        soup = None
+        for event, element in BeautifulSoup.iterparse(
+            markup, "html.parser", chunk_size=3
+        ):
+            if soup is None:
+                soup = element.parent
+            if event is Tag.END_ELEMENT_EVENT and element.name == "p":
+                element.extract()
+        assert soup.decode() == "<div><span>three</span></div>"
+        self.linkage_validator(soup)
+
+    def test_builder_that_cannot_feed_incrementally(self):
+        class WholeDocumentBuilder(HTMLParserTreeBuilder):
+            CAN_FEED_INCREMENTALLY = False
+
+        events = BeautifulSoup.iterparse(
+            self.MARKUP, builder=WholeDocumentBuilder, chunk_size=10
+        )
+        assert self.describe(events) == self.expected_events(self.MARKUP)
+
+    def test_parse_only(self):
+        strainer = SoupStrainer("b")
+        events = BeautifulSoup.iterparse(
+            self.MARKUP, "html.parser", parse_only=strainer
+        )
+        assert self.describe(events) == [
+            (Tag.START_ELEMENT_EVENT, "b"),
+            (Tag.STRING_ELEMENT_EVENT, "bold"),
+            (Tag.END_ELEMENT_EVENT, "b"),
+        ]
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_lxml(self):
+        expect = self.describe(
+            (event, element)
+            for event, element in BeautifulSoup.iterparse(
+                self.MARKUP, "lxml", chunk_size=100000
+            )
+        )
+        events = BeautifulSoup.iterparse(self.MARKUP.encode("utf8"), "lxml", chunk_size=4)
+        assert self.describe(events) == expect
+        assert (Tag.END_ELEMENT_EVENT, "title") in expect
+
+
 class TestNewTag(SoupTest):
     """Test the BeautifulSoup.new_tag() method."""
 
@@ -545,6 +777,27 @@ class TestPickle(SoupTest):
         unpickled = pickle.loads(pickled)
         assert "some markup" == unpickled.string
 
+    def test_pickle_keeps_tree_details(self):
+        # The tree is pickled in the format from bs4.serialize, not
+        # as markup, so details that markup can't express survive.
+        soup = self.soup("<p>\n<b>bold</b></p>")
+        soup.p.append(soup.new_string("a comment", Comment))
+        unpickled = pickle.loads(pickle.dumps(soup))
+        assert unpickled.decode() == soup.decode()
+        assert isinstance(unpickled.p.contents[-1], Comment)
+        assert unpickled.b.sourceline == soup.b.sourceline
+        assert unpickled.b.sourcepos == soup.b.sourcepos
+        self.linkage_validator(unpickled)
+
+    def test_unpickle_markup_from_older_version(self):
+        soup = self.soup("<a>some markup</a>")
+        state = soup.__getstate__()
+        del state["tree"]
+        state["markup"] = soup.decode()
+        unpickled = BeautifulSoup.__new__(BeautifulSoup)
+        unpickled.__setstate__(state)
+        assert "some markup" == unpickled.a.string
+
 
 class TestEncodingConversion(SoupTest):
     # Test Beautiful Soup's ability to decode and encode from various
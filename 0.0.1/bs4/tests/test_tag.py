@@ -1,7 +1,9 @@
 import warnings
+import weakref
 from bs4.element import (
     Comment,
     NavigableString,
+    Tag,
 )
 from . import SoupTest
 
@@ -16,7 +18,7 @@ class TestTag(SoupTest):
         tag = self.soup("").new_tag("a_tag")
 
         # No list of whitespace-preserving tags -> pretty-print
-        tag._preserve_whitespace_tags = None
+        tag.preserve_whitespace_tags = None
         assert True is tag._should_pretty_print(0)
 
         # List exists but tag is not on the list -> pretty-print
@@ -30,6 +32,56 @@ class TestTag(SoupTest):
         tag.preserve_whitespace_tags = ["some_other_tag", "a_tag"]
         assert False is tag._should_pretty_print(1)
 
+    def test_tags_have_no_instance_dictionary(self):
+        soup = self.soup("<a><b>text</b></a>")
+        assert not hasattr(soup.a, "__dict__")
+        assert not hasattr(soup.b, "__dict__")
+
+        # Tags can still be weakly referenced.
+        assert weakref.ref(soup.b)() is soup.b
+
+    def test_tags_share_builder_configuration(self):
+        soup = self.soup("<a><b>text</b></a><pre></pre>")
+        a, b = soup.a, soup.b
+        assert a._configuration is b._configuration
+        assert a.parser_class is soup.__class__
+        assert a.known_xml is False
+        assert a.cdata_list_attributes is soup.builder.cdata_list_attributes
+        assert a.preserve_whitespace_tags is soup.builder.preserve_whitespace_tags
+
+        # Changing a shared value on one tag doesn't affect the others.
+        b.preserve_whitespace_tags = {"b"}
+        assert b.preserve_whitespace_tags == {"b"}
+        assert a.preserve_whitespace_tags is soup.builder.preserve_whitespace_tags
+        assert a._configuration is soup.pre._configuration
+
+        # Tags created after the builder's settings change get a new
+        # configuration.
+        soup.builder.preserve_whitespace_tags = {"a"}
+        tag = soup.new_tag("c")
+        assert tag.preserve_whitespace_tags == {"a"}
+        assert tag._configuration is not a._configuration
+
+    def test_tag_without_builder(self):
+        tag = Tag(name="a", is_xml=True, preserve_whitespace_tags={"a"})
+        assert tag.parser_class is None
+        assert tag.known_xml is True
+        assert tag.cdata_list_attributes is None
+        assert tag.preserve_whitespace_tags == {"a"}
+        assert False is tag._should_pretty_print(1)
+
+    def test_subclass_can_have_arbitrary_attributes(self):
+        class TagPlus(Tag):
+            pass
+
+        soup = self.soup("<a><b>text</b></a>", element_classes={Tag: TagPlus})
+        soup.b.note = "hello"
+        assert "hello" == soup.b.note
+        assert soup.b.parser_class is soup.__class__
+
+        soup.b.decompose()
+        assert soup.decode() == "<a></a>"
+
     def test_len(self):
         """The length of a Tag is its number of children."""
         soup = self.soup("<top>1<b>2</b>3</top>")
@@ -124,6 +176,49 @@ class TestTag(SoupTest):
         assert soup.a.get_text(",") == "a,r, , t "
         assert soup.a.get_text(",", strip=True) == "a,r,t"
 
+    def test_get_text_matches_strings(self):
+        # get_text() walks the tree itself rather than going through
+        # .strings, but the two must agree.
+        soup = self.soup(
+            "<div>a<b> </b><!--c--><p>d<i>e</i></p>f<script>g</script>"
+            "<pre>\n h </pre><![CDATA[i]]></div><p>j</p>"
+        )
+        for tag in soup, soup.div, soup.div.p, soup.div.b, soup.find("i"):
+            for types in (
+                Tag.default,
+                None,
+                Comment,
+                (NavigableString, Comment),
+                [NavigableString, Tag],
+            ):
+                assert tag.get_text(types=types) == "".join(
+                    tag._all_strings(types=types)
+                )
+                assert tag.get_text("|", True, types) == "|".join(
+                    tag._all_strings(True, types)
+                )
+        assert soup.new_tag("empty").get_text() == ""
+        soup.div.extract()
+        assert soup.get_text("|") == "j"
+
+    def test_get_text_collapse_whitespace(self):
+        soup = self.soup(
+            "<div>\n  Heading  \n<p>One line\r\nand another</p>"
+            "<p>   Wide   gaps  here </p><p> \n </p><b>a b</b></div>"
+        )
+        assert soup.get_text("\n", collapse_whitespace=True) == (
+            "Heading\nOne line\nand another\nWide\ngaps\nhere\na b"
+        )
+        assert soup.div.b.string.get_text("|", collapse_whitespace=True) == "a b"
+
+        # It's the same thing you'd get by doing it yourself.
+        text = soup.get_text("\n")
+        lines = (line.strip() for line in text.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        assert soup.get_text("\n", collapse_whitespace=True) == "\n".join(
+            chunk for chunk in chunks if chunk
+        )
+
     def test_get_text_ignores_special_string_containers(self):
         soup = self.soup("foo<!--IGNORE-->bar")
         assert soup.get_text() == "foobar"
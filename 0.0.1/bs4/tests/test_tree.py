@@ -9,6 +9,8 @@ same markup, but all Beautiful Soup trees can be traversed with the
 methods tested here.
 """
 
+import copy
+import pickle
 import pytest
 import re
 import warnings
@@ -398,6 +400,170 @@ class TestFindAllByAttribute(SoupTest):
         assert [] == soup.find_all(id=1, string="bar")
 
 
+class TestElementIndex(SoupTest):
+    """Test the index created by BeautifulSoup.enable_index()."""
+
+    MARKUP = (
+        "<div id='main' class='content wide'><p class='a'>one <b>two</b></p>"
+        "<p class='b a' id='second'>three</p><div><p>four</p><b class='a'>x</b>"
+        "</div></div><p>five</p><svg:rect class='a'/>"
+    )
+
+    QUERIES = [
+        (("p",), {}),
+        (("b",), {"class_": "a"}),
+        ((), {"class_": "a"}),
+        ((), {"class_": "content wide"}),
+        ((), {"class_": "wide"}),
+        ((), {"class_": "b a"}),
+        ((), {"id": "second"}),
+        (("p",), {"attrs": {"id": "second"}}),
+        (("p", "a"), {}),
+        ((), {"attrs": {"class": "a"}}),
+        (("nosuchtag",), {}),
+        ((), {"id": "nosuchid"}),
+        (("svg:rect",), {}),
+        ((re.compile("^d"),), {}),
+        (("p",), {"string": "three"}),
+        (("p",), {"limit": 2}),
+    ]
+
+    def assert_same_results(self, soup, tag=None):
+        """Run every query against an indexed and an unindexed copy of
+        the same tree.
+        """
+        for args, kwargs in self.QUERIES:
+            soup.disable_index()
+            expect = (tag or soup).find_all(*args, **kwargs)
+            soup.enable_index()
+            found = (tag or soup).find_all(*args, **kwargs)
+            assert [id(x) for x in found] == [id(x) for x in expect], (args, kwargs)
+
+    def test_results_match_unindexed_search(self):
+        soup = self.soup(self.MARKUP)
+        self.assert_same_results(soup)
+        self.assert_same_results(soup, soup.div)
+        self.assert_same_results(soup, soup.div.div)
+
+    def test_index_is_used(self):
+        soup = self.soup(self.MARKUP)
+        soup.enable_index()
+        assert soup.find(id="second").string == "three"
+        index = soup._element_index
+        assert index.built
+        assert [x.string for x in index.by_class["a"].values()] == [
+            None,
+            "three",
+            "x",
+            None,
+        ]
+        assert index.candidates(soup, "p", {}, {"id": "second"}) == [
+            soup.find(id="second")
+        ]
+        assert index.candidates(soup, True, {}, {}) is None
+        assert index.candidates(soup.div.div, None, {}, {"class_": "a"}) == [soup.div.div.b]
+
+    def test_extract_and_decompose(self):
+        soup = self.soup(self.MARKUP)
+        soup.enable_index()
+        soup.find_all("p")
+        second = soup.find(id="second")
+        second.extract()
+        assert soup._element_index.built
+        assert soup.find(id="second") is None
+        assert second.find_all("p") == []
+        soup.div.div.decompose()
+        assert [p.string for p in soup.find_all("p")] == [None, "five"]
+        assert soup.find_all("b", class_="a") == []
+        self.assert_same_results(soup)
+
+    def test_insertion(self):
+        soup = self.soup(self.MARKUP)
+        soup.enable_index()
+        soup.find_all("p")
+        new = soup.new_tag("p", id="new", attrs={"class": "a"})
+        soup.div.insert(0, new)
+        assert soup.find(id="new") is new
+        assert soup.find_all(class_="a")[:2] == [new, soup.div.contents[1]]
+        soup.find("p", string="five").replace_with(soup.new_tag("p", id="five"))
+        assert soup.find(id="five").name == "p"
+        self.assert_same_results(soup)
+
+    def test_attribute_changes(self):
+        soup = self.soup(self.MARKUP)
+        soup.enable_index()
+        assert soup.find(id="second") is not None
+        tag = soup.find(id="second")
+        tag["id"] = "renamed"
+        assert soup.find(id="second") is None
+        assert soup.find(id="renamed") is tag
+        del tag["class"]
+        assert tag not in soup.find_all(class_="b")
+        soup.p["class"] = "new"
+        assert soup.find(class_="new") is soup.p
+        self.assert_same_results(soup)
+
+        # Changes made directly to .attrs aren't noticed until the
+        # index is rebuilt.
+        soup.p.attrs["id"] = "direct"
+        soup.enable_index()
+        assert soup.find(id="direct") is soup.p
+
+    def test_class_changed_in_place(self):
+        soup = self.soup(self.MARKUP)
+        soup.enable_index()
+        p = soup.find("p", class_="a")
+        assert soup.find_all(class_="z") == []
+        p["class"].append("z")
+        assert soup.find_all(class_="z") == [p]
+        p["class"].remove("a")
+        assert p not in soup.find_all(class_="a")
+        p["class"] += ["y"]
+        assert soup.find(class_="y") is p
+        p["class"][0] = "x"
+        assert soup.find(class_="x") is p
+        p["class"].clear()
+        assert soup.find_all(class_="x") == []
+        self.assert_same_results(soup)
+
+        # The list doesn't bring its tag along when it's copied or
+        # pickled.
+        copied = copy.copy(soup.div["class"])
+        assert copied == ["content", "wide"] and copied._owner is None
+        loaded = pickle.loads(pickle.dumps(soup.div["class"]))
+        assert loaded == ["content", "wide"] and loaded._owner is None
+
+        # Renaming a tag isn't noticed until the index is rebuilt.
+        p.name = "q"
+        assert soup.find("q") is None
+        soup.enable_index()
+        assert soup.find("q") is p
+
+    def test_reparse_and_copy(self):
+        soup = self.soup(self.MARKUP)
+        soup.enable_index()
+        soup.find_all("p")
+        soup.reset()
+        assert soup.find_all("p") == []
+
+        soup = self.soup(self.MARKUP)
+        soup.enable_index()
+        soup.find_all("p")
+        other = self.soup("<p id='second'>elsewhere</p>")
+        assert other.find(id="second").string == "elsewhere"
+        assert other._element_index is None
+
+    def test_incremental_parse(self):
+        soup = BeautifulSoup.incremental("html.parser")
+        soup.enable_index()
+        soup.feed("<p id='a'>one</p>")
+        assert soup.find(id="a").string == "one"
+        soup.feed("<p id='b'>two</p>")
+        soup.close()
+        assert soup.find(id="b").string == "two"
+        assert len(soup.find_all("p")) == 2
+
+
 class TestSmooth(SoupTest):
     """Test Tag.smooth."""
 
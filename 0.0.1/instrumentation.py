@@ -0,0 +1,162 @@
+# instrumentation.py
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+# Default histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets for size histograms, in bytes
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+METRIC_PREFIX = "nearfood_"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for providers that don't report usage."""
+    return (len(text) + 3) // 4
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    """Cumulative bucket counts plus sum and count, as Prometheus expects."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    A small in-process registry of counters and histograms.
+
+    Metrics carry low-cardinality labels such as `stage`. Anything keyed by a
+    specific event goes into the per-event table instead, so the Prometheus
+    output stays small while the JSON run report keeps the detail.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.events: Dict[str, Dict[str, float]] = {}
+        self.started_at = datetime.now().isoformat()
+
+    def reset(self):
+        """Clears all recorded values."""
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.events.clear()
+            self.started_at = datetime.now().isoformat()
+
+    def inc(self, name: str, value: float = 1, event: Optional[str] = None, **labels):
+        """Adds `value` to a counter, and to the event's own total if `event` is given."""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if event is not None:
+                record = self.events.setdefault(event, {})
+                record[name] = record.get(name, 0) + value
+
+    def observe(self, name: str, value: float, buckets=DEFAULT_BUCKETS, event: Optional[str] = None, **labels):
+        """Records a value in a histogram, and on the event if `event` is given."""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+            if event is not None:
+                field = name + "".join(f"_{v}" for _, v in key)
+                record = self.events.setdefault(event, {})
+                record[field] = record.get(field, 0) + value
+
+    @contextmanager
+    def timer(self, stage: str, event: Optional[str] = None) -> Iterator[None]:
+        """Times the enclosed block into the `stage_seconds` histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(stage, time.perf_counter() - start, event=event)
+
+    def record_time(self, stage: str, seconds: float, event: Optional[str] = None):
+        """Records time spent in a stage that can't be wrapped in a single timer() block."""
+        self.observe("stage_seconds", seconds, event=event, stage=stage)
+
+    def to_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                metric = f"{METRIC_PREFIX}{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{metric}_bucket{_format_labels(key, ('le', repr(float(bound))))} {count}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {histogram.sum}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict:
+        """Returns a JSON-serializable run report."""
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "finished_at": datetime.now().isoformat(),
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in sorted(series.items())]
+                    for name, series in sorted(self.counters.items())
+                },
+                "histograms": {
+                    name: [
+                        {"labels": dict(key), "count": h.count, "sum": h.sum,
+                         "mean": h.sum / h.count if h.count else 0.0}
+                        for key, h in sorted(series.items())
+                    ]
+                    for name, series in sorted(self.histograms.items())
+                },
+                "events": {event: dict(record) for event, record in self.events.items()},
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+
+# Process-wide registry shared by the pipeline and the /metrics endpoint
+METRICS = Metrics()
@@ -0,0 +1,194 @@
+from pydantic import BaseModel
+from huggingface import Dataset
+from nearai.solvers import SolverScoringMethod, SolverStrategy, SolverStrategyClassProperty
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from food_classifier import FoodClassifier, LABELS_FILE, is_evaluation_event
+
+PIPELINES = ["serial", "batched", "cached", "heuristic"]
+REPORT_FILE = "free_food_benchmark_report.json"
+CACHE_FILE = "free_food_screen_cache.json"
+
+SCREEN_PROMPT = "Parse the event name and description and return only true/false and nothing else. true if the description suggests there's a good chance of free food, false otherwise. event description doesn't need to mention food, still return true if the type of events may have free food."
+BATCH_SCREEN_PROMPT = "For each numbered event below, decide whether there's a good chance of free food. The description doesn't need to mention food, still answer true if the type of event may have free food. Return one line per event in the form '<number>: true' or '<number>: false' and nothing else."
+
+_BATCH_LINE_RE = re.compile(r"^\s*(\d+)\s*[:.)-]\s*(true|false)\b", re.IGNORECASE | re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); the session API doesn't report usage."""
+    return (len(text) + 3) // 4
+
+
+class FreeFoodDatum(BaseModel):
+    summary: str
+    description: str
+    location: str
+    start: str
+    end: str
+
+
+class FreeFoodSolver(SolverStrategy):
+    """
+    Solver for free food screening over the lu_ma_events dataset.
+
+    Each datum is screened with one of the pipeline configurations below and
+    compared against the hand-labeled subset in lu_ma_events_labels.json.
+    Only labeled events in the evaluation split are scored, since the
+    FoodClassifier was trained on the rest; every pipeline is scored on the
+    same events, so their accuracies can be compared.
+
+    - serial: one LLM call per event, as the agent does today.
+    - batched: events are screened `batch_size` at a time in one LLM call.
+    - cached: LLM responses are memoized on disk, keyed by prompt.
+    - heuristic: the local FoodClassifier screens obvious events first.
+
+    Accuracy, LLM calls, estimated tokens and wall-clock per event are
+    accumulated per pipeline and written to REPORT_FILE after every datum.
+    """
+
+    def __init__(self, dataset_ref: Dataset, model: str = "", agent: str = "", pipeline: str = "serial",
+                 batch_size: int = 8):
+        super().__init__(model, agent)
+        if pipeline not in PIPELINES:
+            raise ValueError(f"Unknown pipeline {pipeline!r}, expected one of {PIPELINES}")
+        self.dataset_ref = dataset_ref
+        self.pipeline = pipeline
+        self.batch_size = batch_size
+        with open(LABELS_FILE, "r") as f:
+            self.labels = {item["summary"]: item["free_food"] for item in json.load(f)}
+        self.classifier = FoodClassifier.load()
+        self.batch_results: Dict[str, bool] = {}
+        self.tasks: Optional[List[Dict[str, str]]] = None
+        self.cache: Dict[str, str] = {}
+        if pipeline == "cached" and os.path.exists(CACHE_FILE):
+            with open(CACHE_FILE, "r") as f:
+                self.cache = json.load(f)
+        self.stats = {
+            "unlabeled_events": 0,
+            "training_events": 0,
+            "events": 0,
+            "correct": 0,
+            "llm_calls": 0,
+            "cache_hits": 0,
+            "tokens_in": 0,
+            "tokens_out": 0,
+            "seconds": 0.0,
+        }
+
+    def evaluation_name(self) -> str:
+        return "lu_ma_events_free_food"
+
+    def compatible_datasets(self) -> List[str]:
+        return ["lu_ma_events"]
+
+    @SolverStrategyClassProperty
+    def scoring_method(self) -> SolverScoringMethod:
+        return SolverScoringMethod.Custom
+
+    def get_custom_tasks(self) -> List[Dict[str, str]]:
+        """Returns the labeled events in the evaluation split; the rest are only counted."""
+        if self.tasks is None:
+            self.tasks = []
+            self.stats["unlabeled_events"] = 0
+            self.stats["training_events"] = 0
+            for row in self.dataset_ref:
+                if row["summary"] not in self.labels:
+                    self.stats["unlabeled_events"] += 1
+                elif not is_evaluation_event(row["summary"]):
+                    self.stats["training_events"] += 1
+                else:
+                    self.tasks.append(row)
+        return self.tasks
+
+    def get_evaluation_metrics(self, tasks_results: List[Tuple[bool, Any]]) -> Dict[str, Any]:
+        metrics = {key: value for key, value in self.report().items() if key != "pipeline"}
+        # Results can come from the benchmark cache, so score those rather
+        # than this run's counters.
+        metrics["accuracy"] = sum(1 for solved, _ in tasks_results if solved) / (len(tasks_results) or 1)
+        return metrics
+
+    def _complete(self, label: str, prompt: str) -> str:
+        if self.pipeline == "cached":
+            key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+            if key in self.cache:
+                self.stats["cache_hits"] += 1
+                return self.cache[key]
+        session = self.start_inference_session(label)
+        result = session.run_task(prompt).strip()
+        self.stats["llm_calls"] += 1
+        self.stats["tokens_in"] += estimate_tokens(prompt)
+        self.stats["tokens_out"] += estimate_tokens(result)
+        if self.pipeline == "cached":
+            self.cache[key] = result
+            with open(CACHE_FILE, "w") as f:
+                json.dump(self.cache, f)
+        return result
+
+    def _screen(self, datum: FreeFoodDatum) -> bool:
+        if self.pipeline == "heuristic":
+            has_food, _ = self.classifier.classify(datum.summary, datum.description)
+            if has_food is not None:
+                return has_food
+        if self.pipeline == "batched":
+            return self._screen_batched(datum)
+        prompt = f"{SCREEN_PROMPT}\n\n{datum.summary}{datum.description}"
+        return self._complete(datum.summary, prompt).lower() == "true"
+
+    def _screen_batched(self, datum: FreeFoodDatum) -> bool:
+        if datum.summary not in self.batch_results:
+            # Screen this event together with the evaluation events that follow it,
+            # so every event in the batch is one that gets scored
+            rows = self.get_custom_tasks()
+            start = next((i for i, row in enumerate(rows) if row["summary"] == datum.summary), 0)
+            batch = [FreeFoodDatum(**row) for row in rows[start:start + self.batch_size]] or [datum]
+            listing = "\n\n".join(f"{i + 1}. {d.summary}\n{d.description}" for i, d in enumerate(batch))
+            result = self._complete(datum.summary, f"{BATCH_SCREEN_PROMPT}\n\n{listing}")
+            answers = {int(n): value.lower() == "true" for n, value in _BATCH_LINE_RE.findall(result)}
+            for i, d in enumerate(batch):
+                self.batch_results.setdefault(d.summary, answers.get(i + 1, False))
+        return self.batch_results.pop(datum.summary)
+
+    def report(self) -> Dict[str, float]:
+        """Returns the accumulated metrics for this pipeline, with per-event averages."""
+        events = self.stats["events"] or 1
+        report = dict(self.stats)
+        report.update({
+            "pipeline": self.pipeline,
+            "accuracy": self.stats["correct"] / events,
+            "llm_calls_per_event": self.stats["llm_calls"] / events,
+            "tokens_per_event": (self.stats["tokens_in"] + self.stats["tokens_out"]) / events,
+            "seconds_per_event": self.stats["seconds"] / events,
+        })
+        return report
+
+    def save_report(self, path: str = REPORT_FILE):
+        """Merges this pipeline's metrics into the JSON report at `path`."""
+        reports = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                reports = json.load(f)
+        reports[self.pipeline] = self.report()
+        with open(path, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    def solve(self, datum: Dict[str, str]) -> bool:
+        datum = FreeFoodDatum(**datum)
+        label: Optional[bool] = self.labels.get(datum.summary)
+        if label is None or not is_evaluation_event(datum.summary):
+            # get_custom_tasks() leaves these out; they can't be scored.
+            raise ValueError(f"Event is not in the labeled evaluation split: {datum.summary}")
+
+        start = time.perf_counter()
+        has_food = self._screen(datum)
+        self.stats["seconds"] += time.perf_counter() - start
+        self.stats["events"] += 1
+        self.stats["correct"] += has_food == label
+        self.save_report()
+        return has_food == label
@@ -32,12 +32,12 @@ from . import css_match as cm
 from . import css_types as ct
 from .util import DEBUG, SelectorSyntaxError  # noqa: F401
 import bs4  # type: ignore[import-untyped]
-from typing import Any, Iterator, Iterable
+from typing import Any, Iterator, Iterable, Mapping
 
 __all__ = (
     'DEBUG', 'SelectorSyntaxError', 'SoupSieve',
-    'closest', 'compile', 'filter', 'iselect',
-    'match', 'select', 'select_one'
+    'cache_info', 'closest', 'compile', 'dump_compiled', 'filter', 'iselect',
+    'load_compiled', 'match', 'precompile', 'select', 'select_many', 'select_one', 'set_cache_size'
 )
 
 SoupSieve = cm.SoupSieve
@@ -76,6 +76,66 @@ def purge() -> None:
     cp._purge_cache()
 
 
+def cache_info() -> cp.CacheInfo:
+    """
+    Get statistics for the compiled pattern cache.
+
+    `hits` and `misses` count lookups in the cache, `maxsize` and `currsize` give its size,
+    `compiled` and `compile_time` count the patterns that had to be parsed and the seconds spent
+    parsing them, and `precompiled` is the number of patterns available from `precompile` and
+    `load_compiled`.
+    """
+
+    return cp._cache_info()
+
+
+def set_cache_size(maxsize: int) -> None:
+    """Set the maximum number of compiled patterns to cache."""
+
+    cp._set_cache_size(maxsize)
+
+
+def precompile(
+    patterns: Mapping[str, str],
+    namespaces: dict[str, str] | None = None,
+    flags: int = 0,
+    *,
+    custom: dict[str, str] | None = None,
+    **kwargs: Any
+) -> dict[str, cm.SoupSieve]:
+    """
+    Compile a named set of CSS patterns.
+
+    The patterns stay available to `compile` (under any namespaces) until `purge` is called,
+    even if they drop out of the cache. Save the result with `dump_compiled`.
+    """
+
+    return cp._precompile(
+        patterns,
+        ct.Namespaces(namespaces) if namespaces is not None else namespaces,
+        ct.CustomSelectors(custom) if custom is not None else custom,
+        flags
+    )
+
+
+def dump_compiled(compiled: Mapping[str, cm.SoupSieve]) -> bytes:
+    """Serialize a named set of compiled patterns, such as those returned by `precompile`."""
+
+    return cp._dump_compiled(compiled)
+
+
+def load_compiled(data: bytes) -> dict[str, cm.SoupSieve]:
+    """
+    Load compiled patterns saved by `dump_compiled`, without parsing them again.
+
+    Patterns saved by a different version of Soup Sieve are compiled again. The loaded patterns
+    are also made available to `compile`, as with `precompile`. The data is unpickled, so only
+    load data you created.
+    """
+
+    return cp._load_compiled(data)
+
+
 def closest(
     select: str,
     tag: bs4.Tag,
@@ -147,6 +207,29 @@ def select(
     return compile(select, namespaces, flags, **kwargs).select(tag, limit)
 
 
+def select_many(
+    patterns: Mapping[Any, str | cm.SoupSieve],
+    tag: bs4.Tag,
+    namespaces: dict[str, str] | None = None,
+    limit: int = 0,
+    flags: int = 0,
+    *,
+    custom: dict[str, str] | None = None,
+    **kwargs: Any
+) -> dict[Any, list[bs4.Tag]]:
+    """
+    Select the tags matching each of several patterns, in a single pass over the tree.
+
+    Returns a dictionary mapping each key of `patterns` to the list its pattern would get from `select`.
+    """
+
+    return cm.select_many(
+        {key: compile(pattern, namespaces, flags, custom=custom, **kwargs) for key, pattern in patterns.items()},
+        tag,
+        limit
+    )
+
+
 def iselect(
     select: str,
     tag: bs4.Tag,
@@ -6,7 +6,7 @@ import re
 from . import css_types as ct
 import unicodedata
 import bs4  # type: ignore[import-untyped]
-from typing import Iterator, Iterable, Any, Callable, Sequence, cast  # noqa: F401
+from typing import Iterator, Iterable, Any, Callable, Mapping, Sequence, cast  # noqa: F401
 
 # Empty tag pattern (whitespace okay)
 RE_NOT_EMPTY = re.compile('[^ \t\r\n\f]')
@@ -134,6 +134,12 @@ class _DocumentNav:
 
         return _FakeParent(el)
 
+    @classmethod
+    def get_index(cls, doc: bs4.Tag) -> Any:
+        """Get the element index the document keeps, if `BeautifulSoup.enable_index` was called."""
+
+        return doc.__dict__.get('_element_index') if cls.is_doc(doc) else None
+
     @staticmethod
     def is_xml_tree(el: bs4.Tag) -> bool:
         """Check if element (or document) is from a XML tree."""
@@ -495,6 +501,14 @@ class CSSMatch(_DocumentNav):
         self.cached_meta_lang = []  # type: list[tuple[str, str]]
         self.cached_default_forms = []  # type: list[tuple[bs4.Tag, bs4.Tag]]
         self.cached_indeterminate_forms = []  # type: list[tuple[bs4.Tag, str, bool]]
+        self.cached_relations = {}  # type: dict[tuple[str, int, int, bool], bool]
+        # Data derived from each element, keyed by `id()`. The element is stored
+        # alongside its data, so its `id()` can't be reused during the query.
+        self.cached_attributes = {}  # type: dict[int, tuple[bs4.Tag, list[tuple[str, str | Sequence[str]]]]]
+        self.cached_attribute_maps = {}  # type: dict[int, tuple[bs4.Tag, dict[str, str | Sequence[str] | None]]]
+        self.cached_classes = {}  # type: dict[int, tuple[bs4.Tag, Sequence[str]]]
+        self.cached_text = {}  # type: dict[tuple[int, bool], tuple[bs4.Tag, str]]
+        self.cached_own_text = {}  # type: dict[tuple[int, bool], tuple[bs4.Tag, list[str]]]
         self.selectors = selectors
         self.namespaces = {} if namespaces is None else namespaces  # type: ct.Namespaces | dict[str, str]
         self.flags = flags
@@ -515,6 +529,7 @@ class CSSMatch(_DocumentNav):
                 break
 
         self.root = root
+        self.index = self.get_index(doc)
         self.scope = scope if scope is not doc else root
         self.has_html_namespace = self.has_html_ns(root)
 
@@ -550,6 +565,83 @@ class CSSMatch(_DocumentNav):
         name = self.get_tag_name(el)
         return util.lower(name) if name is not None and not self.is_xml else name
 
+    def get_attribute_by_name(  # type: ignore[override]
+        self,
+        el: bs4.Tag,
+        name: str,
+        default: str | Sequence[str] | None = None
+    ) -> str | Sequence[str] | None:
+        """Get attribute by name."""
+
+        cached = self.cached_attribute_maps.get(id(el))
+        if cached is None:
+            cached = (el, {})
+            self.cached_attribute_maps[id(el)] = cached
+        values = cached[1]
+        value = values.get(name, values)
+        if value is values:
+            # Store `None` for a missing attribute, as a normalized value is never `None`.
+            value = values[name] = _DocumentNav.get_attribute_by_name(el, name)
+        return default if value is None else value
+
+    def iter_attributes(self, el: bs4.Tag) -> Iterator[tuple[str, str | Sequence[str] | None]]:  # type: ignore[override]
+        """Iterate attributes."""
+
+        cached = self.cached_attributes.get(id(el))
+        if cached is None:
+            cached = (el, [(k, self.normalize_value(v)) for k, v in el.attrs.items()])
+            self.cached_attributes[id(el)] = cached
+        return iter(cached[1])
+
+    def get_classes(self, el: bs4.Tag) -> Sequence[str]:  # type: ignore[override]
+        """Get classes."""
+
+        cached = self.cached_classes.get(id(el))
+        if cached is None:
+            cached = (el, _DocumentNav.get_classes(el))
+            self.cached_classes[id(el)] = cached
+        return cached[1]
+
+    def get_text(self, el: bs4.Tag, no_iframe: bool = False) -> str:
+        """Get text."""
+
+        cache = self.cached_text
+        cached = cache.get((id(el), no_iframe))
+        if cached is not None:
+            return cached[1]
+
+        # Build each element's text from its children's, caching the text of every
+        # element beneath `el` along the way. Checking the text of nested elements,
+        # as `:-soup-contains()` does, then takes linear time instead of quadratic.
+        stack = [(el, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                parts = []
+                for child in node.contents:
+                    if self.is_tag(child):
+                        parts.append(cache[(id(child), no_iframe)][1])
+                    elif self.is_content_string(child):
+                        parts.append(child)
+                cache[(id(node), no_iframe)] = (node, ''.join(parts))
+            elif no_iframe and self.is_iframe(node):
+                cache[(id(node), no_iframe)] = (node, '')
+            else:
+                stack.append((node, True))
+                for child in node.contents:
+                    if self.is_tag(child) and (id(child), no_iframe) not in cache:
+                        stack.append((child, False))
+        return cache[(id(el), no_iframe)][1]
+
+    def get_own_text(self, el: bs4.Tag, no_iframe: bool = False) -> list[str]:
+        """Get Own Text."""
+
+        cached = self.cached_own_text.get((id(el), no_iframe))
+        if cached is None:
+            cached = (el, _DocumentNav.get_own_text(self, el, no_iframe))
+            self.cached_own_text[(id(el), no_iframe)] = cached
+        return cached[1]
+
     def get_prefix(self, el: bs4.Tag) -> str | None:
         """Get prefix."""
 
@@ -762,6 +854,41 @@ class CSSMatch(_DocumentNav):
                 match = False
         return match
 
+    def match_relation_chain(
+        self,
+        el: bs4.Tag | None,
+        relation: ct.SelectorList,
+        rel_type: str,
+        step: Callable[[bs4.Tag], bs4.Tag | None] | None = None
+    ) -> bool:
+        """
+        Match an element, or any element reached from it by repeatedly calling `step`, against a relation.
+
+        The result is cached for every element along the way, so elements that share ancestors
+        or siblings don't test them again. The cache lives as long as this `CSSMatch`, which is
+        one query, so the tree can't change underneath it.
+        """
+
+        cache = self.cached_relations
+        rel = id(relation)
+        restrict = self.iframe_restrict
+        keys = []
+        found = False
+        while el:
+            key = (rel_type, id(el), rel, restrict)
+            cached = cache.get(key)
+            if cached is not None:
+                found = cached
+                break
+            keys.append(key)
+            if self.match_selectors(el, relation):
+                found = True
+                break
+            el = step(el) if step is not None else None
+        for key in keys:
+            cache[key] = found
+        return found
+
     def match_past_relations(self, el: bs4.Tag, relation: ct.SelectorList) -> bool:
         """Match past relationship."""
 
@@ -770,39 +897,61 @@ class CSSMatch(_DocumentNav):
         if isinstance(relation[0], ct.SelectorNull):  # pragma: no cover
             return found
 
-        if relation[0].rel_type == REL_PARENT:
-            parent = self.get_parent(el, no_iframe=self.iframe_restrict)
-            while not found and parent:
-                found = self.match_selectors(parent, relation)
-                parent = self.get_parent(parent, no_iframe=self.iframe_restrict)
-        elif relation[0].rel_type == REL_CLOSE_PARENT:
-            parent = self.get_parent(el, no_iframe=self.iframe_restrict)
-            if parent:
-                found = self.match_selectors(parent, relation)
-        elif relation[0].rel_type == REL_SIBLING:
-            sibling = self.get_previous(el)
-            while not found and sibling:
-                found = self.match_selectors(sibling, relation)
-                sibling = self.get_previous(sibling)
-        elif relation[0].rel_type == REL_CLOSE_SIBLING:
+        rel_type = relation[0].rel_type
+        if rel_type == REL_PARENT:
+            restrict = self.iframe_restrict
+            found = self.match_relation_chain(
+                self.get_parent(el, no_iframe=restrict),
+                relation,
+                rel_type,
+                lambda parent: self.get_parent(parent, no_iframe=restrict)
+            )
+        elif rel_type == REL_CLOSE_PARENT:
+            found = self.match_relation_chain(self.get_parent(el, no_iframe=self.iframe_restrict), relation, rel_type)
+        elif rel_type == REL_SIBLING:
+            found = self.match_relation_chain(self.get_previous(el), relation, rel_type, self.get_previous)
+        elif rel_type == REL_CLOSE_SIBLING:
             sibling = self.get_previous(el)
             if sibling and self.is_tag(sibling):
-                found = self.match_selectors(sibling, relation)
+                found = self.match_relation_chain(sibling, relation, rel_type)
         return found
 
     def match_future_child(self, parent: bs4.Tag, relation: ct.SelectorList, recursive: bool = False) -> bool:
         """Match future child."""
 
-        match = False
-        if recursive:
-            children = self.get_descendants  # type: Callable[..., Iterator[bs4.Tag]]
-        else:
-            children = self.get_children
-        for child in children(parent, no_iframe=self.iframe_restrict):
-            match = self.match_selectors(child, relation)
-            if match:
-                break
-        return match
+        restrict = self.iframe_restrict
+        if not recursive:
+            for child in self.get_children(parent, no_iframe=restrict):
+                if self.match_relation_chain(child, relation, REL_HAS_CLOSE_PARENT):
+                    return True
+            return False
+
+        # Walk the descendants, caching whether each element or anything beneath it matches.
+        # A subtree known not to match is skipped, so nested elements don't search the same
+        # descendants over and over.
+        cache = self.cached_relations
+        rel = id(relation)
+        stack = [(None, self.get_children(parent, no_iframe=restrict))]  # type: list[tuple[Any, Iterator[bs4.Tag]]]
+        while stack:
+            key, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if key is not None:
+                    cache[key] = False
+                continue
+            child_key = (REL_HAS_PARENT, id(child), rel, restrict)
+            cached = cache.get(child_key)
+            if cached is False:
+                continue
+            if cached or self.match_selectors(child, relation):
+                cache[child_key] = True
+                for key, _ in stack:
+                    if key is not None:
+                        cache[key] = True
+                return True
+            stack.append((child_key, self.get_children(child, no_iframe=restrict)))
+        return False
 
     def match_future_relations(self, el: bs4.Tag, relation: ct.SelectorList) -> bool:
         """Match future relationship."""
@@ -812,19 +961,17 @@ class CSSMatch(_DocumentNav):
         if isinstance(relation[0], ct.SelectorNull):  # pragma: no cover
             return found
 
-        if relation[0].rel_type == REL_HAS_PARENT:
+        rel_type = relation[0].rel_type
+        if rel_type == REL_HAS_PARENT:
             found = self.match_future_child(el, relation, True)
-        elif relation[0].rel_type == REL_HAS_CLOSE_PARENT:
+        elif rel_type == REL_HAS_CLOSE_PARENT:
             found = self.match_future_child(el, relation)
-        elif relation[0].rel_type == REL_HAS_SIBLING:
-            sibling = self.get_next(el)
-            while not found and sibling:
-                found = self.match_selectors(sibling, relation)
-                sibling = self.get_next(sibling)
-        elif relation[0].rel_type == REL_HAS_CLOSE_SIBLING:
+        elif rel_type == REL_HAS_SIBLING:
+            found = self.match_relation_chain(self.get_next(el), relation, rel_type, self.get_next)
+        elif rel_type == REL_HAS_CLOSE_SIBLING:
             sibling = self.get_next(el)
             if sibling and self.is_tag(sibling):
-                found = self.match_selectors(sibling, relation)
+                found = self.match_relation_chain(sibling, relation, rel_type)
         return found
 
     def match_relations(self, el: bs4.Tag, relation: ct.SelectorList) -> bool:
@@ -1465,7 +1612,11 @@ class CSSMatch(_DocumentNav):
 
         lim = None if limit < 1 else limit
 
-        for child in self.get_descendants(self.tag):
+        candidates = self.plan_candidates()  # type: Iterable[bs4.Tag] | None
+        if candidates is None:
+            candidates = self.get_descendants(self.tag)
+
+        for child in candidates:
             if self.match(child):
                 yield child
                 if lim is not None:
@@ -1473,6 +1624,56 @@ class CSSMatch(_DocumentNav):
                     if lim < 1:
                         break
 
+    def get_rightmost_keys(self) -> tuple[list[str], list[str], list[str]] | None:
+        """
+        Get the tag names, IDs and classes that a matching tag must have at least one of.
+
+        Every tag that matches a selector has the first ID, the first class, or the tag name
+        of the selector's rightmost compound selector. If some selector has none of these,
+        `None` is returned, as any tag might match.
+        """
+
+        names = []  # type: list[str]
+        ids = []  # type: list[str]
+        classes = []  # type: list[str]
+        for selector in self.selectors:
+            # Null selectors can't match anything.
+            if isinstance(selector, ct.SelectorNull):
+                continue
+            if selector.ids:
+                ids.append(selector.ids[0])
+            elif selector.classes:
+                classes.append(selector.classes[0])
+            elif selector.tag is not None and selector.tag.name not in (None, '*'):
+                names.append(selector.tag.name)
+            else:
+                return None
+        return names, ids, classes
+
+    def plan_candidates(self) -> list[bs4.Tag] | None:
+        """
+        Use the document's element index to find the only tags that could match.
+
+        The tags with the names, IDs or classes from `get_rightmost_keys` are looked up in the index,
+        and still have to be checked against the full selector. If the document has no index, or
+        there are no keys, `None` is returned and every descendant must be checked.
+        """
+
+        if self.index is None:
+            return None
+
+        keys = self.get_rightmost_keys()
+        if keys is None:
+            return None
+
+        names, ids, classes = keys
+        if names and not self.is_xml:
+            # HTML tag names are not case sensitive.
+            wanted = {util.lower(name) for name in names}
+            names = [name for name in self.index.tag_names() if util.lower(name) in wanted]
+
+        return cast('list[bs4.Tag]', self.index.tags_with(self.tag, names, ids, classes))
+
     def closest(self) -> bs4.Tag | None:
         """Match closest ancestor."""
 
@@ -1496,6 +1697,91 @@ class CSSMatch(_DocumentNav):
         return not self.is_doc(el) and self.is_tag(el) and self.match_selectors(el, self.selectors)
 
 
+def select_many(
+    patterns: Mapping[Any, SoupSieve],
+    tag: bs4.Tag,
+    limit: int = 0
+) -> dict[Any, list[bs4.Tag]]:
+    """
+    Select the tags matching each of several compiled patterns, looking at each descendant only once.
+
+    Before a tag is fully matched against a pattern, it is checked for one of the names, IDs or
+    classes from the pattern's rightmost compound selectors.
+    """
+
+    results = {}  # type: dict[Any, list[bs4.Tag]]
+    matchers = []  # type: list[tuple[list[bs4.Tag], CSSMatch, frozenset[str] | None, frozenset[str], frozenset[str]]]
+    for key, pattern in patterns.items():
+        matcher = CSSMatch(pattern.selectors, tag, pattern.namespaces, pattern.flags)
+        found = results[key] = []
+        keys = matcher.get_rightmost_keys()
+        if keys is None:
+            matchers.append((found, matcher, None, frozenset(), frozenset()))
+        else:
+            names, ids, classes = keys
+            if not matcher.is_xml:
+                names = [util.lower(name) for name in names]
+            matchers.append((found, matcher, frozenset(names), frozenset(ids), frozenset(classes)))
+    if not matchers:
+        return results
+
+    nav = matchers[0][1]
+    is_xml = nav.is_xml
+
+    def get_raw_attribute(el: bs4.Tag, name: str) -> Any:
+        """Get an attribute the way `get_attribute_by_name` does, without normalizing the value."""
+
+        if is_xml:
+            return el.attrs.get(name)
+        for k, v in el.attrs.items():
+            if util.lower(k) == name:
+                return v
+        return None
+
+    remaining = len(matchers)
+    for el in nav.get_descendants(tag):
+        name = None  # type: str | None
+        ident = None  # type: Any
+        el_classes = None  # type: Sequence[str] | None
+        for found, matcher, names, ids, classes in matchers:
+            if limit and len(found) >= limit:
+                continue
+            if names is not None:
+                # Check the cheap keys before doing a full match.
+                if names:
+                    if name is None:
+                        name = nav.get_tag(el)
+                    possible = name in names
+                else:
+                    possible = False
+                if not possible and ids:
+                    if ident is None:
+                        ident = get_raw_attribute(el, 'id')
+                    # Values that aren't strings are left for the full match to sort out.
+                    possible = ident in ids if isinstance(ident, str) else ident is not None
+                if not possible and classes:
+                    if el_classes is None:
+                        value = get_raw_attribute(el, 'class')
+                        if value is None:
+                            el_classes = []
+                        elif isinstance(value, str):
+                            el_classes = RE_NOT_WS.findall(value)
+                        elif isinstance(value, list) and all(isinstance(c, str) for c in value):
+                            el_classes = value
+                        else:
+                            el_classes = nav.get_classes(el)
+                    possible = any(c in classes for c in el_classes)
+                if not possible:
+                    continue
+            if matcher.match(el):
+                found.append(el)
+                if limit and len(found) >= limit:
+                    remaining -= 1
+        if limit and not remaining:
+            break
+    return results
+
+
 class SoupSieve(ct.Immutable):
     """Compiled Soup Sieve selector matching object."""
 
@@ -1,13 +1,17 @@
 """CSS selector parser."""
 from __future__ import annotations
 import re
-from functools import lru_cache
+import pickle
+import threading
+import time
+from collections import OrderedDict
 from . import util
 from . import css_match as cm
 from . import css_types as ct
+from .__meta__ import __version__
 from .util import SelectorSyntaxError
 import warnings
-from typing import Match, Any, Iterator, cast
+from typing import Match, Any, Iterator, Mapping, NamedTuple, cast
 
 UNICODE_REPLACEMENT_CHAR = 0xFFFD
 
@@ -190,8 +194,30 @@ FLG_FORGIVE = 0x400
 # Maximum cached patterns to store
 _MAXCACHE = 500
 
+# Version of the format written by `_dump_compiled`
+_COMPILED_FORMAT = 1
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for the compiled pattern cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    compiled: int
+    compile_time: float
+    precompiled: int
+
+
+# Compiled patterns, most recently used last
+_cache = OrderedDict()  # type: OrderedDict[tuple[str, ct.Namespaces | None, ct.CustomSelectors | None, int], cm.SoupSieve]
+# Selectors from `_precompile` and `_load_compiled`, which don't depend on namespaces
+_precompiled = {}  # type: dict[tuple[str, ct.CustomSelectors | None, int], ct.SelectorList]
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0, 'compiled': 0, 'compile_time': 0.0}
+
 
-@lru_cache(maxsize=_MAXCACHE)
 def _cached_css_compile(
     pattern: str,
     namespaces: ct.Namespaces | None,
@@ -200,24 +226,137 @@ def _cached_css_compile(
 ) -> cm.SoupSieve:
     """Cached CSS compile."""
 
-    custom_selectors = process_custom(custom)
-    return cm.SoupSieve(
-        pattern,
-        CSSParser(
+    key = (pattern, namespaces, custom, flags)
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return compiled
+        _cache_stats['misses'] += 1
+        selectors = _precompiled.get((pattern, custom, flags))
+
+    if selectors is None:
+        start = time.perf_counter()
+        selectors = CSSParser(
             pattern,
-            custom=custom_selectors,
+            custom=process_custom(custom),
             flags=flags
-        ).process_selectors(),
-        namespaces,
-        custom,
-        flags
-    )
+        ).process_selectors()
+        elapsed = time.perf_counter() - start
+        with _cache_lock:
+            _cache_stats['compiled'] += 1
+            _cache_stats['compile_time'] += elapsed
+
+    compiled = cm.SoupSieve(pattern, selectors, namespaces, custom, flags)
+    with _cache_lock:
+        _cache[key] = compiled
+        while len(_cache) > _MAXCACHE:
+            _cache.popitem(last=False)
+    return compiled
 
 
 def _purge_cache() -> None:
     """Purge the cache."""
 
-    _cached_css_compile.cache_clear()
+    with _cache_lock:
+        _cache.clear()
+        _precompiled.clear()
+        _cache_stats.update(hits=0, misses=0, compiled=0, compile_time=0.0)
+
+
+def _cache_info() -> CacheInfo:
+    """Get cache statistics."""
+
+    with _cache_lock:
+        return CacheInfo(
+            _cache_stats['hits'],
+            _cache_stats['misses'],
+            _MAXCACHE,
+            len(_cache),
+            _cache_stats['compiled'],
+            _cache_stats['compile_time'],
+            len(_precompiled)
+        )
+
+
+def _set_cache_size(maxsize: int) -> None:
+    """Set the maximum number of compiled patterns to cache."""
+
+    global _MAXCACHE
+
+    if maxsize < 0:
+        raise ValueError("The cache size cannot be negative")
+    with _cache_lock:
+        _MAXCACHE = maxsize
+        while len(_cache) > _MAXCACHE:
+            _cache.popitem(last=False)
+
+
+def _add_precompiled(compiled: cm.SoupSieve) -> None:
+    """Make a compiled pattern's selectors available to `_cached_css_compile`."""
+
+    with _cache_lock:
+        _precompiled[(compiled.pattern, compiled.custom, compiled.flags)] = compiled.selectors
+
+
+def _precompile(
+    patterns: Mapping[str, str],
+    namespaces: ct.Namespaces | None,
+    custom: ct.CustomSelectors | None,
+    flags: int
+) -> dict[str, cm.SoupSieve]:
+    """Compile a named set of patterns."""
+
+    compiled = {}
+    for name, pattern in patterns.items():
+        compiled[name] = _cached_css_compile(pattern, namespaces, custom, flags)
+        _add_precompiled(compiled[name])
+    return compiled
+
+
+def _dump_compiled(compiled: Mapping[str, cm.SoupSieve]) -> bytes:
+    """Serialize a named set of compiled patterns."""
+
+    entries = []
+    for name, sel in compiled.items():
+        if not isinstance(sel, cm.SoupSieve):
+            raise TypeError(f"Expected a compiled 'SoupSieve' for '{name}', but received type {type(sel)}")
+        entries.append((
+            name,
+            sel.pattern,
+            dict(sel.namespaces) if sel.namespaces is not None else None,
+            dict(sel.custom) if sel.custom is not None else None,
+            sel.flags
+        ))
+    # The selectors are pickled separately, so that patterns from a different
+    # version of Soup Sieve can be compiled again without unpickling them.
+    selectors = pickle.dumps([sel.selectors for sel in compiled.values()], pickle.HIGHEST_PROTOCOL)
+    return pickle.dumps((_COMPILED_FORMAT, __version__, entries, selectors), pickle.HIGHEST_PROTOCOL)
+
+
+def _load_compiled(data: bytes) -> dict[str, cm.SoupSieve]:
+    """Load a named set of compiled patterns saved by `_dump_compiled`."""
+
+    try:
+        fmt, version, entries, selectors = pickle.loads(data)
+    except Exception as e:
+        raise ValueError("The data is not a set of compiled patterns") from e
+    if fmt != _COMPILED_FORMAT:
+        raise ValueError(f"Unsupported compiled pattern format {fmt!r}")
+
+    selector_lists = pickle.loads(selectors) if version == __version__ else None
+    compiled = {}
+    for i, (name, pattern, namespaces, custom, flags) in enumerate(entries):
+        ns = ct.Namespaces(namespaces) if namespaces is not None else None
+        cs = ct.CustomSelectors(custom) if custom is not None else None
+        if selector_lists is None:
+            # Saved by a different version, so the pattern must be compiled again.
+            compiled[name] = _cached_css_compile(pattern, ns, cs, flags)
+        else:
+            compiled[name] = cm.SoupSieve(pattern, selector_lists[i], ns, cs, flags)
+        _add_precompiled(compiled[name])
+    return compiled
 
 
 def process_custom(custom: ct.CustomSelectors | None) -> dict[str, str | ct.SelectorList]:
@@ -0,0 +1,249 @@
+# synthetic_feed.py
+import random
+import threading
+from datetime import datetime, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+TIMEZONES = ["America/Los_Angeles", "America/New_York", "UTC"]
+
+TITLE_PREFIXES = ["AI Builders", "Web3 Collective", "Indie Game Devs", "Data Folks", "Founders",
+                  "Women in Tech", "Climate Tech", "Rust", "Ruby", "Design Systems"]
+TITLE_FORMATS = ["{} Happy Hour", "{} Meetup @ GitHub", "{} Demo Night", "{} Hackathon",
+                 "{} Networking Breakfast", "{} Fireside Chat", "{} Webinar", "{} Mixer",
+                 "{} Panel & Reception", "{} Online Workshop"]
+
+FOOD_SENTENCES = ["Pizza and drinks will be provided.", "Light bites and refreshments served throughout.",
+                  "Open bar & snacks!", "Dinner is on us.", "Coffee and breakfast for early arrivals."]
+FILLER_SENTENCES = ["Join us for an evening of talks, demos and conversations with builders from around the Bay.",
+                    "We'll hear from founders about what it takes to ship products people love.",
+                    "Bring your laptop, your questions and your curiosity.",
+                    "Space is limited, so please register early and bring a photo ID.",
+                    "Doors open thirty minutes before the first talk and the venue is wheelchair accessible.",
+                    "Speakers will be announced over the coming weeks, follow us for updates."]
+
+LOCATIONS = ["972 Mission St, San Francisco, CA 94103, USA",
+             "GitHub, 88 Colin P Kelly Jr St, San Francisco, CA 94107, USA",
+             "Cornerstone, 2367 Shattuck Ave., Berkeley, CA 94704, USA",
+             "Guildhouse, 420 First St, San Jose, CA 95113, USA",
+             "Plug and Play Tech Center, 440 N Wolfe Rd, Sunnyvale, CA 94085, USA",
+             "https://lu.ma/e/evt-hidden"]
+
+
+def fold_line(line: str) -> str:
+    """Folds a content line at 75 octets as required by RFC 5545."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Don't split a multi-byte UTF-8 sequence
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # Continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def escape_text(value: str) -> str:
+    """Escapes a TEXT property value."""
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def generate_event(index: int, seed: int = 42, base_url: str = "https://lu.ma",
+                   start: Optional[datetime] = None, description_sentences: int = 12) -> Dict:
+    """
+    Generates one synthetic Luma event. The same (index, seed) always yields the same event.
+
+    Returns:
+        Dict: The event's slug, summary, description, location, tzid, start, end and url.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    if start is None:
+        start = datetime(2025, 3, 15, 9, 0)
+    title = rng.choice(TITLE_FORMATS).format(rng.choice(TITLE_PREFIXES))
+    slug = f"evt-{index:06d}"
+    url = f"{base_url}/{slug}"
+    sentences = [rng.choice(FILLER_SENTENCES) for _ in range(description_sentences)]
+    if rng.random() < 0.5:
+        sentences.insert(rng.randrange(len(sentences) + 1), rng.choice(FOOD_SENTENCES))
+    body = "\n".join(sentences)
+    location = rng.choice(LOCATIONS)
+    description = (f"Get up-to-date information at: {url}\n\nAddress:\n{location}\n\n{body}\n\n"
+                   f"Hosted by {rng.choice(TITLE_PREFIXES)} SF")
+    event_start = start + timedelta(hours=index * 3 % (24 * 14), minutes=rng.choice([0, 15, 30, 45]))
+    return {
+        "slug": slug,
+        "summary": f"{title} #{index}",
+        "description": description,
+        "location": location,
+        "tzid": rng.choice(TIMEZONES),
+        "start": event_start,
+        "end": event_start + timedelta(hours=rng.choice([1, 2, 3])),
+        "url": url,
+    }
+
+
+def generate_ics(n: int, seed: int = 42, base_url: str = "https://lu.ma", **kwargs) -> str:
+    """
+    Generates a Luma-style iCal feed with `n` events.
+
+    Lines are folded at 75 octets, descriptions are long and escaped, and
+    DTSTART/DTEND carry TZID parameters.
+    """
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//nearfood//synthetic feed//EN", "CALSCALE:GREGORIAN"]
+    for i in range(n):
+        event = generate_event(i, seed, base_url, **kwargs)
+        lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:{event['slug']}@synthetic.lu.ma",
+            f"DTSTAMP:{event['start']:%Y%m%dT%H%M%S}Z",
+            f"DTSTART;TZID={event['tzid']}:{event['start']:%Y%m%dT%H%M%S}",
+            f"DTEND;TZID={event['tzid']}:{event['end']:%Y%m%dT%H%M%S}",
+            f"SUMMARY:{escape_text(event['summary'])}",
+            f"DESCRIPTION:{escape_text(event['description'])}",
+            f"LOCATION:{escape_text(event['location'])}",
+            f"URL:{event['url']}",
+            "END:VEVENT",
+        ])
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(fold_line(line) for line in lines) + "\r\n"
+
+
+def generate_event_page(event: Dict) -> str:
+    """Generates a fake lu.ma event page for an event from generate_event()."""
+    paragraphs = "\n".join(
+        f'<p class="jsx-1428039309 text-block">{escape(line)}</p>'
+        for line in event["description"].split("\n") if line
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{escape(event['summary'])} · Luma</title>
+<style>.page{{display:flex}}.event-title{{font-weight:700}}</style>
+<script type="application/ld+json">{{"@type": "Event", "name": "{escape(event['summary'])}"}}</script>
+<script>window.__NEXT_DATA__ = {{"props": {{"pageProps": {{"slug": "{event['slug']}"}}}}}};</script>
+</head>
+<body>
+<div id="__next" class="page">
+  <div class="jsx-3833208418 event-page-wrapper">
+    <div class="jsx-3833208418 event-header">
+      <h1 class="jsx-1087356963 event-title title">{escape(event['summary'])}</h1>
+      <div class="jsx-2770033521 event-meta">
+        <div class="jsx-2770033521 event-date">{event['start']:%A, %B %d} · {event['start']:%I:%M %p} - {event['end']:%I:%M %p} ({event['tzid']})</div>
+        <div class="jsx-2770033521 event-location">{escape(event['location'])}</div>
+      </div>
+    </div>
+    <div class="jsx-4068354093 content-card">
+      <div class="jsx-4068354093 card-title">About Event</div>
+      <div id="event-description" class="jsx-4068354093 event-description">
+{paragraphs}
+      </div>
+    </div>
+    <div class="jsx-1746249264 hosts"><span class="host-name">{escape(event['description'].rsplit('Hosted by ', 1)[-1])}</span></div>
+  </div>
+</div>
+</body>
+</html>
+"""
+
+
+class SyntheticFeedServer:
+    """
+    A local HTTP stub serving a synthetic feed and its event pages.
+
+    GET /ics returns the feed and GET /<slug> returns that event's page.
+    Pages are generated on demand, so large feeds don't hold every page in
+    memory. Use it as a context manager:
+
+        with SyntheticFeedServer(1000) as server:
+            requests.get(server.ical_url)
+    """
+
+    def __init__(self, n: int, seed: int = 42, host: str = "127.0.0.1", port: int = 0):
+        self.n = n
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+        self.ics = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.httpd.server_address[1]}"
+
+    @property
+    def ical_url(self) -> str:
+        return f"{self.base_url}/ics"
+
+    def event_urls(self) -> List[str]:
+        return [f"{self.base_url}/evt-{i:06d}" for i in range(self.n)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.lstrip("/")
+                if path == "ics":
+                    body, content_type = server.ics.encode("utf-8"), "text/calendar; charset=utf-8"
+                elif path.startswith("evt-") and path[4:].isdigit() and int(path[4:]) < server.n:
+                    event = generate_event(int(path[4:]), server.seed, server.base_url)
+                    body, content_type = generate_event_page(event).encode("utf-8"), "text/html; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "SyntheticFeedServer":
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.ics = generate_ics(self.n, self.seed, self.base_url)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self) -> "SyntheticFeedServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Serve a synthetic Luma feed and event pages locally.")
+    parser.add_argument("-n", type=int, default=100, help="Number of events")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with SyntheticFeedServer(args.n, seed=args.seed, port=args.port) as server:
+        print(f"Serving {args.n} events at {server.ical_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
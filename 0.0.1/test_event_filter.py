@@ -0,0 +1,38 @@
+"""Tests of the location and time prefilter."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from event_filter import extract_city, prefilter_events
+
+
+class TestEventFilter:
+    @pytest.mark.parametrize(
+        "location, city",
+        [
+            ("1 Main St, San Francisco, CA 94107", "san francisco, ca"),
+            ("1 Main St, San Francisco, CA 94107, US", "san francisco, ca"),
+            ("1 Main St, San Francisco, CA 94107, USA", "san francisco, ca"),
+            ("1 Main St, San Francisco, CA, United States", "san francisco, ca"),
+            ("San Francisco, California", "san francisco, ca"),
+            ("Palo Alto, US", None),
+            ("https://lu.ma/event/abc", None),
+        ],
+    )
+    def test_extract_city(self, location, city):
+        assert extract_city(location) == city
+
+    def test_country_suffix_does_not_drop_nearby_events(self):
+        events = [
+            {
+                "SUMMARY": "Hack night %s" % suffix,
+                "DTSTART": "20250315T180000Z",
+                "DTEND": "20250315T210000Z",
+                "LOCATION": "1 Main St\\, San Francisco\\, CA 94107\\, %s" % suffix,
+            }
+            for suffix in ("US", "USA")
+        ]
+        now = datetime(2025, 3, 15, 12, tzinfo=timezone.utc)
+        kept = prefilter_events(events, now=now, keep_unlocated=False)
+        assert [event["SUMMARY"] for event in kept] == ["Hack night US", "Hack night USA"]
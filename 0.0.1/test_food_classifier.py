@@ -0,0 +1,53 @@
+"""Tests of the local free food pre-classifier."""
+
+import pytest
+
+from food_classifier import (
+    NEGATIVE_KEYWORDS,
+    POSITIVE_KEYWORDS,
+    REMOTE_TERMS,
+    FoodClassifier,
+)
+
+
+class TestFoodClassifier:
+    @pytest.mark.parametrize("classifier", [FoodClassifier(), FoodClassifier.load()])
+    @pytest.mark.parametrize(
+        "summary, description",
+        [
+            ("Online AI talk", "Join us online"),
+            ("online webinar", ""),
+            ("Pizza Webinar", "Free food! Pizza, drinks, snacks and lunch, on Zoom."),
+            ("Virtual happy hour", "Open bar, bites and refreshments. Livestream only."),
+        ],
+    )
+    def test_remote_events_are_never_accepted_locally(self, classifier, summary, description):
+        decision, _ = classifier.classify(summary, description)
+        assert decision is not True
+
+    def test_shipped_model_keeps_lexicon_signs(self):
+        classifier = FoodClassifier.load()
+        for term in POSITIVE_KEYWORDS:
+            assert classifier.weights[term] >= 0, term
+        for term in NEGATIVE_KEYWORDS:
+            assert classifier.weights[term] <= 0, term
+
+    def test_shipped_model_rejects_webinars(self):
+        decision, _ = FoodClassifier.load().classify("online webinar", "")
+        assert decision is False
+
+    def test_food_words_are_not_evidence_against_food(self):
+        decision, _ = FoodClassifier.load().classify("Wine reception", "A reception with beer")
+        assert decision is not False
+
+    def test_training_cannot_flip_a_term(self):
+        # Every remote event here has food, but that can't make "online"
+        # a sign of free food.
+        examples = [("Online meetup %d" % i, "Online, with pizza.", True) for i in range(20)]
+        examples += [("Hackathon %d" % i, "No food provided.", False) for i in range(20)]
+        classifier = FoodClassifier()
+        classifier.train(examples)
+        assert classifier.weights["online"] <= 0
+        assert classifier.weights["hackathon"] >= 0
+        for term in REMOTE_TERMS:
+            assert classifier.classify("Online pizza party", term)[0] is not True
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import os
@@ -10,6 +10,7 @@ from datetime import datetime
 from ical_processor import process_ical_data, get_event_summaries
 from xtrace_client import upload_data_to_xtrace, query_xtrace
 from inference_provider import get_inference_provider
+from instrumentation import METRICS
 
 app = FastAPI(title="Food Event Chatbot API")
 
@@ -160,6 +161,11 @@ async def status():
     
     return result
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-stage timings and counters in the Prometheus text format"""
+    return PlainTextResponse(METRICS.to_prometheus(), media_type="text/plain; version=0.0.4")
+
 # Error handling
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
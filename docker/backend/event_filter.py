@@ -0,0 +1,305 @@
+# event_filter.py
+import json
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+# Approximate centroids for the cities that show up in the Bay Area Luma feed.
+# Keys are lowercase "city, state" with the two-letter state code.
+CITY_COORDINATES = {
+    "san francisco, ca": (37.7749, -122.4194),
+    "south san francisco, ca": (37.6547, -122.4077),
+    "daly city, ca": (37.6879, -122.4702),
+    "oakland, ca": (37.8044, -122.2712),
+    "berkeley, ca": (37.8715, -122.2730),
+    "emeryville, ca": (37.8313, -122.2852),
+    "alameda, ca": (37.7652, -122.2416),
+    "richmond, ca": (37.9358, -122.3477),
+    "walnut creek, ca": (37.9101, -122.0652),
+    "hayward, ca": (37.6688, -122.0808),
+    "fremont, ca": (37.5485, -121.9886),
+    "sausalito, ca": (37.8591, -122.4853),
+    "san mateo, ca": (37.5630, -122.3255),
+    "foster city, ca": (37.5585, -122.2711),
+    "burlingame, ca": (37.5779, -122.3481),
+    "redwood city, ca": (37.4852, -122.2364),
+    "menlo park, ca": (37.4530, -122.1817),
+    "palo alto, ca": (37.4419, -122.1430),
+    "stanford, ca": (37.4275, -122.1697),
+    "mountain view, ca": (37.3861, -122.0839),
+    "sunnyvale, ca": (37.3688, -122.0363),
+    "santa clara, ca": (37.3541, -121.9552),
+    "cupertino, ca": (37.3230, -122.0322),
+    "san jose, ca": (37.3382, -121.8863),
+    "milpitas, ca": (37.4323, -121.8996),
+}
+
+# Full state names as they appear in Luma descriptions ("San Francisco, California").
+STATE_ABBREVIATIONS = {
+    "california": "ca",
+}
+
+# Trailing country names that come after the state ("..., CA 94103, USA").
+COUNTRY_NAMES = {"us", "usa", "united states"}
+
+# Default configuration for the prefilter stage
+DEFAULT_WINDOW_HOURS = 7 * 24
+DEFAULT_CENTER = CITY_COORDINATES["san francisco, ca"]
+DEFAULT_RADIUS_KM = 25.0
+
+EARTH_RADIUS_KM = 6371.0
+
+# Placeholder LOCATION values that mean "no address given"
+UNKNOWN_LOCATIONS = {"", "no location"}
+
+_STATE_ZIP_RE = re.compile(r"^([A-Za-z]{2})(?:\s+\d{5}(?:-\d{4})?)?$")
+
+
+def parse_event_datetime(value: Optional[str], tzid: Optional[str] = None) -> Optional[datetime]:
+    """
+    Parses an iCal or ISO 8601 date-time into an aware datetime.
+
+    Args:
+        value (str): A value such as "20250315T160000Z", "20250315T160000",
+            "20250315" or "2025-03-15T16:00:00+00:00".
+        tzid (str): The TZID parameter of the property, if any. Floating times
+            without a TZID are treated as UTC.
+
+    Returns:
+        datetime: The parsed datetime, or None if the value can't be parsed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    parsed = None
+    for fmt in ("%Y%m%dT%H%M%SZ", "%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+            if fmt.endswith("Z"):
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            break
+        except ValueError:
+            continue
+    if parsed is None:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        tz = timezone.utc
+        if tzid and ZoneInfo is not None:
+            try:
+                tz = ZoneInfo(tzid)
+            except Exception:
+                pass
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed
+
+
+def get_event_property(event: Dict, name: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    Looks up an iCal property on a parsed event, including parameterized keys.
+
+    The lightweight parser keeps keys like "DTSTART;TZID=America/Los_Angeles"
+    verbatim, so a plain dict lookup isn't enough.
+
+    Returns:
+        Tuple[str, Dict[str, str]]: The value and its parameters, or (None, {}).
+    """
+    if name in event:
+        return event[name], {}
+    prefix = name + ";"
+    for key, value in event.items():
+        if key.startswith(prefix):
+            params = {}
+            for param in key[len(prefix):].split(";"):
+                if "=" in param:
+                    param_name, param_value = param.split("=", 1)
+                    params[param_name.upper()] = param_value
+            return value, params
+    return None, {}
+
+
+def get_event_start(event: Dict) -> Optional[datetime]:
+    """Returns the event's DTSTART as an aware datetime, if present."""
+    value, params = get_event_property(event, "DTSTART")
+    return parse_event_datetime(value, params.get("TZID"))
+
+
+def get_event_end(event: Dict) -> Optional[datetime]:
+    """Returns the event's DTEND as an aware datetime, if present."""
+    value, params = get_event_property(event, "DTEND")
+    return parse_event_datetime(value, params.get("TZID"))
+
+
+def normalize_location(location: Optional[str]) -> str:
+    """Undoes iCal escaping and collapses whitespace in a LOCATION value."""
+    if not location:
+        return ""
+    location = location.replace("\\n", ", ").replace("\\N", ", ")
+    location = location.replace("\\,", ",").replace("\\;", ";")
+    return " ".join(location.split())
+
+
+def extract_city(location: Optional[str]) -> Optional[str]:
+    """
+    Extracts a normalized "city, state" key from a Luma location string.
+
+    Handles addresses like "972 Mission St, San Francisco, CA 94103, USA" and
+    "San Francisco, California". Online and hidden locations (Luma uses a
+    lu.ma URL for those) return None.
+    """
+    location = normalize_location(location)
+    if not location or location.startswith(("http://", "https://")):
+        return None
+    parts = [part.strip() for part in location.split(",") if part.strip()]
+    if parts and parts[-1].lower() in COUNTRY_NAMES:
+        # "US" would otherwise look like a state code.
+        parts.pop()
+    for i in range(len(parts) - 1, 0, -1):
+        state = STATE_ABBREVIATIONS.get(parts[i].lower())
+        if state is None:
+            match = _STATE_ZIP_RE.match(parts[i])
+            if not match or match.group(1).lower() not in STATE_ABBREVIATIONS.values():
+                continue
+            state = match.group(1).lower()
+        return f"{parts[i - 1].lower()}, {state}"
+    return None
+
+
+class GeocodeCache:
+    """
+    A cheap local geocoder for Luma location strings.
+
+    Locations are reduced to a "city, state" key and resolved against
+    CITY_COORDINATES. Results, including misses, are memoized per location
+    string and can be persisted as JSON so later runs skip the work entirely.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Optional[List[float]]]] = None):
+        self.entries = dict(entries or {})
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_json(cls, data: str) -> "GeocodeCache":
+        """Creates a cache from a JSON string produced by to_json()."""
+        try:
+            return cls(json.loads(data))
+        except (TypeError, ValueError):
+            return cls()
+
+    def to_json(self) -> str:
+        """Serializes the cache entries to a JSON string."""
+        return json.dumps(self.entries)
+
+    def lookup(self, location: Optional[str]) -> Optional[Tuple[float, float]]:
+        """
+        Resolves a location string to (latitude, longitude).
+
+        Returns:
+            Tuple[float, float]: The coordinates, or None if the location is
+                unknown, online or hidden.
+        """
+        key = normalize_location(location).lower()
+        if key in self.entries:
+            self.hits += 1
+            coordinates = self.entries[key]
+            return tuple(coordinates) if coordinates else None
+        self.misses += 1
+        city = extract_city(key)
+        coordinates = CITY_COORDINATES.get(city) if city else None
+        self.entries[key] = list(coordinates) if coordinates else None
+        return coordinates
+
+
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Returns the great-circle distance between two (lat, lon) points in km."""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def prefilter_events(
+    events: List[Dict],
+    now: Optional[datetime] = None,
+    window_hours: Optional[float] = DEFAULT_WINDOW_HOURS,
+    center: Optional[Tuple[float, float]] = DEFAULT_CENTER,
+    radius_km: Optional[float] = DEFAULT_RADIUS_KM,
+    neighborhoods: Optional[List[str]] = None,
+    keep_unlocated: bool = True,
+    geocode_cache: Optional[GeocodeCache] = None,
+) -> List[Dict]:
+    """
+    Keeps only upcoming, nearby events, sorted by start time.
+
+    This runs before any LLM call so that past and far-away events never cost
+    inference, and so that MAX_EVENTS_TO_PROCESS picks the soonest events
+    rather than the first ones in file order.
+
+    Args:
+        events (List[Dict]): Parsed events, as returned by parse_ical_data.
+        now (datetime): The reference time. Defaults to the current UTC time.
+        window_hours (float): Keep events that haven't ended yet and start
+            within this many hours of `now`. None disables the time window.
+        center (Tuple[float, float]): The (lat, lon) to measure distance from.
+        radius_km (float): Keep events within this distance of `center`.
+            None disables the radius check.
+        neighborhoods (List[str]): Case-insensitive substrings (neighborhoods,
+            cities or ZIP codes). An event whose location contains any of them
+            is kept even when it's outside the radius.
+        keep_unlocated (bool): Whether to keep online events and events with a
+            hidden address. Luma hides the address of many events behind a
+            lu.ma link, so these are kept by default. Addresses that can't be
+            geocoded are treated as out of range.
+        geocode_cache (GeocodeCache): The cache to resolve locations with.
+
+    Returns:
+        List[Dict]: The events that passed the filter, soonest first.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    if geocode_cache is None:
+        geocode_cache = GeocodeCache()
+    allowlist = [n.lower() for n in neighborhoods or []]
+    window_end = now + timedelta(hours=window_hours) if window_hours is not None else None
+
+    kept = []
+    for event in events:
+        start = get_event_start(event)
+        if window_end is not None:
+            if start is None or start > window_end:
+                continue
+            end = get_event_end(event) or start
+            if end < now:
+                continue
+
+        location, _ = get_event_property(event, "LOCATION")
+        location = normalize_location(location)
+        if location.lower() in UNKNOWN_LOCATIONS or location.startswith(("http://", "https://")):
+            if not keep_unlocated and (allowlist or radius_km is not None):
+                continue
+        elif allowlist and any(n in location.lower() for n in allowlist):
+            pass
+        elif radius_km is not None and center is not None:
+            coordinates = geocode_cache.lookup(location)
+            if coordinates is None or haversine_km(center, coordinates) > radius_km:
+                continue
+        elif allowlist:
+            continue
+
+        kept.append((start, event))
+
+    far_future = datetime.max.replace(tzinfo=timezone.utc)
+    kept.sort(key=lambda item: item[0] or far_future)
+    return [event for _, event in kept]
@@ -0,0 +1,274 @@
+# food_classifier.py
+import hashlib
+import json
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Weighted lexicon of phrases that suggest (positive) or rule out (negative)
+# free food. These double as the features of the trained linear model.
+POSITIVE_KEYWORDS = {
+    "free food": 3.0,
+    "food": 2.0,
+    "pizza": 2.5,
+    "snacks": 2.0,
+    "bites": 2.0,
+    "refreshments": 2.5,
+    "catered": 2.5,
+    "lunch": 2.0,
+    "dinner": 2.0,
+    "breakfast": 2.0,
+    "brunch": 1.5,
+    "drinks": 1.5,
+    "open bar": 2.5,
+    "beer": 1.0,
+    "cocktails": 1.0,
+    "coffee": 1.0,
+    "happy hour": 1.5,
+    "reception": 1.5,
+    "mixer": 1.0,
+    "afterparty": 1.5,
+    "after party": 1.5,
+    "hackathon": 1.5,
+    "hack night": 1.5,
+    "meetup": 0.5,
+    "networking": 0.5,
+    "sponsored": 0.5,
+}
+
+NEGATIVE_KEYWORDS = {
+    "webinar": -3.0,
+    "online": -1.5,
+    "virtual": -2.0,
+    "zoom": -2.0,
+    "livestream": -2.0,
+    "recital": -1.5,
+    "rally": -1.5,
+    "fireside chat": -0.5,
+    "no sponsors": -2.0,
+}
+
+# Events mentioning any of these may not be in person, so they are never
+# accepted without the LLM having a look, however much food they mention.
+REMOTE_TERMS = frozenset(["webinar", "online", "virtual", "zoom", "livestream"])
+
+DEFAULT_BIAS = -1.0
+
+# Events scoring at or above HIGH_CONFIDENCE are accepted and at or below
+# LOW_CONFIDENCE rejected without an LLM call; the rest go to the LLM.
+HIGH_CONFIDENCE = 0.9
+LOW_CONFIDENCE = 0.1
+
+MODEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "food_classifier_model.json")
+LABELS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lu_ma_events_labels.json")
+
+# One in EVALUATION_SPLIT labeled events is kept out of training, so the
+# shipped model can be scored on events it has never seen.
+EVALUATION_SPLIT = 5
+
+# One pass over the text finds every term; the lookahead lets overlapping
+# terms like "free food" and "food" both match.
+_TERMS_RE = re.compile(
+    r"(?=\b(" + "|".join(
+        re.escape(term) for term in sorted(list(POSITIVE_KEYWORDS) + list(NEGATIVE_KEYWORDS), key=len, reverse=True)
+    ) + r")\b)"
+)
+
+
+def extract_features(summary: Optional[str], description: Optional[str]) -> List[str]:
+    """Returns the lexicon terms present in an event's name and description."""
+    text = f"{summary or ''}\n{description or ''}".lower()
+    return list(dict.fromkeys(_TERMS_RE.findall(text)))
+
+
+class FoodClassifier:
+    """
+    A linear model over lexicon features that screens events locally.
+
+    Without a trained model it uses the hand-tuned lexicon weights. A model
+    trained with train() replaces those weights and is stored as JSON.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, bias: float = DEFAULT_BIAS,
+                 low: float = LOW_CONFIDENCE, high: float = HIGH_CONFIDENCE):
+        if weights is None:
+            weights = dict(POSITIVE_KEYWORDS)
+            weights.update(NEGATIVE_KEYWORDS)
+        self.weights = weights
+        self.bias = bias
+        self.low = low
+        self.high = high
+
+    @classmethod
+    def load(cls, path: str = MODEL_FILE) -> "FoodClassifier":
+        """Loads a trained model, falling back to the lexicon weights if there is none."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return cls(weights=data["weights"], bias=data["bias"])
+        except (OSError, ValueError, KeyError):
+            return cls()
+
+    def save(self, path: str = MODEL_FILE):
+        """Writes the model weights to a JSON data file."""
+        with open(path, "w") as f:
+            weights = {term: round(weight, 4) for term, weight in self.weights.items()}
+            json.dump({"bias": round(self.bias, 4), "weights": weights}, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    def probability(self, summary: Optional[str], description: Optional[str]) -> float:
+        """Returns the estimated probability that the event has free food."""
+        score = self.bias + sum(self.weights.get(term, 0.0) for term in extract_features(summary, description))
+        return 1.0 / (1.0 + math.exp(-score))
+
+    def classify(self, summary: Optional[str], description: Optional[str]) -> Tuple[Optional[bool], float]:
+        """
+        Screens an event without calling an LLM.
+
+        Returns:
+            Tuple[Optional[bool], float]: True or False when the model is
+                confident, None when the event should be sent to the LLM,
+                along with the probability.
+        """
+        p = self.probability(summary, description)
+        if p >= self.high:
+            if REMOTE_TERMS.intersection(extract_features(summary, description)):
+                return None, p
+            return True, p
+        if p <= self.low:
+            return False, p
+        return None, p
+
+    def train(self, examples: List[Tuple[str, str, bool]], epochs: int = 200, learning_rate: float = 0.1,
+              l2: float = 0.01):
+        """
+        Fits the weights with logistic regression, starting from the lexicon.
+
+        The weights are regularized towards the lexicon weights rather than
+        towards zero, and a term never changes sign: a handful of labels
+        shouldn't be able to turn "online" into a sign of free food.
+
+        Args:
+            examples (List[Tuple[str, str, bool]]): (summary, description, label) triples.
+        """
+        featurized = [(extract_features(summary, description), label) for summary, description, label in examples]
+        for _ in range(epochs):
+            for features, label in featurized:
+                score = self.bias + sum(self.weights.get(term, 0.0) for term in features)
+                error = (1.0 if label else 0.0) - 1.0 / (1.0 + math.exp(-score))
+                self.bias += learning_rate * error
+                for term in features:
+                    prior = POSITIVE_KEYWORDS.get(term, NEGATIVE_KEYWORDS.get(term, 0.0))
+                    weight = self.weights.get(term, prior)
+                    weight += learning_rate * (error - l2 * (weight - prior))
+                    if term in POSITIVE_KEYWORDS:
+                        weight = max(weight, 0.0)
+                    elif term in NEGATIVE_KEYWORDS:
+                        weight = min(weight, 0.0)
+                    self.weights[term] = weight
+
+
+def load_labeled_examples(dataset, labels_path: str = LABELS_FILE) -> List[Tuple[str, str, bool]]:
+    """Joins lu_ma_events rows with the hand-labeled subset by event summary."""
+    with open(labels_path, "r") as f:
+        labels = {item["summary"]: item["free_food"] for item in json.load(f)}
+    return [
+        (row["summary"], row["description"], labels[row["summary"]])
+        for row in dataset
+        if row["summary"] in labels
+    ]
+
+
+def is_evaluation_event(summary: str) -> bool:
+    """
+    Returns whether a labeled event belongs to the evaluation split.
+
+    The split is decided by a hash of the event summary, so it doesn't depend
+    on the order of the dataset or the labels file.
+    """
+    return int(hashlib.sha1(summary.encode("utf-8")).hexdigest(), 16) % EVALUATION_SPLIT == 0
+
+
+def evaluate(classifier: FoodClassifier, examples: List[Tuple[str, str, bool]]) -> Dict[str, float]:
+    """
+    Reports how the classifier routes labeled events.
+
+    Precision and recall only count events decided locally; "coverage" is the
+    fraction of events that skip the LLM screening call.
+    """
+    return _routing_metrics([
+        (classifier.classify(summary, description)[0], label) for summary, description, label in examples
+    ])
+
+
+def cross_validate(examples: List[Tuple[str, str, bool]], folds: int = 5, **train_args) -> Dict[str, float]:
+    """
+    Estimates how a trained classifier does on events it wasn't trained on.
+
+    Each event is held out once: a fresh classifier is trained on the other
+    folds and routes the held-out fold. The result has the same keys as
+    evaluate(), computed over all the held-out decisions.
+    """
+    outcomes = []
+    for fold in range(folds):
+        classifier = FoodClassifier()
+        classifier.train([example for i, example in enumerate(examples) if i % folds != fold], **train_args)
+        outcomes.extend(
+            (classifier.classify(summary, description)[0], label)
+            for i, (summary, description, label) in enumerate(examples)
+            if i % folds == fold
+        )
+    return _routing_metrics(outcomes)
+
+
+def _routing_metrics(outcomes: List[Tuple[Optional[bool], bool]]) -> Dict[str, float]:
+    """Summarizes (decision, label) pairs, where a None decision went to the LLM."""
+    tp = fp = fn = tn = ambiguous = 0
+    for decision, label in outcomes:
+        if decision is None:
+            ambiguous += 1
+        elif decision and label:
+            tp += 1
+        elif decision:
+            fp += 1
+        elif label:
+            fn += 1
+        else:
+            tn += 1
+    decided = tp + fp + fn + tn
+    return {
+        "events": len(outcomes),
+        "decided_locally": decided,
+        "sent_to_llm": ambiguous,
+        "coverage": decided / len(outcomes) if outcomes else 0.0,
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "accuracy": (tp + tn) / decided if decided else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import datasets
+
+    parser = argparse.ArgumentParser(description="Evaluate or train the free food pre-classifier on lu_ma_events.")
+    parser.add_argument("--dataset", default="lu_ma_events")
+    parser.add_argument("--train", action="store_true", help="Retrain the model and write it to " + MODEL_FILE)
+
+    parser.add_argument("--folds", type=int, default=5)
+    args = parser.parse_args()
+
+    examples = load_labeled_examples(datasets.load_from_disk(args.dataset))
+    training = [example for example in examples if not is_evaluation_event(example[0])]
+    evaluation = [example for example in examples if is_evaluation_event(example[0])]
+    # Neither of these counts events the model being scored was trained on.
+    print("Cross-validation over the %d training events (%d folds):" % (len(training), args.folds))
+    print(json.dumps(cross_validate(training, args.folds), indent=2))
+    classifier = FoodClassifier() if args.train else FoodClassifier.load()
+    if args.train:
+        classifier.train(training)
+        classifier.save()
+    print("Evaluation split (%d events):" % len(evaluation))
+    print(json.dumps(evaluate(classifier, evaluation), indent=2))
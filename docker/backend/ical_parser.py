@@ -7,9 +7,21 @@ from typing import List, Dict, Any, Optional, Union
 import icalendar
 from datetime import datetime
 
+from event_filter import prefilter_events, GeocodeCache
+from food_classifier import FoodClassifier
+from instrumentation import METRICS, BYTES_BUCKETS, estimate_tokens
+
 # Maximum number of events to process
 MAX_EVENTS_TO_PROCESS = 15
 
+# Prefilter configuration, applied before any LLM call
+PREFILTER_WINDOW_HOURS = 7 * 24  # Only events starting within this many hours
+PREFILTER_CENTER = (37.7749, -122.4194)  # San Francisco
+PREFILTER_RADIUS_KM = 25.0  # Only events within this distance of the center
+PREFILTER_NEIGHBORHOODS = []  # Location substrings (e.g. "Berkeley", "94107") to always keep
+GEOCODE_CACHE_FILENAME = "geocode_cache.json"
+RUN_REPORT_FILENAME = "run_report.json"
+
 def parse_ical_data(ical_data: str) -> List[Dict[str, Any]]:
     """Parse iCal data using icalendar library"""
     try:
@@ -37,8 +49,11 @@ def fetch_url(url: str) -> str:
     try:
         response = requests.get(url, timeout=30)
         response.raise_for_status()
+        METRICS.inc("bytes_fetched", len(response.content))
+        METRICS.observe("response_bytes", len(response.content), buckets=BYTES_BUCKETS)
         return response.text
     except requests.exceptions.RequestException as e:
+        METRICS.inc("fetch_errors")
         raise Exception(f"Error fetching URL: {str(e)}")
 
 def extract_text_from_html(html: str) -> str:
@@ -59,6 +74,15 @@ def extract_text_from_html(html: str) -> str:
     
     return text
 
+def get_completion(inference_provider: Any, prompt: str, stage: str, event: Optional[str] = None) -> str:
+    """Get a completion, recording calls, estimated tokens and latency for the stage"""
+    METRICS.inc("llm_calls", event=event, stage=stage)
+    METRICS.inc("llm_tokens_in", estimate_tokens(prompt), event=event, stage=stage)
+    with METRICS.timer(stage, event=event):
+        response = inference_provider.get_completion(prompt)
+    METRICS.inc("llm_tokens_out", estimate_tokens(response), event=event, stage=stage)
+    return response
+
 def get_event_summaries(summary_path: str) -> List[Dict[str, Any]]:
     """Read event summaries from file"""
     if not os.path.exists(summary_path):
@@ -79,18 +103,49 @@ def process_ical_data(
 ) -> Dict[str, Any]:
     """Process iCal data, analyze events, and save results"""
     
+    METRICS.reset()
+
     # Fetch and save iCal data
     try:
-        ical_data = fetch_url(ical_url)
+        with METRICS.timer("fetch_ical"):
+            ical_data = fetch_url(ical_url)
         
         # Save raw iCal data
         with open(ical_data_path, 'w') as f:
             f.write(ical_data)
         
         # Parse iCal data
-        events = parse_ical_data(ical_data)
+        with METRICS.timer("parse_ical"):
+            events = parse_ical_data(ical_data)
         print(f"Parsed {len(events)} events from iCal data")
+        METRICS.inc("events_parsed", len(events))
+
+        # Drop past and far-away events before spending inference on them
+        geocode_cache_path = os.path.join(os.path.dirname(ical_data_path), GEOCODE_CACHE_FILENAME)
+        geocode_cache = GeocodeCache()
+        if os.path.exists(geocode_cache_path):
+            with open(geocode_cache_path, 'r') as f:
+                geocode_cache = GeocodeCache.from_json(f.read())
+
+        with METRICS.timer("prefilter"):
+            events = prefilter_events(
+                events,
+                window_hours=PREFILTER_WINDOW_HOURS,
+                center=PREFILTER_CENTER,
+                radius_km=PREFILTER_RADIUS_KM,
+                neighborhoods=PREFILTER_NEIGHBORHOODS,
+                geocode_cache=geocode_cache,
+            )
+        print(f"{len(events)} events left after prefiltering")
+        METRICS.inc("events_prefiltered", len(events))
+        METRICS.inc("cache_hits", geocode_cache.hits, cache="geocode")
+        METRICS.inc("cache_misses", geocode_cache.misses, cache="geocode")
+
+        with open(geocode_cache_path, 'w') as f:
+            f.write(geocode_cache.to_json())
         
+        food_classifier = FoodClassifier.load()
+
         # Process events
         processed_events = []
         events_processed_count = 0
@@ -114,8 +169,16 @@ def process_ical_data(
             Description: {description}
             """
             
-            initial_response = inference_provider.get_completion(initial_prompt)
-            initial_has_food = initial_response.lower().strip() == "true"
+            # Obvious cases are screened locally; only ambiguous ones go to the LLM
+            with METRICS.timer("classify", event=summary):
+                initial_has_food, confidence = food_classifier.classify(summary, description)
+            METRICS.inc("classifier_decisions", event=summary, decision=str(initial_has_food).lower())
+            if initial_has_food is None:
+                initial_response = get_completion(inference_provider, initial_prompt, "llm_initial", summary)
+                initial_has_food = initial_response.lower().strip() == "true"
+            else:
+                initial_response = "true" if initial_has_food else "false"
+                print(f"Pre-classifier says {initial_response} (p={confidence:.2f}), skipping initial LLM check")
             
             event_data = {
                 "name": summary,
@@ -127,8 +190,10 @@ def process_ical_data(
             if initial_has_food and url and url.startswith("http"):
                 try:
                     # Fetch and process event page
-                    event_html = fetch_url(url)
-                    event_text = extract_text_from_html(event_html)
+                    with METRICS.timer("fetch_event_page", event=summary):
+                        event_html = fetch_url(url)
+                    with METRICS.timer("extract_text", event=summary):
+                        event_text = extract_text_from_html(event_html)
                     
                     # Final check with full event details
                     final_prompt = f"""Return how likely (very likely, likely, unlikely, very unlikely) followed by a summarization 
@@ -138,7 +203,7 @@ def process_ical_data(
                     Full Event Details: {event_text[:3000]}  # Limit text length
                     """
                     
-                    final_response = inference_provider.get_completion(final_prompt)
+                    final_response = get_completion(inference_provider, final_prompt, "llm_final", summary)
                     
                     # Parse response
                     parts = final_response.split(',', 1)
@@ -172,6 +237,7 @@ def process_ical_data(
             
             processed_events.append(event_data)
             events_processed_count += 1
+            METRICS.inc("events_processed")
             
             # Small delay to avoid rate limits
             time.sleep(0.5)
@@ -192,7 +258,7 @@ def process_ical_data(
             and their likelihood. Also, suggest some specific events to consider attending.
             """
             
-            final_summary = inference_provider.get_completion(final_prompt)
+            final_summary = get_completion(inference_provider, final_prompt, "llm_summary")
             
             # Add final summary to processed events
             result = {
@@ -207,4 +273,11 @@ def process_ical_data(
                 
             return result
         
-        return {"status": "error", "message": "No events processed"}
\ No newline at end of file
+        return {"status": "error", "message": "No events processed"}
+    except Exception as e:
+        print(f"Error processing iCal data: {e}")
+        return {"status": "error", "message": str(e)}
+    finally:
+        # Save the run report next to the summaries
+        with open(os.path.join(os.path.dirname(summary_path), RUN_REPORT_FILENAME), 'w') as f:
+            f.write(METRICS.to_json())